@@ -0,0 +1,3 @@
+from .generator import LogGenerator, parse_size
+from .stages import STAGES, run_stages
+from .results import compare, load_results, make_results, write_results
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+from . import STAGES, LogGenerator, compare, load_results, make_results, parse_size, run_stages, write_results
+from .results import format_comparison
+from argparse import ArgumentParser
+import os
+import sys
+import tempfile
+
+def create_argparser():
+    p = ArgumentParser(description='Benchmarks clang_tidy_converter stages on generated Clang-Tidy output.')
+    sub = p.add_subparsers(title="command", dest='command', metavar="COMMAND", required=True)
+
+    generate = sub.add_parser("generate", help="write generated Clang-Tidy output to a file")
+    generate.add_argument('output', help='file to write')
+    add_generator_arguments(generate)
+
+    run = sub.add_parser("run", help="run stage benchmarks and write results as JSON")
+    run.add_argument('-o', '--output', default=None, help='write results to OUTPUT file instead of STDOUT')
+    run.add_argument('-i', '--input', default=None, help='benchmark on INPUT file instead of generated output')
+    run.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES), help='stages to run (default: all)')
+    run.add_argument('--repeat', type=int, default=3, help='runs per stage, the best one is reported (default: 3)')
+    add_generator_arguments(run)
+
+    cmp = sub.add_parser("compare", help="compare two results files")
+    cmp.add_argument('before', help='results of the baseline commit')
+    cmp.add_argument('after', help='results of the new commit')
+    cmp.add_argument('--threshold', type=float, default=0.1,
+                     help='exit with status 1 if throughput of a stage drops or its peak RSS grows by more than THRESHOLD (default: 0.1)')
+
+    return p
+
+def add_generator_arguments(parser):
+    parser.add_argument('--size', type=parse_size, default=parse_size('10MB'), help='size of generated output, e.g. 10MB or 5GB (default: 10MB)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    parser.add_argument('--notes', type=int, default=4, help='maximum number of notes after a warning (default: 4)')
+    parser.add_argument('--details', type=int, default=3, help='maximum number of details lines after a message (default: 3)')
+    parser.add_argument('--header_ratio', type=float, default=0.3,
+                        help='share of warnings in headers, which repeat in each translation unit including them (default: 0.3)')
+
+def generate(args, path):
+    generator = LogGenerator(args.seed, args.notes, args.details, args.header_ratio)
+    with open(path, 'w', encoding='utf-8', newline='\n') as output:
+        return generator.write(output, args.size)
+
+def generator_options(args):
+    return {'size': args.size, 'seed': args.seed, 'notes': args.notes, 'details': args.details, 'header_ratio': args.header_ratio}
+
+def main(args):
+    if args.command == 'generate':
+        generate(args, args.output)
+    elif args.command == 'run':
+        if args.input is not None:
+            log = {'path': args.input, 'size': os.path.getsize(args.input)}
+            stages = run_stages(args.input, args.stages, args.repeat)
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'clang-tidy.log')
+                log = dict(generator_options(args), size=generate(args, path))
+                stages = run_stages(path, args.stages, args.repeat)
+        results = make_results(log, stages)
+        if args.output is None:
+            write_results(sys.stdout, results)
+        else:
+            with open(args.output, 'w') as output:
+                write_results(output, results)
+    else:
+        rows, regressions = compare(load_results(args.before), load_results(args.after), args.threshold)
+        print(format_comparison(rows))
+        if regressions:
+            print(f"regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main(create_argparser().parse_args())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import random
+import re
+
+PROJECT_ROOT = '/home/user/project'
+
+_SIZE_REGEX = re.compile(r'(?P<number>\d+(\.\d+)?)\s*(?P<unit>[KMG]?B?)', re.IGNORECASE)
+_SIZE_UNITS = {'': 1, 'B': 1, 'K': 1 << 10, 'KB': 1 << 10, 'M': 1 << 20, 'MB': 1 << 20, 'G': 1 << 30, 'GB': 1 << 30}
+
+_CHECKS = [
+    'bugprone-use-after-move', 'bugprone-narrowing-conversions', 'clang-analyzer-core.NullDereference',
+    'clang-analyzer-cplusplus.NewDeleteLeaks', 'cppcoreguidelines-pro-type-member-init', 'misc-unused-parameters',
+    'modernize-use-auto', 'modernize-use-nullptr', 'modernize-use-override', 'performance-unnecessary-copy-initialization',
+    'readability-identifier-naming', 'readability-braces-around-statements', 'readability-redundant-string-cstr',
+    'hicpp-signed-bitwise', 'cert-err58-cpp', 'google-explicit-constructor',
+]
+_MESSAGES = [
+    "Potential memory leak", "Called C++ object pointer is null", "'{name}' used after it was moved",
+    "narrowing conversion from 'long' to 'int'", "parameter '{name}' is unused", "use auto when initializing with new",
+    "use nullptr", "annotate this function with 'override' or (rarely) 'final'", "invalid case style for variable '{name}'",
+    "statement should be inside braces", "the variable '{name}' is copy-constructed from a const reference",
+    "constructor does not initialize these fields: {name}", "use of a signed integer operand with a binary bitwise operator",
+]
+_NOTES = [
+    "Calling '{name}'", "Returning from '{name}'", "Entered call from '{name}'", "Assuming '{name}' is null",
+    "Memory is allocated", "'{name}' initialized to a null pointer value", "Taking true branch", "Loop condition is false",
+]
+_NAMES = ['value', 'buffer', 'count', 'OtherFunction', 'parse', 'm_data', 'it', 'result', 'callback', 'node']
+_LEVELS = ['warning'] * 12 + ['error', 'remark']
+
+
+def parse_size(value):
+    """Parses sizes like '10MB', '1.5G' or '4096' into a number of bytes."""
+    match = _SIZE_REGEX.fullmatch(value.strip())
+    if match is None:
+        raise ValueError(f'invalid size: {value}')
+    return int(float(match.group('number')) * _SIZE_UNITS[match.group('unit').upper()])
+
+
+class LogGenerator:
+    """
+    Generates realistic Clang-Tidy output: warnings of several translation
+    units with source snippets, caret lines, notes and summary lines. The
+    output depends only on the seed and the options.
+
+    notes is the maximum number of notes after a warning, e.g. steps of a
+    static analyzer path; details is the maximum number of details lines
+    after each message; header_ratio is the share of warnings reported in
+    headers, which repeat verbatim in every translation unit including them.
+    """
+    def __init__(self, seed=0, notes=4, details=3, header_ratio=0.3, files=2000, headers=200):
+        self.random = random.Random(seed)
+        self.notes = notes
+        self.details = details
+        self.header_ratio = header_ratio
+        self.sources = [f'{PROJECT_ROOT}/src/module{i % 40}/file{i}.cpp' for i in range(files)]
+        self.headers = [f'{PROJECT_ROOT}/include/module{i % 40}/header{i}.h' for i in range(headers)]
+        self.header_warnings = [self._warning(path) for path in self.headers for _ in range(3)]
+
+    def write(self, stream, size):
+        """Writes at least size bytes of output to a text stream; returns the number of bytes written."""
+        written = 0
+        chunk = []
+        chunk_size = 0
+        while written + chunk_size < size:
+            text = self._translation_unit()
+            chunk.append(text)
+            chunk_size += len(text.encode('utf-8'))
+            if chunk_size >= 1 << 20:
+                stream.write(''.join(chunk))
+                written += chunk_size
+                chunk.clear()
+                chunk_size = 0
+        stream.write(''.join(chunk))
+        return written + chunk_size
+
+    def _translation_unit(self):
+        rnd = self.random
+        source = rnd.choice(self.sources)
+        warnings = []
+        for _ in range(rnd.randint(1, 12)):
+            if rnd.random() < self.header_ratio:
+                warnings.append(rnd.choice(self.header_warnings))
+            else:
+                warnings.append(self._warning(source))
+        if rnd.random() < 0.05:
+            warnings.append('error: -mapcs-frame not supported\n')
+        warnings.append(f'{len(warnings) * 7} warnings generated.\n')
+        if rnd.random() < 0.5:
+            warnings.append(f'Suppressed {rnd.randint(1, 500)} warnings ({rnd.randint(1, 500)} in non-user code).\n'
+                            'Use -header-filter=.* to display errors from all non-system headers. '
+                            'Use -system-headers to display errors from system headers as well.\n')
+        return ''.join(warnings)
+
+    def _warning(self, path):
+        rnd = self.random
+        lines = [self._message(path, rnd.choice(_LEVELS), rnd.choice(_MESSAGES), rnd.choice(_CHECKS))]
+        for _ in range(rnd.randint(0, self.notes)):
+            note_path = path if rnd.random() < 0.7 else rnd.choice(self.headers)
+            lines.append(self._message(note_path, 'note', rnd.choice(_NOTES), None))
+        return ''.join(lines)
+
+    def _message(self, path, level, text, check):
+        rnd = self.random
+        column = rnd.randint(1, 60)
+        header = f'{path}:{rnd.randint(1, 5000)}:{column}: {level}: {text.format(name=rnd.choice(_NAMES))}'
+        if check is not None:
+            header += f' [{check}]'
+        lines = [header]
+        details = rnd.randint(0, self.details)
+        if details > 0:
+            lines.append(' ' * rnd.randint(0, 12) + f'auto {rnd.choice(_NAMES)} = {rnd.choice(_NAMES)}({rnd.choice(_NAMES)}, {rnd.randint(0, 99)});')
+        if details > 1:
+            lines.append(' ' * (column - 1) + '^' + '~' * rnd.randint(0, 20))
+        for _ in range(details - 2):
+            lines.append(' ' * (column - 1) + rnd.choice(_NAMES))
+        return '\n'.join(lines) + '\n'
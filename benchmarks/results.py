@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import json
+import platform
+import subprocess
+import time
+
+RESULTS_VERSION = 1
+
+
+def make_results(log, stages):
+    """Returns a results document for stage results of run_stages() on the log described by log dict."""
+    return {
+        'version': RESULTS_VERSION,
+        'commit': _git_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'log': log,
+        'stages': stages,
+    }
+
+
+def write_results(stream, results):
+    json.dump(results, stream, indent=2)
+    stream.write('\n')
+
+
+def load_results(path):
+    with open(path) as f:
+        results = json.load(f)
+    if results.get('version') != RESULTS_VERSION:
+        raise ValueError(f'{path}: unsupported results version {results.get("version")}')
+    return results
+
+
+def compare(old, new, threshold=0.1):
+    """
+    Compares throughput and peak RSS of stages present in both results.
+    Returns (rows, regressions), where a regression is a stage whose throughput
+    dropped or whose peak RSS grew by more than threshold.
+    """
+    old_stages = {stage['stage']: stage for stage in old['stages']}
+    rows = []
+    regressions = []
+    for stage in new['stages']:
+        before = old_stages.get(stage['stage'])
+        if before is None:
+            continue
+        throughput = stage['mb_per_s'] / before['mb_per_s'] - 1
+        rss = stage['peak_rss_mb'] / before['peak_rss_mb'] - 1
+        rows.append((stage['stage'], before['mb_per_s'], stage['mb_per_s'], throughput, before['peak_rss_mb'], stage['peak_rss_mb'], rss))
+        if throughput < -threshold or rss > threshold:
+            regressions.append(stage['stage'])
+    return rows, regressions
+
+
+def format_comparison(rows):
+    lines = [f'{"stage":<16}{"MB/s before":>12}{"after":>10}{"change":>9}{"RSS MB before":>15}{"after":>10}{"change":>9}']
+    for name, old_mbps, new_mbps, throughput, old_rss, new_rss, rss in rows:
+        lines.append(f'{name:<16}{old_mbps:>12.1f}{new_mbps:>10.1f}{throughput:>+9.1%}{old_rss:>15.1f}{new_rss:>10.1f}{rss:>+9.1%}')
+    return '\n'.join(lines)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
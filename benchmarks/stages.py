@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from clang_tidy_converter import Fingerprinter, MappedClangTidyParser, PathResolver
+from clang_tidy_converter.__main__ import create_argparser, write_target
+from clang_tidy_converter.parser.mapped_parser import map_file
+
+from .generator import PROJECT_ROOT
+
+FORMATS = ('cc', 'html', 'sq', 'sarif', 'dump')
+STAGES = ('parse', 'relative_paths', 'fingerprint') + FORMATS
+
+
+def run_stages(log_path, stages=STAGES, repeat=3):
+    """
+    Runs each stage in a fresh process, so that peak RSS is measured per
+    stage, and returns a result dict per stage with the best of repeat runs.
+
+    A stage streams the log through the pipeline up to and including it, as
+    the converter does, so e.g. the 'cc' stage parses with paths relative to
+    the project root and writes Code Climate JSON to /dev/null.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for stage in stages:
+        with ProcessPoolExecutor(1, mp_context=context) as pool:
+            results.append(pool.submit(_run_stage, stage, log_path, repeat).result())
+    messages = results[0]['messages'] if results and results[0]['stage'] == 'parse' else None
+    size = os.path.getsize(log_path)
+    for result in results:
+        result['mb_per_s'] = size / (1 << 20) / result['seconds']
+        if messages is not None:
+            result['messages_per_s'] = messages / result['seconds']
+    return results
+
+
+def _run_stage(stage, log_path, repeat):
+    if stage not in STAGES:
+        raise ValueError(f'unknown stage: {stage}')
+    base_rss = _peak_rss()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = _STAGE_FUNCTIONS.get(stage, _write)(log_path, stage)
+        timings.append(time.perf_counter() - start)
+    return {
+        'stage': stage,
+        'seconds': min(timings),
+        'messages': count,
+        'peak_rss_mb': _peak_rss() / (1 << 20),
+        'stage_rss_mb': (_peak_rss() - base_rss) / (1 << 20),
+    }
+
+
+def _peak_rss():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def _messages(log_path, path_resolver=None):
+    return MappedClangTidyParser(path_resolver).iter_messages(map_file(log_path))
+
+
+def _relative_messages(log_path):
+    return _messages(log_path, PathResolver([PROJECT_ROOT]))
+
+
+def _count(messages):
+    count = 0
+    for _ in messages:
+        count += 1
+    return count
+
+
+def _parse(log_path, stage):
+    return _count(_messages(log_path))
+
+
+def _relative_paths(log_path, stage):
+    return _count(_relative_messages(log_path))
+
+
+def _fingerprint(log_path, stage):
+    fingerprinter = Fingerprinter()
+    count = 0
+    for message in _relative_messages(log_path):
+        fingerprinter.fingerprint(message)
+        count += 1
+    return count
+
+
+def _write(log_path, stage):
+    write_target(create_argparser().parse_args([stage]), os.devnull, _relative_messages(log_path))
+    return None
+
+
+_STAGE_FUNCTIONS = {
+    'parse': _parse,
+    'relative_paths': _relative_paths,
+    'fingerprint': _fingerprint,
+}
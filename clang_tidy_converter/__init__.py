@@ -1,2 +1,23 @@
-from .formatter import *
 from .parser import *
+from .deduplicator import MessageDeduplicator
+from .lazy import lazy_attributes
+
+# formatters and the library API are imported on first use, see formatter.FORMATTERS
+_LAZY_ATTRIBUTES = {
+    'CodeClimateFormatter': '.formatter',
+    'HTMLReportFormatter': '.formatter',
+    'SonarQubeFormatter': '.formatter',
+    'SarifFormatter': '.formatter',
+    'BinaryFormatter': '.formatter',
+    'Fingerprinter': '.formatter',
+    'Converter': '.converter',
+    'ConversionOptions': '.converter',
+    'CodeClimateOptions': '.converter',
+    'HTMLReportOptions': '.converter',
+    'SonarQubeOptions': '.converter',
+    'SarifOptions': '.converter',
+    'BinaryDumpOptions': '.converter',
+}
+
+__all__ = [name for name in vars(parser) if not name.startswith('_')] + ['MessageDeduplicator', *_LAZY_ATTRIBUTES]
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_ATTRIBUTES)
@@ -1,53 +1,451 @@
 #!/usr/bin/env python3
 
-from .formatter import CodeClimateFormatter, HTMLReportFormatter, SonarQubeFormatter, SarifFormatter
-from .parser import ClangTidyParser
-from argparse import ArgumentParser
+from .compressed_io import CODECS, MAGIC_SIZE, codec_for_path, detect_codec, open_compressed, open_decompressed
+from .deduplicator import MessageDeduplicator
+from .formatter import SHARD_KINDS, formatter_class, is_output_format, output_formats, plugin_formats
+from .formatter.base import emit_messages
+from .formatter.classification import DiagnosticClassifier, load_category_map
+from .formatter.fingerprint import ALGORITHMS, Fingerprinter
+from .parser import BinaryDumpParser, ClangTidyParser, MappedClangTidyParser, ParallelClangTidyParser, PathResolver
+from .parser.binary_parser import MAGIC, is_binary_dump
+from .parser.clang_tidy_parser import ENCODING
+from .parser.mapped_parser import map_file
+from .stats import PipelineStats, measure, track
+from argparse import ArgumentParser, ArgumentTypeError, Namespace, _SubParsersAction
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache, partial
+from itertools import chain
+import io
 import os
 import sys
 
+BASELINE_MODES = ('new', 'fixed', 'both')
+OUTPUT_BUFFER_SIZE = 1 << 20
+READ_SIZE = 1 << 16
+# global options applied by a converter server; the others name local files or run modes
+SERVER_OPTIONS = ('project_root', 'path_map', 'deduplicate')
+
 def create_argparser():
     p = ArgumentParser(description='Reads Clang-Tidy output from STDIN and prints it in selected format to STDOUT.')
-    p.add_argument('-r', '--project_root', default='', help='output file paths relative to PROJECT_ROOT')
+    p.add_argument('-r', '--project_root', action='append', default=[],
+                   help='output file paths relative to PROJECT_ROOT; may be repeated, then paths are relative to the longest root containing them or to the first one')
+    p.add_argument('--path_map', action='append', default=[], type=parse_path_map, metavar='FROM=TO',
+                   help='replace the FROM directory prefix of file paths with TO before making them relative, e.g. to map build container paths to the host; may be repeated')
+    p.add_argument('-o', '--output', default=None, help='write output to OUTPUT file instead of STDOUT')
+    p.add_argument('-e', '--emit', action='append', default=[], type=parse_emit, metavar='FORMAT=FILE',
+                   help='also write the same issues in FORMAT with default options to FILE in the same pass; may be repeated')
+    p.add_argument('--compression', choices=CODECS, default=None,
+                   help='compress OUTPUT or STDOUT with CODEC in a background thread; OUTPUT and FILE of --emit ending with .gz or .zst are compressed anyway')
+    p.add_argument('-i', '--input', action='append', default=None,
+                   help='read Clang-Tidy output or a binary dump from memory-mapped INPUT file instead of STDIN, decompressing gzip or zstd data; may be repeated')
+    p.add_argument('--jobs', type=int, default=1, help='parse INPUT files in JOBS parallel processes')
+    p.add_argument('--cache_dir', default=None,
+                   help='keep parsed issues of each INPUT file in CACHE_DIR, parse only files changed since the previous run and report issues of all cached files; '
+                        'INPUT may be given as SOURCE=INPUT to key its entry by the SOURCE file of its translation unit instead of its path')
+    p.add_argument('--cache_evict', action='append', default=[], metavar='SOURCE',
+                   help='remove the entry of translation unit SOURCE from CACHE_DIR, e.g. of a deleted source file; may be repeated')
+    p.add_argument('--cache_prune', action='store_const', const=True, default=False,
+                   help='remove entries of translation units without an INPUT file from CACHE_DIR, e.g. after analyzing all of them')
+    p.add_argument('-d', '--deduplicate', action='store_const', const=True, default=False,
+                   help='drop exact repeats of issues, e.g. the same header warning reported for several translation units')
+    p.add_argument('--dedup_report', default=None,
+                   help='write how many times each issue was seen to DEDUP_REPORT file as JSON (implies --deduplicate)')
+    p.add_argument('--baseline', default=None, metavar='PREVIOUS_REPORT',
+                   help='compare issues with PREVIOUS_REPORT, a Code Climate or SARIF JSON file or a CACHE_DIR, and output only differences')
+    p.add_argument('--baseline_mode', choices=BASELINE_MODES, default='new',
+                   help='output issues that are new, fixed, i.e. only in PREVIOUS_REPORT, or both (default: new)')
+    p.set_defaults(baseline_index=None)
+    p.add_argument('--stats', nargs='?', const='-', default=None, metavar='FILE',
+                   help='write wall time, CPU time, item count and process-wide peak memory after each conversion stage as JSON to STDERR or FILE')
+    p.add_argument('--profile', default=None, metavar='FILE', help='profile the conversion with cProfile and dump the statistics to FILE')
+    p.add_argument('--server', default=None, metavar='ADDRESS',
+                   help='convert with the converter server at ADDRESS, a Unix socket path or http://HOST:PORT, see serve')
+    p.set_defaults(command='convert')
+
+    sub = add_format_subparsers(p)
+    add_format_parsers(sub)
+
+    run = sub.add_parser("run", help="run clang-tidy over a compilation database and convert its output as it arrives")
+    run.add_argument('-p', '--build_path', default='.', help='read compile_commands.json from BUILD_PATH directory (default: .)')
+    run.add_argument('--clang_tidy_binary', default='clang-tidy', help='clang-tidy executable (default: clang-tidy)')
+    run.add_argument('--clang_tidy_arg', action='append', default=[], metavar='ARG',
+                     help='pass ARG to each clang-tidy process, e.g. --clang_tidy_arg=-checks=-*,bugprone-*; may be repeated')
+    run.add_argument('--processes', type=int, default=None,
+                     help='run at most PROCESSES clang-tidy processes at a time (default: number of CPUs)')
+    run.add_argument('--file_filter', default=None, metavar='REGEX', help='only check translation units whose path matches REGEX')
+    run.set_defaults(command='run')
+    add_format_parsers(add_format_subparsers(run))
+
+    serve = sub.add_parser("serve", help="serve conversions at ADDRESS for clients using --server")
+    serve.add_argument('address', metavar='ADDRESS', help='Unix socket path or http://HOST:PORT, e.g. http://127.0.0.1:8787')
+    serve.add_argument('--workers', type=int, default=1, help='serve in WORKERS processes (default: 1)')
+    serve.add_argument('--threads', type=int, default=4, help='handle at most THREADS requests at a time in each worker (default: 4)')
+    serve.add_argument('--max_request_size', type=int, default=None, metavar='BYTES',
+                       help='reject requests with more than BYTES of Clang-Tidy output, compressed or decompressed')
+    serve.add_argument('--timeout', type=float, default=60, metavar='SECONDS',
+                       help='drop connections idle for SECONDS (default: 60)')
+    serve.set_defaults(command='serve')
+
+    return p
+
+class FormatParsersAction(_SubParsersAction):
+    """
+    Subparsers of output formats. Parsers of formatter plugins are added
+    only when a format is not a built-in one or all formats are listed,
+    e.g. by --help or for an invalid choice, so that runs with a built-in
+    format do not look for installed plugins.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._adding = False
+        self._name_parser_map = self.choices = _FormatParsers(self)
+
+    def add_parser(self, name, **kwargs):
+        # argparse checks whether name is taken, which must not look for plugins
+        self._adding = True
+        try:
+            return super().add_parser(name, **kwargs)
+        finally:
+            self._adding = False
+
+    def add_plugin_parsers(self, names):
+        for output_format in names:
+            if dict.__contains__(self._name_parser_map, output_format):
+                continue
+            formatter = formatter_class(output_format)
+            parser = self.add_parser(output_format, help=getattr(formatter, 'help', None))
+            if hasattr(formatter, 'add_arguments'):
+                formatter.add_arguments(parser)
+
+    def _get_subactions(self):
+        # lists the formats in --help
+        self.add_plugin_parsers(plugin_formats())
+        return super()._get_subactions()
+
+class _FormatParsers(dict):
+    def __init__(self, action):
+        super().__init__()
+        self._action = action
 
-    sub = p.add_subparsers(title="output format", dest='output_format', metavar="FORMAT", required=True)
+    def __contains__(self, name):
+        if not super().__contains__(name) and not self._action._adding and name in plugin_formats():
+            self._action.add_plugin_parsers([name])
+        return super().__contains__(name)
 
+    def __iter__(self):
+        if not self._action._adding:
+            self._action.add_plugin_parsers(plugin_formats())
+        return super().__iter__()
+
+def add_format_subparsers(parser):
+    return parser.add_subparsers(title="output format", dest='output_format', metavar="FORMAT", required=True,
+                                 action=FormatParsersAction)
+
+def add_format_parsers(sub):
     cc = sub.add_parser("cc", help="Code Climate JSON")
     cc.add_argument('-l', '--use_location_lines', action='store_const', const=True, default=False,
                     help='use line-based locations instead of position-based as defined in Locations section of Code Climate specification')
     cc.add_argument('-j', '--as_json_array', action='store_const', const=True, default=False,
                     help='output as JSON array instead of ending each issue with \\0')
+    cc.add_argument('--fingerprint_algorithm', choices=ALGORITHMS, default='md5',
+                    help='hash algorithm for issue fingerprints; blake2b is faster, but changes fingerprints (default: md5)')
+    cc.add_argument('--category_map', default=[], type=parse_category_map, metavar='FILE',
+                    help='assign categories to diagnostic names by FILE, a JSON object mapping regexes of diagnostic names to a category or a list of them')
+    add_compact_argument(cc)
 
     html = sub.add_parser("html", help="HTML report")
     html.add_argument('-s', '--software_name', default='', help='software name to display in generated report')
+    html.add_argument('-v', '--virtualized', action='store_const', const=True, default=False,
+                      help='embed issues as JSON data and render them page by page, only the rows scrolled into view; use for reports with many issues')
+    html.add_argument('--output_dir', default=None,
+                      help='write report to OUTPUT_DIR as index.html with the bug summary and a page per source file or directory')
+    html.add_argument('--shard_by', choices=SHARD_KINDS, default='file',
+                      help='write a page per source file or directory to OUTPUT_DIR (default: file)')
 
     sq = sub.add_parser("sq", help="SonarQube JSON")
+    add_compact_argument(sq)
+
     sarif = sub.add_parser("sarif", help="SARIF JSON")
+    add_compact_argument(sarif)
+    sarif.add_argument('--indexed', action='store_true',
+                       help='refer to tables of rules and files by index instead of repeating them in each result')
 
-    return p
+    sub.add_parser("dump", help="binary dump of parsed issues, readable with --input")
+
+def parse_emit(value):
+    output_format, sep, path = value.partition('=')
+    if not sep or not path or not is_output_format(output_format):
+        raise ArgumentTypeError(f"expected FORMAT=FILE with FORMAT one of {', '.join(output_formats())}, got '{value}'")
+    return output_format, path
+
+def parse_path_map(value):
+    source, sep, target = value.partition('=')
+    if not sep or not source:
+        raise ArgumentTypeError(f"expected FROM=TO, got '{value}'")
+    return source, target
+
+def parse_category_map(path):
+    try:
+        return load_category_map(path)
+    except (OSError, ValueError) as e:
+        raise ArgumentTypeError(str(e))
+
+def add_compact_argument(parser):
+    parser.add_argument('-c', '--compact', action='store_const', const=True, default=False,
+                        help='output compact JSON without indentation')
 
 def main(args):
-    parser = ClangTidyParser()
-    messages = parser.parse(sys.stdin.readlines())
+    stats = None
+    if args.stats is not None:
+        stats = PipelineStats()
+        stats.start()
+    profiler = None
+    if args.profile is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if args.command == 'serve':
+            from .server import serve
+            serve(args, parse_server_options)
+        elif args.server is not None:
+            convert_with_server(args)
+        else:
+            convert(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        if stats is not None:
+            stats.stop()
+            write_stats(stats, args.stats)
+
+def convert(args):
+    messages = track('parse', read_messages(args))
+
+    deduplicator = None
+    if args.deduplicate or args.dedup_report is not None:
+        deduplicator = MessageDeduplicator()
+        messages = track('deduplicate', deduplicator.iter_unique(messages))
 
-    if len(args.project_root) > 0:
-       convert_paths_to_relative(messages, args.project_root)
+    if args.baseline is not None:
+        from .baseline import BaselineIndex
+        with measure('baseline load'):
+            args.baseline_index = BaselineIndex(args.baseline, Fingerprinter(getattr(args, 'fingerprint_algorithm', 'md5')))
+        messages = track('baseline', args.baseline_index.iter_diff(messages, args.baseline_mode))
 
+    if args.emit:
+        targets = [(args, args.output)] + [(create_argparser().parse_args([output_format]), path) for output_format, path in args.emit]
+        for target_args, _ in targets:
+            target_args.baseline_index = args.baseline_index
+        from .fan_out import fan_out
+        with ExitStack() as outputs:
+            fan_out(messages, [begin_target(outputs, target_args, path) for target_args, path in targets])
+    else:
+        write_target(args, args.output, messages)
+
+    if args.dedup_report is not None:
+        with open(args.dedup_report, 'w') as report:
+            deduplicator.write_report(report)
+
+def convert_with_server(args):
+    from .client import ConversionError, convert_remotely
+    unsupported = [option for option, used in (('run', args.command == 'run'), ('--emit', args.emit), ('--jobs', args.jobs > 1),
+                                               ('--cache_dir', args.cache_dir), ('--dedup_report', args.dedup_report),
+                                               ('--baseline', args.baseline), ('--output_dir', getattr(args, 'output_dir', None)))
+                   if used]
+    if unsupported:
+        sys.exit(f"error: {', '.join(unsupported)} cannot be used with --server")
+    chunks = read_chunks(args.input)
+    try:
+        with ExitStack() as outputs:
+            output = sys.stdout.buffer
+            if args.output is not None:
+                output = outputs.enter_context(open(args.output, 'wb', buffering=OUTPUT_BUFFER_SIZE))
+            codec = output_codec(args, args.output)
+            if codec is not None:
+                output = outputs.enter_context(open_compressed(output, codec))
+            convert_remotely(args.server, client_options(args), chunks, output)
+    except (OSError, ValueError, ConversionError) as e:
+        sys.exit(f'error: {args.server}: {e}')
+
+def read_chunks(paths):
+    if paths is None:
+        yield from iter(partial(sys.stdin.buffer.read1, READ_SIZE), b'')
+        return
+    for path in paths:
+        if is_dump_file(path):
+            raise ValueError(f'{path}: binary dumps cannot be converted by a server')
+        with open(path, 'rb') as log:
+            yield from iter(partial(log.read, READ_SIZE), b'')
+
+def client_options(args):
+    """Returns SERVER_OPTIONS and options of the output format of args, as sent to a converter server."""
+    global_options = format_defaults('dump').keys() - SERVER_OPTIONS - {'output_format'}
+    return {name: value for name, value in vars(args).items() if name not in global_options}
+
+def parse_server_options(options):
+    """Returns the namespace of options sent by client_options(), or raises ValueError."""
+    output_format = options.get('output_format')
+    if not is_output_format(output_format):
+        raise ValueError(f'unsupported output format: {output_format}')
+    args = format_defaults(output_format)
+    global_options = format_defaults('dump').keys() - SERVER_OPTIONS - {'output_format'}
+    for name, value in options.items():
+        if name in global_options or name not in args:
+            raise ValueError(f'unsupported option: {name}')
+        args[name] = value
+    return Namespace(**args)
+
+@lru_cache(maxsize=None)
+def _format_defaults(output_format):
+    return vars(create_argparser().parse_args([output_format]))
+
+def format_defaults(output_format):
+    """Returns default options of output_format; those of dump, which has no options of its own, are the global options."""
+    return dict(_format_defaults(output_format))
+
+def write_stats(stats, path):
+    if path == '-':
+        stats.write(sys.stderr)
+    else:
+        with open(path, 'w') as output:
+            stats.write(output)
+
+def create_formatter(args):
+    # only the formatter of the output format is imported, see formatter.FORMATTERS
+    if args.output_format == 'html' and args.output_dir is not None:
+        from .formatter.sharded_html_report import ShardedHTMLReportWriter
+        return ShardedHTMLReportWriter(args.output_dir, args.shard_by, args.jobs)
     if args.output_format == 'cc':
-        formatter = CodeClimateFormatter()
-    elif args.output_format == 'sarif':
-        formatter = SarifFormatter()
-    elif args.output_format == 'sq':
-        formatter = SonarQubeFormatter()
+        return formatter_class('cc')(Fingerprinter(args.fingerprint_algorithm), DiagnosticClassifier(args.category_map))
+    return formatter_class(args.output_format)()
+
+def write_target(args, path, messages):
+    with measure(f'write {args.output_format}'):
+        with ExitStack() as outputs:
+            formatter = begin_target(outputs, args, path)
+            emit_messages(formatter, messages)
+            formatter.end()
+
+def begin_target(outputs, args, path):
+    """Opens the output of args in outputs and returns its formatter after begin()."""
+    formatter = create_formatter(args)
+    stream = None
+    if args.output_format != 'html' or args.output_dir is None:
+        stream = outputs.enter_context(open_output(path, getattr(formatter, 'binary', False), output_codec(args, path)))
+    formatter.begin(stream, args)
+    return formatter
+
+def output_codec(args, path):
+    return getattr(args, 'compression', None) or codec_for_path(path)
+
+@contextmanager
+def open_output(path, binary, codec=None):
+    """Yields path or STDOUT if None as a stream compressed with codec, if any; text outputs end with a newline."""
+    if codec is not None:
+        with ExitStack() as stack:
+            output = sys.stdout.buffer
+            if path is not None:
+                output = stack.enter_context(open(path, 'wb'))
+            output = stack.enter_context(open_compressed(output, codec))
+            if binary:
+                yield output
+            else:
+                output = stack.enter_context(io.TextIOWrapper(output, encoding='utf-8'))
+                yield output
+                output.write('\n')
+    elif binary:
+        if path is None:
+            yield sys.stdout.buffer
+        else:
+            with open(path, 'wb', buffering=OUTPUT_BUFFER_SIZE) as output:
+                yield output
+    elif path is None:
+        yield sys.stdout
+        sys.stdout.write('\n')
     else:
-        formatter = HTMLReportFormatter()
+        with open(path, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as output:
+            yield output
+            output.write('\n')
+
+def read_messages(args):
+    path_resolver = create_path_resolver(args)
+    if args.command == 'run':
+        from .runner import ClangTidyRunner
+        return ClangTidyRunner(args.build_path, args.clang_tidy_binary, args.clang_tidy_arg, args.processes, args.file_filter,
+                               path_resolver).iter_messages()
+    if args.cache_dir is not None:
+        if args.input is None:
+            sys.exit('error: --cache_dir needs --input files, STDIN cannot be cached')
+        from .cache import MessageCache
+        cache = MessageCache(args.cache_dir)
+        logs = dict(map(parse_cache_input, args.input))
+        with measure('cache update'):
+            cache.evict(args.cache_evict)
+            if args.cache_prune:
+                cache.prune(logs)
+            # cache entries keep paths as in the logs, so they do not depend on options
+            cache.update(logs, partial(parse_file, args))
+        return cache.iter_messages(path_resolver)
+    if args.input is None:
+        codec = detect_codec(sys.stdin.buffer.peek(MAGIC_SIZE))
+        if codec is not None:
+            return parse_decompressed(sys.stdin.buffer, codec, path_resolver)
+        return ClangTidyParser(path_resolver).iter_messages(track('read', sys.stdin))
+    if args.jobs > 1 and all(map(is_mapped_log, args.input)):
+        return ParallelClangTidyParser(args.jobs, path_resolver=path_resolver).iter_files_messages(args.input)
+    return chain.from_iterable(parse_file(args, path, path_resolver) for path in args.input)
+
+def parse_cache_input(value):
+    """Returns the translation unit and the path of an INPUT given as SOURCE=INPUT or INPUT."""
+    unit, sep, path = value.partition('=')
+    if not sep or os.path.exists(value):
+        return os.path.normpath(value), value
+    return os.path.normpath(unit), path
+
+def create_path_resolver(args):
+    if not args.project_root and not args.path_map:
+        return None
+    return PathResolver(args.project_root, args.path_map)
+
+def parse_file(args, path, path_resolver=None):
+    data = map_file(path)
+    codec = detect_codec(data)
+    if codec is not None:
+        return parse_compressed_file(path, codec, path_resolver)
+    if is_binary_dump(data):
+        return BinaryDumpParser(path_resolver).iter_messages(data)
+    if args.jobs > 1:
+        return ParallelClangTidyParser(args.jobs, path_resolver=path_resolver).parse(path)
+    return MappedClangTidyParser(path_resolver).iter_messages(data)
+
+def parse_compressed_file(path, codec, path_resolver=None):
+    with open(path, 'rb') as source:
+        yield from parse_decompressed(source, codec, path_resolver)
+
+def parse_decompressed(source, codec, path_resolver=None):
+    """Yields messages of Clang-Tidy output or a binary dump compressed with codec in binary stream source."""
+    with open_decompressed(source, codec) as reader:
+        if is_binary_dump(reader.head(len(MAGIC))):
+            yield from BinaryDumpParser(path_resolver).iter_messages(reader.readall())
+            return
+        # decoded as memory-mapped logs are, see MappedLines
+        lines = io.TextIOWrapper(io.BufferedReader(reader, READ_SIZE), encoding=ENCODING, errors='replace', newline='\n')
+        yield from ClangTidyParser(path_resolver).iter_messages(track('read', lines))
 
-    print(formatter.format(messages, args))
+def is_dump_file(path):
+    data = map_file(path)
+    codec = detect_codec(data)
+    if codec is None:
+        return is_binary_dump(data)
+    with open(path, 'rb') as source, open_decompressed(source, codec) as reader:
+        return is_binary_dump(reader.head(len(MAGIC)))
 
-def convert_paths_to_relative(messages, root_dir):
-    for message in messages:
-        message.filepath = os.path.relpath(message.filepath, root_dir)
-        convert_paths_to_relative(message.children, root_dir)
+def is_mapped_log(path):
+    """Returns whether path is uncompressed Clang-Tidy output, which can be split into parts parsed in parallel."""
+    data = map_file(path)
+    return detect_codec(data) is None and not is_binary_dump(data)
 
 if __name__ == "__main__":
     main(create_argparser().parse_args())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import re
+
+from .formatter import Fingerprinter
+from .formatter.classification import CODE_CLIMATE_SEVERITIES, SARIF_LEVELS
+from .parser import BinaryDumpParser, ClangMessage
+from .parser.binary_parser import is_binary_dump
+from .parser.mapped_parser import map_file
+
+READ_SIZE = 1 << 16
+
+_SARIF_HEAD_REGEX = re.compile(r'\s*\{\s*"(\$schema|version|runs)"\s*:')
+_ARRAY_START_REGEX = re.compile(r'\[')
+_RESULTS_REGEX = re.compile(r'"results"\s*:\s*\[')
+_ARTIFACTS_REGEX = re.compile(r'"artifacts"\s*:\s*\[')
+_SEPARATORS = ' \t\r\n,\0'
+
+
+def _inverse(levels):
+    # the first, i.e. the least severe, level wins for values shared by several levels
+    inverse = {}
+    for level, value in levels.items():
+        inverse.setdefault(value, level)
+    return inverse
+
+
+_LEVELS_BY_SEVERITY = _inverse(CODE_CLIMATE_SEVERITIES)
+_LEVELS_BY_SARIF_LEVEL = _inverse(SARIF_LEVELS)
+
+
+class BaselineMessage(ClangMessage):
+    """Issue of the baseline report, which is absent from the current one."""
+    __slots__ = ()
+
+
+class BaselineIndex:
+    """
+    Index of issue fingerprints of a previous report: Code Climate JSON (an
+    array or issues ending with \\0), SARIF JSON, a binary dump or a
+    --cache_dir directory. Reports are read item by item, so only the set of
+    fingerprints is kept in memory.
+
+    Fingerprints of SARIF, dumped and cached issues are computed by
+    fingerprinter, which should use the same algorithm as Code Climate
+    fingerprints of the baseline. Code Climate and SARIF reports do not keep
+    diagnostic names of notes, so issues with such notes never match ones
+    read from these reports.
+    """
+    def __init__(self, path, fingerprinter=None):
+        self.path = path
+        self.fingerprinter = fingerprinter if fingerprinter is not None else Fingerprinter()
+        self.fingerprints = {fingerprint for fingerprint, _ in self._iter_issues(with_messages=False)}
+        self._seen = set()
+
+    def iter_diff(self, messages, mode='new'):
+        """
+        Yields messages that are not in the baseline for 'new' mode, baseline
+        issues that are not among messages for 'fixed' mode, or both.
+        """
+        if mode == 'fixed':
+            for _ in self.iter_new(messages):
+                pass
+        else:
+            yield from self.iter_new(messages)
+        if mode != 'new':
+            yield from self.iter_fixed()
+
+    def iter_new(self, messages):
+        for message in messages:
+            fingerprint = self.fingerprinter.fingerprint(message)
+            if fingerprint in self.fingerprints:
+                self._seen.add(fingerprint)
+            else:
+                yield message
+
+    def iter_fixed(self):
+        """Yields baseline issues not seen by iter_new() as BaselineMessage objects."""
+        for fingerprint, message in self._iter_issues(with_messages=True):
+            if fingerprint not in self._seen:
+                self._seen.add(fingerprint)
+                yield message
+
+    def state(self, message):
+        """Returns SARIF baselineState of a message yielded by iter_diff()."""
+        return 'absent' if isinstance(message, BaselineMessage) else 'new'
+
+    def _iter_issues(self, with_messages):
+        """Yields (fingerprint, message) pairs; message may be None unless with_messages."""
+        if os.path.isdir(self.path):
+            # imported here, as only a cache directory given as the baseline needs it
+            from .cache import MessageCache
+            messages = MessageCache(self.path).iter_messages()
+        elif is_binary_dump(map_file(self.path)):
+            messages = BinaryDumpParser().iter_messages(map_file(self.path))
+        else:
+            yield from self._iter_report_issues(with_messages)
+            return
+        for message in messages:
+            yield self.fingerprinter.fingerprint(message), _to_baseline_message(message)
+
+    def _iter_report_issues(self, with_messages):
+        with open(self.path, encoding='utf-8') as stream:
+            reader = _JSONItemReader(stream)
+            head = reader.head()
+            if _SARIF_HEAD_REGEX.match(head):
+                artifacts = _SarifArtifacts(self.path)
+                while reader.skip_to(_RESULTS_REGEX):
+                    uris = artifacts.next_run()
+                    for result in reader.iter_items(in_array=True):
+                        message = _message_from_sarif_result(result, uris)
+                        yield self.fingerprinter.fingerprint(message), message
+                return
+            in_array = head.lstrip().startswith('[')
+            if in_array:
+                reader.skip_to(_ARRAY_START_REGEX)
+            for issue in reader.iter_items(in_array):
+                yield issue['fingerprint'], _message_from_code_climate_issue(issue) if with_messages else None
+
+
+class _JSONItemReader:
+    """Reads JSON values one by one from a stream of values or of a JSON array."""
+    def __init__(self, stream):
+        self._stream = stream
+        self._buffer = ''
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def head(self, size=64):
+        """Returns at least size first characters, unless the stream is shorter."""
+        while len(self._buffer) < size and self._fill(READ_SIZE):
+            pass
+        return self._buffer
+
+    def skip_to(self, regex):
+        """Moves right after the next match of regex; returns False if there is none."""
+        while True:
+            match = regex.search(self._buffer, self._pos)
+            if match is not None:
+                self._pos = match.end()
+                return True
+            # keep a tail, as a match may span two reads
+            self._pos = max(self._pos, len(self._buffer) - 64)
+            if not self._fill(READ_SIZE):
+                return False
+
+    def iter_items(self, in_array):
+        read_size = READ_SIZE
+        while True:
+            if not self._skip_separators():
+                if in_array:
+                    raise ValueError('unterminated JSON array')
+                return
+            if in_array and self._buffer[self._pos] == ']':
+                self._pos += 1
+                return
+            try:
+                item, self._pos = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # the item may continue beyond the buffer
+                if not self._fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+            read_size = READ_SIZE
+            yield item
+
+    def _skip_separators(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _SEPARATORS:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return True
+            if not self._fill(READ_SIZE):
+                return False
+
+    def _fill(self, size):
+        data = self._stream.read(size)
+        if not data:
+            return False
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+
+def _to_baseline_message(message):
+    return BaselineMessage(message.filepath, message.line, message.column, message.level, message.message,
+                           message.diagnostic_name, message.details_lines, message.children)
+
+
+class _SarifArtifacts:
+    """
+    URIs of artifacts of each run of a SARIF report, for locations referring
+    to them by index. Tables of indexed reports follow the results, so they
+    are read by a second reader, only if a location needs them.
+    """
+    def __init__(self, path):
+        self._path = path
+        self._tables = None
+        self._run = -1
+
+    def next_run(self):
+        self._run += 1
+        return self
+
+    def __getitem__(self, index):
+        if self._tables is None:
+            self._tables = self._read_tables()
+        return self._tables[self._run][index]
+
+    def _read_tables(self):
+        with open(self._path, encoding='utf-8') as stream:
+            reader = _JSONItemReader(stream)
+            tables = []
+            while reader.skip_to(_ARTIFACTS_REGEX):
+                tables.append([artifact.get('location', {}).get('uri', '') for artifact in reader.iter_items(in_array=True)])
+            return tables
+
+
+def _message_from_sarif_result(result, artifacts=()):
+    main, *notes = result.get('locations') or [{}]
+    return BaselineMessage(*_sarif_location(main, artifacts), _LEVELS_BY_SARIF_LEVEL.get(result.get('level'), ClangMessage.Level.UNKNOWN),
+                           result['message']['text'], result.get('ruleId'),
+                           children=[ClangMessage(*_sarif_location(note, artifacts), ClangMessage.Level.NOTE,
+                                                  _sarif_text(note.get('message')))
+                                     for note in notes])
+
+
+def _sarif_location(location, artifacts=()):
+    artifact = location.get('artifactLocation', {})
+    uri = artifact.get('uri', '') if 'uri' in artifact or 'index' not in artifact else artifacts[artifact['index']]
+    region = location.get('region', {})
+    return uri[len('file://'):] if uri.startswith('file://') else uri, region.get('startLine', -1), region.get('startColumn', -1)
+
+
+def _sarif_text(message):
+    return message.get('text') if isinstance(message, dict) else message
+
+
+def _message_from_code_climate_issue(issue):
+    """
+    Rebuilds the issue, with notes from trace locations and their messages
+    from the content body. Source snippets are not restored.
+    """
+    body_lines = issue.get('content', {}).get('body', '').split('\n')
+    children = []
+    index = 0
+    for location in issue.get('trace', {}).get('locations', []):
+        child = ClangMessage(*_code_climate_location(location), ClangMessage.Level.NOTE)
+        prefix = f'{child.filepath}:{child.line}:{child.column}: '
+        for i in range(index, len(body_lines)):
+            if body_lines[i].startswith(prefix):
+                child.message = body_lines[i][len(prefix):]
+                index = i + 1
+                break
+        children.append(child)
+    return BaselineMessage(*_code_climate_location(issue.get('location', {})),
+                           _LEVELS_BY_SEVERITY.get(issue.get('severity'), ClangMessage.Level.UNKNOWN),
+                           issue.get('description'), issue.get('check_name'), children=children)
+
+
+def _code_climate_location(location):
+    if 'positions' in location:
+        begin = location['positions']['begin']
+        return location.get('path'), begin['line'], begin['column']
+    return location.get('path'), location.get('lines', {}).get('begin', -1), -1
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+import struct
+
+from .formatter import BinaryFormatter
+from .parser import BinaryDumpParser
+from .parser.mapped_parser import map_file
+
+ENTRY_MAGIC = b'CTCCACHE'
+CACHE_VERSION = 4
+ENTRY_SUFFIX = '.entry'
+# magic, version, SHA-256 digest of the log and length of the UTF-8 encoded translation unit following it
+ENTRY_HEADER = struct.Struct('<8sI32sI')
+
+
+class MessageCache:
+    """
+    Persistent cache of parsed messages with an entry per translation unit.
+    An entry is keyed by the source file of the translation unit and stores
+    a hash of the content of its log, so only logs that changed since the
+    previous run are parsed again. The merged report consists of all cached
+    entries, including those of translation units whose logs are not given
+    again; entries are removed only by evict() and prune().
+
+    An entry is a header packed with struct, as the binary dump format, and
+    a binary dump of messages, so reading it is much faster than parsing the
+    log again and entries of shared cache directories are never unpickled.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def update(self, logs, parse):
+        """
+        Parses logs, a mapping of translation units to paths of their logs,
+        with parse(path) unless their entries hold the same content, and
+        stores the results. Returns the number of parsed logs.
+        """
+        parsed = 0
+        for unit, log in sorted(logs.items()):
+            digest = _file_digest(log)
+            entry_path = self._entry_path(unit)
+            header = _read_header(entry_path)
+            if header is None or header[:2] != (unit, digest):
+                self._write_entry(entry_path, unit, digest, parse(log))
+                parsed += 1
+        return parsed
+
+    def evict(self, units):
+        """Removes entries of given translation units, e.g. of deleted source files."""
+        for unit in units:
+            try:
+                os.remove(self._entry_path(unit))
+            except FileNotFoundError:
+                pass
+
+    def prune(self, units):
+        """Removes entries of translation units other than given ones, and unreadable entries."""
+        units = set(units)
+        for entry_path in self._entry_paths():
+            header = _read_header(entry_path)
+            if header is None or header[0] not in units:
+                os.remove(entry_path)
+
+    def iter_messages(self, path_resolver=None):
+        """
+        Yields messages of all entries ordered by translation unit. Entries
+        keep file paths as in the logs; path_resolver, if any, rewrites them
+        on reading.
+        """
+        entries = []
+        for entry_path in self._entry_paths():
+            header = _read_header(entry_path)
+            if header is not None:
+                entries.append((header[0], header[2], entry_path))
+        for _, begin, entry_path in sorted(entries):
+            yield from BinaryDumpParser(path_resolver).iter_messages(map_file(entry_path), begin)
+
+    def _entry_path(self, unit):
+        return os.path.join(self.cache_dir, hashlib.sha1(unit.encode('utf-8')).hexdigest() + ENTRY_SUFFIX)
+
+    def _entry_paths(self):
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(ENTRY_SUFFIX)]
+
+    def _write_entry(self, entry_path, unit, digest, messages):
+        # imported here, as tempfile is slow to import and not needed by runs without --cache_dir
+        import tempfile
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as entry:
+                encoded = unit.encode('utf-8')
+                entry.write(ENTRY_HEADER.pack(ENTRY_MAGIC, CACHE_VERSION, digest, len(encoded)) + encoded)
+                BinaryFormatter().write(entry, messages, None)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def _read_header(entry_path):
+    """Returns the translation unit, the digest of its log and the offset of the dump of an entry, or None if it is unreadable."""
+    try:
+        with open(entry_path, 'rb') as entry:
+            data = entry.read(ENTRY_HEADER.size)
+            if len(data) < ENTRY_HEADER.size:
+                return None
+            magic, version, digest, size = ENTRY_HEADER.unpack(data)
+            if magic != ENTRY_MAGIC or version != CACHE_VERSION:
+                return None
+            encoded = entry.read(size)
+    except OSError:
+        return None
+    if len(encoded) < size:
+        return None
+    try:
+        unit = encoded.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    return unit, digest, ENTRY_HEADER.size + size
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.digest()
+
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+import http.client
+import json
+import socket
+import threading
+
+CONVERT_PATH = '/convert'
+READ_SIZE = 1 << 16
+
+
+class ConversionError(Exception):
+    pass
+
+
+def parse_address(address):
+    """Returns (host, port) of an http://HOST:PORT address, or address itself as a Unix socket path."""
+    if not address.startswith('http://'):
+        return address
+    host, sep, port = address[len('http://'):].rstrip('/').rpartition(':')
+    if not sep or not port.isdigit():
+        raise ValueError(f"expected a Unix socket path or http://HOST:PORT, got '{address}'")
+    return host or 'localhost', int(port)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+def connect(address, timeout=None):
+    address = parse_address(address)
+    if isinstance(address, str):
+        return UnixHTTPConnection(address, timeout)
+    return http.client.HTTPConnection(*address, timeout=timeout)
+
+
+def convert_remotely(address, options, chunks, output):
+    """
+    Sends options, a JSON object of command line options, and chunks of
+    Clang-Tidy output as bytes to the converter server at address, and
+    writes the converted output to binary stream output as it arrives. Both
+    are streamed, so neither is kept in memory.
+
+    The server writes output while it still reads the request, so the body
+    is sent by a thread while this one reads the response; otherwise both
+    would block once the unread output fills the socket buffers. Errors of
+    chunks are raised after the request is aborted.
+    """
+    connection = connect(address)
+    errors = []
+    sender = None
+    try:
+        try:
+            connection.putrequest('POST', CONVERT_PATH)
+            connection.putheader('Content-Type', 'application/octet-stream')
+            connection.putheader('Transfer-Encoding', 'chunked')
+            connection.endheaders()
+            sender = threading.Thread(target=_send_body, args=(connection.sock, _iter_body(options, chunks), errors),
+                                      daemon=True)
+            sender.start()
+            response = connection.getresponse()
+            if response.status != 200:
+                raise ConversionError(f'{response.status} {response.reason}: {response.read().decode("utf-8", "replace").strip()}')
+            try:
+                for data in iter(lambda: response.read(READ_SIZE), b''):
+                    output.write(data)
+            except http.client.IncompleteRead:
+                raise ConversionError('the server failed while writing the output') from None
+        finally:
+            # also stops a sender still sending to a server that rejected the request
+            connection.close()
+            if sender is not None:
+                sender.join()
+    except (OSError, http.client.HTTPException, ConversionError):
+        if errors:
+            raise errors[0] from None
+        raise
+    if errors:
+        raise errors[0]
+
+
+def _iter_body(options, chunks):
+    # the body is the options as a JSON line followed by Clang-Tidy output
+    yield json.dumps(options).encode('utf-8') + b'\n'
+    yield from chunks
+
+
+def _send_body(sock, body, errors):
+    """Sends body in chunked transfer encoding; errors of body are appended to errors and abort the request."""
+    while True:
+        try:
+            data = next(body, None)
+        except BaseException as e:
+            errors.append(e)
+            try:
+                # the server sees an incomplete body and ends the response
+                sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+            return
+        try:
+            if data is None:
+                sock.sendall(b'0\r\n\r\n')
+                return
+            if data:
+                sock.sendall(b'%x\r\n%s\r\n' % (len(data), data))
+        except OSError:
+            # the server rejected the request without reading all of it, or the response ended; it tells why
+            return
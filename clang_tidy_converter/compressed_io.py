@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+from functools import partial
+import io
+import os
+import queue
+import threading
+import zlib
+
+GZIP = 'gzip'
+ZSTD = 'zstd'
+CODECS = (GZIP, ZSTD)
+EXTENSIONS = {'.gz': GZIP, '.zst': ZSTD}
+MAGIC_NUMBERS = {GZIP: b'\x1f\x8b', ZSTD: b'\x28\xb5\x2f\xfd'}
+# bytes detect_codec() needs
+MAGIC_SIZE = max(map(len, MAGIC_NUMBERS.values()))
+DEFAULT_LEVELS = {GZIP: 6, ZSTD: 3}
+READ_SIZE = 1 << 16
+# most decompressed bytes held at a time per chunk, however well the input compresses
+CHUNK_SIZE = 1 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+# chunks waiting for the background thread; bounds memory if one side is slower
+QUEUE_SIZE = 8
+
+
+def detect_codec(data):
+    """Returns the codec of compressed data by its magic number, or None if data is not compressed."""
+    for codec, magic in MAGIC_NUMBERS.items():
+        if data[:len(magic)] == magic:
+            return codec
+    return None
+
+
+def codec_for_path(path):
+    """Returns the codec implied by the extension of path, or None."""
+    if path is None:
+        return None
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def open_compressed(stream, codec, level=None):
+    """
+    Returns a buffered binary stream compressing what is written to it with
+    codec into binary stream, which stays open when it is closed.
+    """
+    return io.BufferedWriter(CompressingWriter(stream, _compressor(codec, level)), WRITE_BUFFER_SIZE)
+
+
+def open_decompressed(source, codec):
+    """Returns a DecompressingReader of binary stream source compressed with codec."""
+    return DecompressingReader(source, codec)
+
+
+def iter_decompressed(source, codec):
+    """
+    Yields data decompressed from binary stream source in chunks of at most
+    CHUNK_SIZE bytes. Concatenated compressed streams, e.g. of appended
+    logs, are read as one.
+    """
+    if codec == GZIP:
+        return _iter_gzip(source)
+    return _iter_zstd(source)
+
+
+class CompressingWriter(io.RawIOBase):
+    """
+    Raw stream compressing written chunks in a background thread, so that
+    compression, which releases the GIL, overlaps with producing the output.
+    Errors of the thread are raised by the next write() or close().
+    """
+    def __init__(self, stream, compressor):
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._error = None
+        self._thread = threading.Thread(target=self._compress, args=(stream, compressor), daemon=True)
+        self._thread.start()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._raise_error()
+        # data may be a view of a buffer reused by the caller
+        self._queue.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        super().close()
+        self._raise_error()
+
+    def _compress(self, stream, compressor):
+        try:
+            for data in iter(self._queue.get, None):
+                stream.write(compressor.compress(data))
+            stream.write(compressor.flush())
+            stream.flush()
+        except BaseException as e:
+            self._error = e
+            # keep taking chunks, so that writers waiting for the queue see the error
+            for _ in iter(self._queue.get, None):
+                pass
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+class DecompressingReader(io.RawIOBase):
+    """
+    Raw stream of data decompressed by iter_decompressed() from binary
+    stream source in a background thread, so that decompression, which
+    releases the GIL, overlaps with parsing. At most QUEUE_SIZE chunks are
+    held in memory.
+    """
+    def __init__(self, source, codec):
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._chunk = b''
+        self._pos = 0
+        self._done = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._decompress, args=(source, codec), daemon=True)
+        self._thread.start()
+
+    def readable(self):
+        return True
+
+    def head(self, size):
+        """Returns the first size bytes, or fewer if the data is shorter, without consuming them."""
+        while len(self._chunk) - self._pos < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._chunk = self._chunk[self._pos:] + chunk
+            self._pos = 0
+        return self._chunk[self._pos:self._pos + size]
+
+    def readinto(self, buffer):
+        if self._pos == len(self._chunk):
+            self._chunk = self._next_chunk()
+            self._pos = 0
+        size = min(len(buffer), len(self._chunk) - self._pos)
+        buffer[:size] = self._chunk[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+    def readall(self):
+        chunks = [self._chunk[self._pos:], *iter(self._next_chunk, b'')]
+        self._chunk = b''
+        self._pos = 0
+        return b''.join(chunks)
+
+    def close(self):
+        if self.closed:
+            return
+        self._stopped = True
+        # unblock the thread if it waits for a free slot in the queue
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        super().close()
+
+    def _next_chunk(self):
+        """Returns the next non-empty chunk, or b'' at the end of the data."""
+        if self._done:
+            return b''
+        chunk = self._queue.get()
+        if isinstance(chunk, BaseException):
+            self._done = True
+            raise chunk
+        if chunk is None:
+            self._done = True
+            return b''
+        return chunk
+
+    def _decompress(self, source, codec):
+        try:
+            for chunk in iter_decompressed(source, codec):
+                if self._stopped:
+                    return
+                if chunk:
+                    self._queue.put(chunk)
+            self._queue.put(None)
+        except BaseException as e:
+            self._queue.put(e)
+
+
+def _compressor(codec, level):
+    if level is None:
+        level = DEFAULT_LEVELS[codec]
+    if codec == GZIP:
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return _zstandard().ZstdCompressor(level=level).compressobj()
+
+
+def _iter_gzip(source):
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    started = False
+    for data in iter(partial(source.read, READ_SIZE), b''):
+        started = True
+        while data:
+            # input not decompressed within max_length is left in unconsumed_tail
+            yield decompressor.decompress(data, CHUNK_SIZE)
+            if decompressor.eof:
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                started = bool(data)
+            else:
+                data = decompressor.unconsumed_tail
+    if started and not decompressor.eof:
+        # output still pending in the decompressor is less than its window
+        yield decompressor.flush()
+        if not decompressor.eof:
+            raise EOFError('compressed data ended before the end-of-stream marker was reached')
+
+
+def _iter_zstd(source):
+    reader = _zstandard().ZstdDecompressor().stream_reader(source, read_size=READ_SIZE, read_across_frames=True,
+                                                            closefd=False)
+    return iter(partial(reader.read, CHUNK_SIZE), b'')
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError('zstd compression needs the zstandard package: pip install zstandard') from None
+    return zstandard
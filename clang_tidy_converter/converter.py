@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+from collections.abc import Iterable
+import io
+import threading
+from typing import NamedTuple, Tuple
+
+from .deduplicator import MessageDeduplicator
+from .formatter import formatter_class
+from .formatter.classification import DiagnosticClassifier
+from .formatter.fingerprint import Fingerprinter
+from .parser import BinaryDumpParser, ClangTidyParser, MappedClangTidyParser, PathResolver
+from .parser.binary_parser import is_binary_dump
+
+
+class ConversionOptions(NamedTuple):
+    """Options of a Converter session, the same as the global options of the command line."""
+    project_roots: Tuple[str, ...] = ()
+    path_map: Tuple[Tuple[str, str], ...] = ()
+    deduplicate: bool = False
+
+
+class CodeClimateOptions(NamedTuple):
+    output_format = 'cc'
+    baseline_index = None
+
+    use_location_lines: bool = False
+    as_json_array: bool = False
+    fingerprint_algorithm: str = 'md5'
+    # (regex, category) rules, e.g. from formatter.classification.load_category_map()
+    category_map: Tuple[Tuple[str, str], ...] = ()
+    compact: bool = False
+
+
+class HTMLReportOptions(NamedTuple):
+    output_format = 'html'
+    baseline_index = None
+
+    software_name: str = ''
+    virtualized: bool = False
+
+
+class SonarQubeOptions(NamedTuple):
+    output_format = 'sq'
+    baseline_index = None
+
+    compact: bool = False
+
+
+class SarifOptions(NamedTuple):
+    output_format = 'sarif'
+    baseline_index = None
+
+    compact: bool = False
+    indexed: bool = False
+
+
+class BinaryDumpOptions(NamedTuple):
+    output_format = 'dump'
+    baseline_index = None
+
+
+class Converter:
+    """
+    Conversion session for embedding the converter, e.g. in a long-running
+    service. Compiled regexes, path resolution, category and fingerprint
+    caches stay warm across calls, and calls may run concurrently in
+    several threads.
+
+    A source is Clang-Tidy output or a binary dump as bytes, bytearray or
+    mmap, which are parsed in place without copying (a memoryview is
+    copied), Clang-Tidy output as str, or an iterable of lines, e.g. a text
+    file. Line endings of bytes and str are kept as in an --input file of
+    the command line.
+
+    Formats of plugins, see formatter.Formatter, are converted with any
+    options object with their output_format and the attributes they use.
+    """
+    def __init__(self, options=ConversionOptions()):
+        self.options = options
+        self._path_resolver = None
+        if options.project_roots or options.path_map:
+            self._path_resolver = PathResolver(options.project_roots, options.path_map)
+        self._fingerprinters = {}
+        self._classifiers = {}
+        self._lock = threading.Lock()
+
+    def iter_messages(self, source):
+        """Lazily parses source and yields top-level messages."""
+        if isinstance(source, memoryview):
+            source = source.tobytes()
+        if isinstance(source, str):
+            messages = ClangTidyParser(self._path_resolver).iter_messages(io.StringIO(source, newline='\n'))
+        elif isinstance(source, Iterable) and not hasattr(source, 'find'):
+            messages = ClangTidyParser(self._path_resolver).iter_messages(source)
+        elif is_binary_dump(source):
+            messages = BinaryDumpParser(self._path_resolver).iter_messages(source)
+        else:
+            messages = MappedClangTidyParser(self._path_resolver).iter_messages(source)
+        if self.options.deduplicate:
+            messages = MessageDeduplicator().iter_unique(messages)
+        return messages
+
+    def parse(self, source):
+        return list(self.iter_messages(source))
+
+    def convert(self, source, format_options, stream=None):
+        """
+        Converts source to the format of format_options, e.g. SarifOptions().
+        Returns the output as str, or bytes for BinaryDumpOptions, or writes
+        it to stream, which is binary for BinaryDumpOptions, and returns None.
+        """
+        messages = self.iter_messages(source)
+        if stream is None:
+            return self._create_formatter(format_options).format(messages, format_options)
+        self.write(messages, format_options, stream)
+
+    def write(self, messages, format_options, stream):
+        """Writes messages, e.g. from iter_messages(), to stream in the format of format_options."""
+        self._create_formatter(format_options).write(stream, messages, format_options)
+
+    def _create_formatter(self, options):
+        if options.output_format == 'cc':
+            return formatter_class('cc')(self._fingerprinter(options.fingerprint_algorithm), self._classifier(options.category_map))
+        return formatter_class(options.output_format)()
+
+    def _fingerprinter(self, algorithm):
+        with self._lock:
+            fingerprinter = self._fingerprinters.get(algorithm)
+            if fingerprinter is None:
+                fingerprinter = self._fingerprinters[algorithm] = Fingerprinter(algorithm)
+            return fingerprinter
+
+    def _classifier(self, category_map):
+        key = tuple(map(tuple, category_map))
+        with self._lock:
+            classifier = self._classifiers.get(key)
+            if classifier is None:
+                classifier = self._classifiers[key] = DiagnosticClassifier(key)
+            return classifier
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import json
+
+
+def message_identity(message):
+    """
+    Returns hashable identity of a message: the same fields that
+    CodeClimateFormatter._generate_fingerprint hashes, including children.
+    """
+    return (message.filepath, message.line, message.column, message.message, message.diagnostic_name,
+            tuple(message_identity(child) for child in message.children))
+
+
+class MessageDeduplicator:
+    """
+    Drops exact repeats of messages, e.g. a header warning reported once per
+    translation unit including that header, in a single streaming pass.
+    """
+    def __init__(self):
+        self.counts = {}
+
+    def iter_unique(self, messages):
+        counts = self.counts
+        for message in messages:
+            key = message_identity(message)
+            count = counts.get(key)
+            if count is None:
+                counts[key] = 1
+                yield message
+            else:
+                counts[key] = count + 1
+
+    def write_report(self, stream):
+        """Writes how many times each unique message was seen as JSON."""
+        json.dump([{
+            'path': key[0],
+            'line': key[1],
+            'column': key[2],
+            'description': key[3],
+            'check_name': key[4],
+            'occurrences': count
+        } for key, count in self.counts.items()], stream, indent=2)
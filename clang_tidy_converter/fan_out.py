@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+from collections import deque
+
+from .stats import track
+
+
+def fan_out(messages, formatters):
+    """
+    Feeds messages to several formatters in one pass over them: each message
+    is emitted to every formatter as soon as it is read, then end() of each
+    formatter is called; begin() must have been called before. Messages are
+    not kept, so memory does not grow with the input. A failing formatter
+    gets no more messages, the others still get all of them, and the first
+    error is raised at the end.
+    """
+    formatters = list(formatters)
+    emits = [formatter.emit for formatter in formatters]
+    errors = [None] * len(formatters)
+
+    def emit(message):
+        for i, emit_message in enumerate(emits):
+            try:
+                emit_message(message)
+            except Exception as e:
+                errors[i] = e
+                emits[i] = _ignore
+
+    deque(track('emit', map(emit, messages)), maxlen=0)
+    for i, formatter in enumerate(formatters):
+        if errors[i] is None:
+            try:
+                formatter.end()
+            except Exception as e:
+                errors[i] = e
+    for error in errors:
+        if error is not None:
+            raise error
+
+
+def _ignore(message):
+    pass
@@ -1,4 +1,70 @@
-from .code_climate_formatter import CodeClimateFormatter
-from .html_report_formatter import HTMLReportFormatter
-from .sonarqube_formatter import SonarQubeFormatter
-from .sarif_formatter import SarifFormatter
+import importlib
+import warnings
+
+from ..lazy import lazy_attributes
+from .base import Formatter
+from .plugins import find_entry_points
+
+# output format: (module, formatter class); formatters are imported only
+# when used, so a run imports only the formatter of its output format
+FORMATTERS = {
+    'cc': ('.code_climate_formatter', 'CodeClimateFormatter'),
+    'html': ('.html_report_formatter', 'HTMLReportFormatter'),
+    'sq': ('.sonarqube_formatter', 'SonarQubeFormatter'),
+    'sarif': ('.sarif_formatter', 'SarifFormatter'),
+    'dump': ('.binary_formatter', 'BinaryFormatter'),
+}
+
+# entry point group of formatter plugins, e.g. 'junit = my_package.junit:JUnitFormatter'
+ENTRY_POINT_GROUP = 'clang_tidy_converter.formatters'
+
+# top-level package, whose formatters are built in
+_PACKAGE = __name__.partition('.')[0]
+
+# subcommands of the command line, which plugins cannot be named as
+COMMANDS = ('run', 'serve')
+
+# page per source file or directory of the sharded HTML report
+SHARD_KINDS = ('file', 'directory')
+
+
+def plugin_formats():
+    """
+    Returns output formats of installed formatter plugins. Plugins named as
+    a built-in output format or a command are ignored, with a warning unless
+    they are formatters of this package, e.g. registered by an older version.
+    """
+    formats = []
+    for name, entry_point in find_entry_points(ENTRY_POINT_GROUP).items():
+        if name not in FORMATTERS and name not in COMMANDS:
+            formats.append(name)
+        elif not entry_point.value.startswith(_PACKAGE + '.'):
+            kind = 'output format' if name in FORMATTERS else 'command'
+            warnings.warn(f"formatter plugin '{name}' is ignored, as the name is taken by a built-in {kind}")
+    return tuple(formats)
+
+
+def output_formats():
+    return tuple(FORMATTERS) + plugin_formats()
+
+
+def is_output_format(name):
+    """Returns whether name is an output format, looking for plugins only if it is not a built-in one."""
+    return name in FORMATTERS or name in plugin_formats()
+
+
+def formatter_class(output_format):
+    """Imports and returns the formatter class of output_format, a built-in or plugin one."""
+    if output_format in FORMATTERS:
+        module, name = FORMATTERS[output_format]
+        return getattr(importlib.import_module(module, __name__), name)
+    if output_format not in plugin_formats():
+        raise ValueError(f'unsupported output format: {output_format}')
+    return find_entry_points(ENTRY_POINT_GROUP)[output_format].load()
+
+
+__all__ = [name for _, name in FORMATTERS.values()] + ['Fingerprinter', 'Formatter']
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    **{name: module for module, name in FORMATTERS.values()},
+    'Fingerprinter': '.fingerprint',
+})
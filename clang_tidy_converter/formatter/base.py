@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+from collections import deque
+import io
+
+from ..stats import track
+
+
+class Formatter:
+    """
+    Streaming formatter protocol. A conversion calls begin(stream, args)
+    once, emit(message) for each top-level message as soon as it is parsed
+    and end() after the last one, so several formatters can be fed in one
+    pass over the input without keeping the messages. Formatters of binary
+    formats set binary and write bytes to the stream.
+
+    Formatters of plugins registered in the clang_tidy_converter.formatters
+    entry point group implement this protocol, have a constructor without
+    arguments and may define help and add_arguments(parser) for their
+    command line options.
+    """
+    binary = False
+    # stats stage of emitting messages, see stats.track()
+    stage = None
+
+    def begin(self, stream, args):
+        self.stream = stream
+        self.args = args
+
+    def emit(self, message):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+    def write(self, stream, messages, args):
+        self.begin(stream, args)
+        emit_messages(self, messages)
+        self.end()
+
+    def format(self, messages, args):
+        stream = io.BytesIO() if self.binary else io.StringIO()
+        self.write(stream, messages, args)
+        return stream.getvalue()
+
+
+def emit_messages(formatter, messages):
+    """Emits messages to a started formatter, tracked as its stage if it has one."""
+    emitted = map(formatter.emit, messages)
+    stage = getattr(formatter, 'stage', None)
+    if stage is not None:
+        emitted = track(stage, emitted)
+    deque(emitted, maxlen=0)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+from ..parser.binary_parser import HEADER, LENGTH, MAGIC, MESSAGE, MESSAGE_TAG, STRING_TAG, VERSION
+from ..parser.clang_tidy_parser import ENCODING
+from ..parser.mapped_parser import MappedLines
+from .base import Formatter
+
+FLUSH_SIZE = 1 << 16
+
+
+class BinaryFormatter(Formatter):
+    """
+    Writes messages as a compact binary dump readable by BinaryDumpParser.
+    File paths, messages and diagnostic names are interned in a string table
+    and written once per dump; details lines are written as they are.
+    Unlike other formatters, writes to a binary stream.
+    """
+    binary = True
+
+    def begin(self, stream, args):
+        super().begin(stream, args)
+        self._strings = {}
+        self._new_strings = []
+        self._buffer = bytearray(HEADER.pack(MAGIC, VERSION))
+        self._record = bytearray()
+
+    def emit(self, message):
+        buffer = self._buffer
+        record = self._record
+        new_strings = self._new_strings
+        self._write_message(record, message, self._strings, new_strings)
+        # strings are defined right before the first record using them
+        for string in new_strings:
+            encoded = string.encode(ENCODING)
+            buffer.append(STRING_TAG)
+            buffer += LENGTH.pack(len(encoded))
+            buffer += encoded
+        new_strings.clear()
+        buffer.append(MESSAGE_TAG)
+        buffer += record
+        record.clear()
+        if len(buffer) >= FLUSH_SIZE:
+            self.stream.write(buffer)
+            buffer.clear()
+
+    def end(self):
+        self.stream.write(self._buffer)
+
+    def _write_message(self, record, message, strings, new_strings):
+        details_lines = message.details_lines
+        children = message.children
+        record += MESSAGE.pack(self._intern(message.filepath, strings, new_strings), message.line, message.column, message.level.value,
+                               self._intern(message.message, strings, new_strings),
+                               self._intern(message.diagnostic_name, strings, new_strings),
+                               len(details_lines), len(children))
+        lines = details_lines.iter_bytes() if isinstance(details_lines, MappedLines) else (line.encode(ENCODING) for line in details_lines)
+        for line in lines:
+            record += LENGTH.pack(len(line))
+            record += line
+        for child in children:
+            self._write_message(record, child, strings, new_strings)
+
+    def _intern(self, string, strings, new_strings):
+        index = strings.get(string)
+        if index is None:
+            index = strings[string] = len(strings)
+            new_strings.append(string)
+        return index
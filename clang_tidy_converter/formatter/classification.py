@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+from functools import lru_cache
+import json
+import re
+
+from ..parser import ClangMessage
+
+BUG_RISK_CATEGORY = 'Bug Risk'
+CLARITY_CATEGORY = 'Clarity'
+COMPATIBILITY_CATEGORY = 'Compatibility'
+COMPLEXITY_CATEGORY = 'Complexity'
+DUPLICATION_CATEGORY = 'Duplication'
+PERFORMANCE_CATEGORY = 'Performance'
+SECURITY_CATEGORY = 'Security'
+STYLE_CATEGORY = 'Style'
+
+# categories of the Code Climate specification
+CATEGORIES = (BUG_RISK_CATEGORY, CLARITY_CATEGORY, COMPATIBILITY_CATEGORY, COMPLEXITY_CATEGORY, DUPLICATION_CATEGORY,
+              PERFORMANCE_CATEGORY, SECURITY_CATEGORY, STYLE_CATEGORY)
+DEFAULT_CATEGORY = BUG_RISK_CATEGORY
+
+# (regex searched in the diagnostic name, category); categories of a name
+# are ordered as its matching rules
+CATEGORY_RULES = (
+    ('bugprone', BUG_RISK_CATEGORY),
+    ('modernize', COMPATIBILITY_CATEGORY),
+    ('portability', COMPATIBILITY_CATEGORY),
+    ('performance', PERFORMANCE_CATEGORY),
+    ('readability', CLARITY_CATEGORY),
+    ('cloexec', SECURITY_CATEGORY),
+    ('security', SECURITY_CATEGORY),
+    ('naming', STYLE_CATEGORY),
+    ('misc', STYLE_CATEGORY),
+    ('cppcoreguidelines', STYLE_CATEGORY),
+    ('hicpp', STYLE_CATEGORY),
+    ('simplify', COMPLEXITY_CATEGORY),
+    ('redundant', DUPLICATION_CATEGORY),
+    ('^boost-use-to-string', COMPATIBILITY_CATEGORY),
+)
+
+CODE_CLIMATE_SEVERITIES = {
+    ClangMessage.Level.NOTE: 'info',
+    ClangMessage.Level.REMARK: 'minor',
+    ClangMessage.Level.WARNING: 'major',
+    ClangMessage.Level.ERROR: 'critical',
+    ClangMessage.Level.FATAL: 'blocker',
+}
+
+SONARQUBE_SEVERITIES = {
+    ClangMessage.Level.NOTE: 'INFO',
+    ClangMessage.Level.REMARK: 'MINOR',
+    ClangMessage.Level.WARNING: 'MAJOR',
+    ClangMessage.Level.ERROR: 'CRITICAL',
+    ClangMessage.Level.FATAL: 'BLOCKER',
+}
+
+SARIF_LEVELS = {
+    ClangMessage.Level.NOTE: 'none',
+    ClangMessage.Level.REMARK: 'note',
+    ClangMessage.Level.WARNING: 'warning',
+    ClangMessage.Level.ERROR: 'error',
+    ClangMessage.Level.FATAL: 'error',
+}
+
+LEVEL_NAMES = {
+    ClangMessage.Level.UNKNOWN: 'Unknown',
+    ClangMessage.Level.NOTE: 'Note',
+    ClangMessage.Level.REMARK: 'Remark',
+    ClangMessage.Level.WARNING: 'Warning',
+    ClangMessage.Level.ERROR: 'Error',
+    ClangMessage.Level.FATAL: 'Fatal',
+}
+
+
+def load_category_map(path):
+    """
+    Reads category rules from a JSON object mapping regexes searched in
+    diagnostic names to a Code Climate category or a list of them, e.g.
+    {"^mycompany-": "Style", "-secure-": ["Security", "Bug Risk"]}.
+    Raises ValueError naming the key of an invalid regex or categories.
+    """
+    with open(path, encoding='utf-8') as stream:
+        mapping = json.load(stream)
+    if not isinstance(mapping, dict):
+        raise ValueError(f'{path}: expected a JSON object mapping regexes to categories')
+    rules = []
+    for pattern, categories in mapping.items():
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"{path}: invalid regex '{pattern}': {e}") from None
+        if isinstance(categories, str):
+            categories = [categories]
+        if not isinstance(categories, list):
+            raise ValueError(f"{path}: expected a category or a list of them for '{pattern}'")
+        for category in categories:
+            if category not in CATEGORIES:
+                raise ValueError(f"{path}: unknown category '{category}' for '{pattern}', expected one of {', '.join(CATEGORIES)}")
+            rules.append((pattern, category))
+    return rules
+
+
+class DiagnosticClassifier:
+    """
+    Assigns Code Climate categories to diagnostic names by CATEGORY_RULES.
+    Rules are compiled once and categories are memoized per diagnostic name,
+    so each distinct check is classified once per run. Categories are
+    ordered as the rules, without repeats, or DEFAULT_CATEGORY if no rule
+    matches.
+
+    Names matching any of custom_rules, e.g. from load_category_map(), get
+    only categories of the custom rules.
+    """
+    def __init__(self, custom_rules=(), cache_size=1 << 12):
+        self._custom_rules = _compile_rules(custom_rules)
+        self._rules = _compile_rules(CATEGORY_RULES)
+        self.categories = lru_cache(maxsize=cache_size)(self._categories)
+
+    def _categories(self, diagnostic_name):
+        categories = _match_rules(self._custom_rules, diagnostic_name) or _match_rules(self._rules, diagnostic_name)
+        return categories or (DEFAULT_CATEGORY,)
+
+
+def _compile_rules(rules):
+    return [(re.compile(pattern).search, category) for pattern, category in rules]
+
+
+def _match_rules(rules, diagnostic_name):
+    categories = []
+    for search, category in rules:
+        if category not in categories and search(diagnostic_name) is not None:
+            categories.append(category)
+    return tuple(categories)
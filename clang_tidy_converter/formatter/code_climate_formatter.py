@@ -1,22 +1,32 @@
 #!/usr/bin/env python3
 
-import json
-import hashlib
+from .base import Formatter
+from .classification import CODE_CLIMATE_SEVERITIES, DiagnosticClassifier
+from .fingerprint import Fingerprinter
+from .json_writer import JsonArrayWriter, dumps, indent_from_args
 
-from ..parser import ClangMessage
+class CodeClimateFormatter(Formatter):
+    stage = 'cc format'
 
-def remove_duplicates(l):
-    return list(set(l))
+    def __init__(self, fingerprinter=None, classifier=None):
+        self.fingerprinter = fingerprinter if fingerprinter is not None else Fingerprinter()
+        self.classifier = classifier if classifier is not None else DiagnosticClassifier()
 
-class CodeClimateFormatter:
-    def __init__(self):
-        pass
+    def begin(self, stream, args):
+        super().begin(stream, args)
+        self._indent = indent_from_args(args)
+        self._array = JsonArrayWriter(stream, self._indent) if args.as_json_array else None
 
-    def format(self, messages, args):
-        if args.as_json_array:
-            return json.dumps([self._format_message(msg, args) for msg in messages], indent=2)
+    def emit(self, message):
+        issue = self._format_message(message, self.args)
+        if self._array is not None:
+            self._array.write(issue)
         else:
-            return ''.join(json.dumps(self._format_message(msg, args), indent=2) + '\0\n' for msg in messages)
+            self.stream.write(dumps(issue, self._indent) + '\0\n')
+
+    def end(self):
+        if self._array is not None:
+            self._array.close()
 
     def _format_message(self, message, args):
         return {
@@ -33,7 +43,7 @@ class CodeClimateFormatter:
 
     def _extract_content(self, message, args):
         return {
-            'body': '\n'.join(['```'] + message.details_lines + self._messages_to_text(message.children) + ['```'])
+            'body': '\n'.join(['```', *message.details_lines, *self._messages_to_text(message.children), '```'])
         }
 
     def _messages_to_text(self, messages):
@@ -45,47 +55,7 @@ class CodeClimateFormatter:
         return text_lines
 
     def _extract_categories(self, message, args):
-        BUGRISC_CATEGORY='Bug Risk'
-        CLARITY_CATEGORY='Clarity'
-        COMPATIBILITY_CATEGORY='Compatibility'
-        COMPLEXITY_CATEGORY='Complexity'
-        DUPLICATION_CATEGORY='Duplication'
-        PERFORMANCE_CATEGORY='Performance'
-        SECURITY_CATEGORY='Security'
-        STYLE_CATEGORY='Style'
-
-        categories = []
-        if 'bugprone' in message.diagnostic_name:
-            categories.append(BUGRISC_CATEGORY)
-        if 'modernize' in message.diagnostic_name:
-            categories.append(COMPATIBILITY_CATEGORY)
-        if 'portability' in message.diagnostic_name:
-            categories.append(COMPATIBILITY_CATEGORY)
-        if 'performance' in message.diagnostic_name:
-            categories.append(PERFORMANCE_CATEGORY)
-        if 'readability' in message.diagnostic_name:
-            categories.append(CLARITY_CATEGORY)
-        if 'cloexec' in message.diagnostic_name:
-            categories.append(SECURITY_CATEGORY)
-        if 'security' in message.diagnostic_name:
-            categories.append(SECURITY_CATEGORY)
-        if 'naming' in message.diagnostic_name:
-            categories.append(STYLE_CATEGORY)
-        if 'misc' in message.diagnostic_name:
-            categories.append(STYLE_CATEGORY)
-        if 'cppcoreguidelines' in message.diagnostic_name:
-            categories.append(STYLE_CATEGORY)
-        if 'hicpp' in message.diagnostic_name:
-            categories.append(STYLE_CATEGORY)
-        if 'simplify' in message.diagnostic_name:
-            categories.append(COMPLEXITY_CATEGORY)
-        if 'redundant' in message.diagnostic_name:
-            categories.append(DUPLICATION_CATEGORY)
-        if message.diagnostic_name.startswith('boost-use-to-string'):
-            categories.append(COMPATIBILITY_CATEGORY)
-        if len(categories) == 0:
-            categories.append(BUGRISC_CATEGORY)
-        return remove_duplicates(categories)
+        return list(self.classifier.categories(message.diagnostic_name))
 
     def _extract_trace(self, message, args):
         return {
@@ -117,24 +87,7 @@ class CodeClimateFormatter:
         return location
 
     def _extract_severity(self, message, args):
-        if message.level == ClangMessage.Level.NOTE:
-            return 'info'
-        if message.level == ClangMessage.Level.REMARK:
-            return 'minor'
-        if message.level == ClangMessage.Level.WARNING:
-            return 'major'
-        if message.level == ClangMessage.Level.ERROR:
-            return 'critical'
-        if message.level == ClangMessage.Level.FATAL:
-            return 'blocker'
+        return CODE_CLIMATE_SEVERITIES.get(message.level)
 
     def _generate_fingerprint(self, message):
-        h = hashlib.md5()
-        h.update(message.filepath.encode('utf8'))
-        h.update(str(message.line).encode('utf8'))
-        h.update(str(message.column).encode('utf8'))
-        h.update(message.message.encode('utf8'))
-        h.update(message.diagnostic_name.encode('utf8'))
-        for child in message.children:
-            h.update(self._generate_fingerprint(child).encode('utf-8'))
-        return h.hexdigest()
+        return self.fingerprinter.fingerprint(message)
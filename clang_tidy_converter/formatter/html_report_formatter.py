@@ -1,29 +1,54 @@
-from ..parser import ClangMessage
+from ..parser import MessageTable
+from .base import Formatter
+from .classification import LEVEL_NAMES
 
-from collections import defaultdict
 from datetime import date
 import html
+import json
 import re
 
 
 NEWLINE = '\n';
 
+REPORTS_TABLE_HEAD = """<table style="table-layout:auto">
+<thead><tr>
+  <td>Bug Severity</td>
+  <td>Diagnostic Name</td>
+  <td>Bug Description</td>
+  <td>File</td>
+  <td class="Q">Line</td>
+  <td class="Q">Column</td>
+  <td class="Q">Notes</td>
+</tr></thead>
+<tbody>
+"""
+
 
-class HTMLReportFormatter:
-    def __init__(self):
-        pass
+class HTMLReportFormatter(Formatter):
+    """
+    The report starts with the bug summary, so messages are kept in a
+    compact MessageTable until end().
+    """
+    def begin(self, stream, args):
+        super().begin(stream, args)
+        self._messages = MessageTable()
 
-    def format(self, messages, args):
-        by_level = _group_messages(messages)
+    def emit(self, message):
+        self._messages.append(message)
 
-        title = "Static Analysis Results"
-        if len(args.software_name) > 0:
-            title = f"{args.software_name} - {title}"
+    def end(self):
+        self._write_report(self.stream, self._messages, self.args)
 
-        return f"""<html>
+    def _write_report(self, stream, messages, args):
+        by_level = _count_messages(messages)
+        title = _title(args)
+
+        virtualized_head = f"\n{_virtualized_style()}\n{_virtualized_script()}" if args.virtualized else ""
+
+        stream.write(f"""<html>
 <head>
 {_style()}
-{_script()}
+{_script()}{virtualized_head}
 <title>{title}</title>
 </head>
 <body>
@@ -38,12 +63,45 @@ class HTMLReportFormatter:
 <table>
 <thead><tr><td>Diagnostic Name</td><td>Quantity</td><td>Display?</td></tr></thead>
 <tbody>
-{NEWLINE.join(_format_level_group(level, msgs) for level, msgs in by_level.items())}
+{_format_summary(by_level)}
 </tbody>
 </table>
 
 <h2>Reports</h2>
-<table style="table-layout:auto">
+""")
+        if args.virtualized:
+            _write_virtualized_reports(stream, messages)
+        else:
+            _write_reports(stream, messages)
+        stream.write("""
+</body></html>
+""")
+
+
+def _write_reports(stream, messages):
+    stream.write(REPORTS_TABLE_HEAD)
+    _write_lines(stream, (_format_message(msg) for msg in messages))
+    stream.write("""
+</tbody>
+</table>
+""")
+
+
+def _write_virtualized_reports(stream, messages):
+    """
+    Writes reports as a JSON data block rendered by the embedded script one
+    page at a time, drawing only the rows scrolled into view. The data block
+    contains issues as [group, description, file, line, column] arrays, where
+    group and file refer to the groups and files tables, and an index of
+    issues by group (level and diagnostic name) used for filtering.
+    """
+    stream.write("""<div id="pager">
+<button onclick="ShowPage(page - 1);">&lt; Previous</button>
+<span id="pageInfo"></span>
+<button onclick="ShowPage(page + 1);">Next &gt;</button>
+</div>
+<table class="VIRTUAL">
+<colgroup><col class="SEVERITY"><col class="NAME"><col><col class="FILE"><col class="NUM"><col class="NUM"><col class="NUM"></colgroup>
 <thead><tr>
   <td>Bug Severity</td>
   <td>Diagnostic Name</td>
@@ -53,62 +111,92 @@ class HTMLReportFormatter:
   <td class="Q">Column</td>
   <td class="Q">Notes</td>
 </tr></thead>
-<tbody>
-{NEWLINE.join(_format_message(msg) for msg in messages)}
-</tbody>
 </table>
-
-</body></html>
-"""
+<div id="viewport"><div id="spacer"></div>
+<table class="VIRTUAL" id="rowsTable">
+<colgroup><col class="SEVERITY"><col class="NAME"><col><col class="FILE"><col class="NUM"><col class="NUM"><col class="NUM"></colgroup>
+<tbody id="rows"></tbody>
+</table>
+</div>
+<script type="application/json" id="issues">{"issues":[""")
+    groups = {}
+    files = {}
+    index = []
+    separator = ''
+    for i, msg in enumerate(messages):
+        group = groups.get((msg.level, msg.diagnostic_name))
+        if group is None:
+            group = groups[(msg.level, msg.diagnostic_name)] = len(groups)
+            index.append([])
+        index[group].append(i)
+        file = files.setdefault(msg.filepath, len(files))
+        stream.write(separator)
+        stream.write(_script_json([group, msg.message, file, msg.line, msg.column]))
+        separator = ','
+    stream.write('],"groups":')
+    stream.write(_script_json([[_mangle_group(level, name), _level_name(level), name] for level, name in groups]))
+    stream.write(',"files":')
+    stream.write(_script_json(list(files)))
+    stream.write(',"index":')
+    stream.write(_script_json(index))
+    stream.write("""}</script>
+<script language="javascript" type="text/javascript">InitReports();</script>
+""")
+
+
+def _script_json(obj):
+    return json.dumps(obj, separators=(',', ':')).replace('</', '<\\/')
+
+
+def _write_lines(stream, lines):
+    separator = ''
+    for line in lines:
+        stream.write(separator)
+        stream.write(line)
+        separator = NEWLINE
+
+
+def _title(args):
+    title = "Static Analysis Results"
+    if len(args.software_name) > 0:
+        title = f"{args.software_name} - {title}"
+    return title
+
+
+def _count_messages(messages):
+    counts = {}
+    for m in messages:
+        _count_message(counts, m)
+    return counts
 
 
-def _group_messages(messages):
-    groupped = _group_messages_by_level(messages)
-    return {k: _group_messages_by_diagnostic_name(m) for k, m in groupped.items()}
+def _count_message(counts, message):
+    """Counts message by level and diagnostic name, keeping the order of first occurrence."""
+    by_name = counts.setdefault(message.level, {})
+    by_name[message.diagnostic_name] = by_name.get(message.diagnostic_name, 0) + 1
 
 
-def _group_messages_by_level(messages):
-    groupped = defaultdict(list)
-    for m in messages:
-        groupped[m.level].append(m)
-    return groupped
+def _format_summary(counts):
+    return NEWLINE.join(_format_level_group(level, by_name) for level, by_name in counts.items())
 
 
-def _group_messages_by_diagnostic_name(messages):
-    groupped = defaultdict(list)
-    for m in messages:
-        groupped[m.diagnostic_name].append(m)
-    return groupped
-
-
-def _format_level_group(level, messages):
+def _format_level_group(level, counts):
     return f"""<tr>
     <th class="SUMM_DESC">{_level_name(level)}</th>
-    <th class="Q">{sum(len(msgs) for msgs in messages.values())}</th>
+    <th class="Q">{sum(counts.values())}</th>
     <th><center><input type="checkbox" class="{_mangle_group(level, '')}" onclick="CopyCheckedStateToCheckButtons(this);" checked=""></center></th>
 </tr>
-{NEWLINE.join(_format_diagnostic_group(level, name, msgs) for name, msgs in messages.items())}"""
+{NEWLINE.join(_format_diagnostic_group(level, name, count) for name, count in counts.items())}"""
 
 
 def _level_name(level):
-    if level == ClangMessage.Level.NOTE:
-        return "Note"
-    elif level == ClangMessage.Level.REMARK:
-        return "Remark"
-    elif level == ClangMessage.Level.WARNING:
-        return "Warning"
-    elif level == ClangMessage.Level.ERROR:
-        return "Error"
-    elif level == ClangMessage.Level.FATAL:
-        return "Fatal"
-    else:
-        return "Unknown"
-
-
-def _format_diagnostic_group(level, diagnostic_name, messages):
+    return LEVEL_NAMES.get(level, 'Unknown')
+
+
+def _format_diagnostic_group(level, diagnostic_name, count):
     return f"""<tr>
     <td class="SUMM_DESC">{diagnostic_name}</td>
-    <td class="Q">{len(messages)}</td>
+    <td class="Q">{count}</td>
     <td><center><input type="checkbox" class="{_mangle_group(level, diagnostic_name)}" onclick="ToggleDisplay(this); CopyCheckedStateFromCheckButtons('{_mangle_group(level, '')}');" checked=""></center></td>
 </tr>"""
 
@@ -257,3 +345,115 @@ function ToggleDisplay(checkButton) {
   }
 }
 </script>"""
+
+
+def _virtualized_style():
+    return """<style>
+table.VIRTUAL { width: 100%; table-layout: fixed; border-bottom: 0 }
+table.VIRTUAL td { height: 12px; line-height: 12px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis }
+col.SEVERITY { width: 8em }
+col.NAME { width: 22em }
+col.FILE { width: 30em }
+col.NUM { width: 5em }
+#pager { margin-bottom: 5px }
+#viewport { position: relative; height: 70vh; overflow-y: auto; border: 1px solid black; border-top: 0 }
+#spacer { width: 1px }
+#rowsTable { position: absolute; top: 0; left: 0; border: 0 }
+</style>"""
+
+
+def _virtualized_script():
+    return """<script language="javascript" type="text/javascript">
+var ROW_HEIGHT = 22;
+var PAGE_SIZE = 1000;
+var OVERSCAN = 20;
+var data;
+var groupByClass = {};
+var enabled = [];
+var visible = new Int32Array(0);
+var page = 0;
+var filterScheduled = false;
+
+function InitReports() {
+  data = JSON.parse(document.getElementById("issues").textContent);
+  for (var g = 0; g < data.groups.length; ++g) {
+    groupByClass[data.groups[g][0]] = g;
+    enabled.push(true);
+  }
+  document.getElementById("viewport").onscroll = RenderRows;
+  window.onresize = RenderRows;
+  Filter();
+}
+
+function ToggleDisplay(checkButton) {
+  var g = groupByClass[checkButton.className];
+  if (g === undefined) {
+    return;
+  }
+  enabled[g] = checkButton.checked;
+  if (!filterScheduled) {
+    filterScheduled = true;
+    setTimeout(Filter, 0);
+  }
+}
+
+function Filter() {
+  filterScheduled = false;
+  var count = 0;
+  for (var g = 0; g < enabled.length; ++g) {
+    if (enabled[g]) {
+      count += data.index[g].length;
+    }
+  }
+  visible = new Int32Array(count);
+  count = 0;
+  for (var g = 0; g < enabled.length; ++g) {
+    if (enabled[g]) {
+      visible.set(data.index[g], count);
+      count += data.index[g].length;
+    }
+  }
+  visible.sort();
+  ShowPage(page);
+}
+
+function PageCount() {
+  return Math.max(1, Math.ceil(visible.length / PAGE_SIZE));
+}
+
+function ShowPage(newPage) {
+  page = Math.min(Math.max(newPage, 0), PageCount() - 1);
+  document.getElementById("pageInfo").textContent =
+    "Page " + (page + 1) + " of " + PageCount() + " (" + visible.length + " reports)";
+  var count = Math.min(PAGE_SIZE, visible.length - page * PAGE_SIZE);
+  document.getElementById("spacer").style.height = (count * ROW_HEIGHT) + "px";
+  document.getElementById("viewport").scrollTop = 0;
+  RenderRows();
+}
+
+function Escape(text) {
+  return String(text).replace(/&/g, "&amp;").replace(/</g, "&lt;").replace(/>/g, "&gt;").replace(/"/g, "&quot;");
+}
+
+function RenderRows() {
+  var viewport = document.getElementById("viewport");
+  var begin = page * PAGE_SIZE;
+  var count = Math.max(0, Math.min(PAGE_SIZE, visible.length - begin));
+  var first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+  var last = Math.min(count, first + Math.ceil(viewport.clientHeight / ROW_HEIGHT) + 2 * OVERSCAN);
+  var rows = [];
+  for (var i = first; i < last; ++i) {
+    var issue = data.issues[visible[begin + i]];
+    var group = data.groups[issue[0]];
+    var file = data.files[issue[2]];
+    rows.push('<tr class="' + group[0] + '">' +
+      '<td class="DESC">' + Escape(group[1]) + '</td>' +
+      '<td class="DESC" title="' + Escape(group[2]) + '">' + Escape(group[2]) + '</td>' +
+      '<td title="' + Escape(issue[1]) + '">' + Escape(issue[1]) + '</td>' +
+      '<td title="' + Escape(file) + '">' + Escape(file) + '</td>' +
+      '<td class="Q">' + issue[3] + '</td><td class="Q">' + issue[4] + '</td><td></td></tr>');
+  }
+  document.getElementById("rowsTable").style.top = (first * ROW_HEIGHT) + "px";
+  document.getElementById("rows").innerHTML = rows.join("");
+}
+</script>"""
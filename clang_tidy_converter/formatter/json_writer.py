@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import json
+
+ITEMS = '\0items\0'
+
+
+def indent_from_args(args):
+    # args of formatters used as a library may lack options added later
+    return None if getattr(args, 'compact', False) else 2
+
+
+def dumps(obj, indent=2):
+    """Serializes obj indented by indent spaces, or as compact as possible if indent is None."""
+    if indent is None:
+        return json.dumps(obj, separators=(',', ':'))
+    return json.dumps(obj, indent=indent)
+
+
+def write_json_array(stream, items, indent=2, offset=0):
+    """
+    Writes items one by one as a JSON array. The output is identical to
+    dumps(list(items), indent) nested `offset` spaces deep.
+    """
+    writer = JsonArrayWriter(stream, indent, offset)
+    for item in items:
+        writer.write(item)
+    writer.close()
+
+
+def write_json_document(stream, document, items, indent=2):
+    """
+    Writes document with the ITEMS placeholder value replaced by a JSON array
+    of items, without materializing the items.
+    """
+    writer = JsonDocumentWriter(stream, document, indent)
+    for item in items:
+        writer.write(item)
+    writer.close()
+
+
+class JsonArrayWriter:
+    """Writes a JSON array item by item as write_json_array() does."""
+    def __init__(self, stream, indent=2, offset=0):
+        self._stream = stream
+        self._indent = indent
+        self._offset = offset
+        self._item_pad = None if indent is None else '\n' + ' ' * (offset + indent)
+        self._separator = '[' if indent is None else '[' + self._item_pad
+        self._empty = True
+
+    def write(self, item):
+        self._stream.write(self._separator)
+        if self._item_pad is None:
+            self._stream.write(dumps(item, None))
+            self._separator = ','
+        else:
+            self._stream.write(json.dumps(item, indent=self._indent).replace('\n', self._item_pad))
+            self._separator = ',' + self._item_pad
+        self._empty = False
+
+    def close(self):
+        if self._empty:
+            self._stream.write('[]')
+        elif self._item_pad is None:
+            self._stream.write(']')
+        else:
+            self._stream.write('\n' + ' ' * self._offset + ']')
+
+
+class JsonDocumentWriter:
+    """
+    Writes document item by item as write_json_document() does. Other
+    placeholder values of document after ITEMS, e.g. tables collected while
+    writing the items, are replaced by the values passed to close().
+    """
+    def __init__(self, stream, document, indent=2):
+        head, self._tail = dumps(document, indent).split(json.dumps(ITEMS))
+        stream.write(head)
+        self._stream = stream
+        self._indent = indent
+        self._array = JsonArrayWriter(stream, indent, _line_offset(head, len(head)))
+        self.write = self._array.write
+
+    def close(self, values=None):
+        self._array.close()
+        tail = self._tail
+        for placeholder, value in (values or {}).items():
+            start = tail.index(json.dumps(placeholder))
+            serialized = dumps(value, self._indent)
+            if self._indent is not None:
+                serialized = serialized.replace('\n', '\n' + ' ' * _line_offset(tail, start))
+            tail = tail[:start] + serialized + tail[start + len(json.dumps(placeholder)):]
+        self._stream.write(tail)
+
+
+def _line_offset(text, pos):
+    """Returns the indentation of the line of text containing pos."""
+    line = text[text.rfind('\n', 0, pos) + 1:pos]
+    return len(line) - len(line.lstrip(' '))
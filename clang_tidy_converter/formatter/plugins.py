@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def find_entry_points(group):
+    """
+    Returns {name: importlib.metadata.EntryPoint} of entry points in group
+    of the installed distributions, the first one of each name.
+    """
+    # imported here, as it is only needed once per run
+    from importlib.metadata import entry_points
+    try:
+        found = entry_points(group=group)
+    except TypeError:
+        # before Python 3.10, entry_points() returns all groups
+        found = entry_points().get(group, ())
+    result = {}
+    for entry_point in found:
+        result.setdefault(entry_point.name, entry_point)
+    return result
@@ -1,49 +1,96 @@
 #!/usr/bin/env python3
 
-import json
-
 from ..parser import ClangMessage
+from .base import Formatter
+from .classification import SARIF_LEVELS
+from .json_writer import ITEMS, JsonDocumentWriter, indent_from_args
+
+CHECKS_DOCUMENTATION_URL = 'https://clang.llvm.org/extra/clang-tidy/checks/'
+RULES = '\0rules\0'
+ARTIFACTS = '\0artifacts\0'
 
 
-class SarifFormatter:
+class SarifFormatter(Formatter):
     """
     Follows the SARIF format as used by SonarQube
     https://docs.sonarsource.com/sonarqube/latest/analyzing-source-code/importing-external-issues/importing-issues-from-sarif-reports/
+
+    With args.indexed, results refer to rules by ruleIndex and to files by
+    artifact index, and the tables of rules and artifacts are written after
+    the results, as they are complete only after the last one.
     """
 
-    def format(self, messages, args):
-        return json.dumps({
-            "version": "2.1.0",
-            "runs": [{
-                "tool": {"driver": {"name": "clang-tidy"}},
-                "results": [self._format_message(msg, args) for msg in messages]
-            }]
-        }, indent=2)
+    stage = 'sarif format'
+
+    def begin(self, stream, args):
+        super().begin(stream, args)
+        # args of formatters used as a library may lack options added later
+        self._indexed = getattr(args, 'indexed', False)
+        self._baseline_index = getattr(args, 'baseline_index', None)
+        if self._indexed:
+            # tables of rules and files are known after the last result
+            run = {"results": ITEMS, "tool": {"driver": {"name": "clang-tidy", "rules": RULES}}, "artifacts": ARTIFACTS}
+            self._rules = {}
+            self._artifacts = {}
+        else:
+            run = {"tool": {"driver": {"name": "clang-tidy"}}, "results": ITEMS}
+        self._writer = JsonDocumentWriter(stream, {"version": "2.1.0", "runs": [run]}, indent_from_args(args))
+
+    def emit(self, message):
+        self._writer.write(self._format_message(message, self.args))
+
+    def end(self):
+        if not self._indexed:
+            self._writer.close()
+            return
+        self._writer.close({
+            RULES: [_rule(name) for name in self._rules],
+            ARTIFACTS: [{"location": {"uri": "file://" + filepath}} for filepath in self._artifacts],
+        })
 
     def _format_message(self, message: ClangMessage, args):
-        return {
+        result = {
             "message": {"text": message.message},
             "ruleId": message.diagnostic_name,
-            "locations": [self._format_location(msg, args) for msg in [
-                message, *message.children]],
-            "level": self._convert_level(message.level),
         }
+        if self._indexed and message.diagnostic_name:
+            result["ruleIndex"] = self._rules.setdefault(message.diagnostic_name, len(self._rules))
+        if self._indexed:
+            # the message of the main location would repeat the message of the result
+            main = self._format_location(message, args)
+            del main["message"]
+            result["locations"] = [main, *(self._format_location(msg, args) for msg in message.children)]
+        else:
+            result["locations"] = [self._format_location(msg, args) for msg in [message, *message.children]]
+        result["level"] = SARIF_LEVELS.get(message.level, "")
+        if self._baseline_index is not None:
+            result["baselineState"] = self._baseline_index.state(message)
+        return result
 
     def _format_location(self, message, args):
+        if self._indexed:
+            artifact = {"index": self._artifacts.setdefault(message.filepath, len(self._artifacts))}
+            text = {"text": message.message}
+        else:
+            # a plain string, as in the output of earlier versions
+            artifact = {"uri": "file://" + message.filepath}
+            text = message.message
         return {
-            "message": message.message,
-            "artifactLocation": {"uri": "file://" + message.filepath},
+            "message": text,
+            "artifactLocation": artifact,
             "region": {
                 "startLine": message.line,
                 "startColumn": message.column,
             },
         }
 
-    def _convert_level(self, level, default=""):
-        return {
-            ClangMessage.Level.NOTE: "none",
-            ClangMessage.Level.REMARK: "note",
-            ClangMessage.Level.WARNING: "warning",
-            ClangMessage.Level.ERROR: "error",
-            ClangMessage.Level.FATAL: "error",
-        }.get(level, default)
+
+def _rule(name):
+    rule = {"id": name}
+    group, _, check = name.partition('-')
+    if group == 'clang' and check.startswith('analyzer-'):
+        group, check = 'clang-analyzer', check[len('analyzer-'):]
+    # diagnostics of the compiler and lists of aliases have no page
+    if check and group != 'clang' and ',' not in name:
+        rule["helpUri"] = f'{CHECKS_DOCUMENTATION_URL}{group}/{check}.html'
+    return rule
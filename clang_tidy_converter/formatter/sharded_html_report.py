@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+from collections import OrderedDict
+from datetime import date
+import html
+import os
+import re
+import shutil
+import tempfile
+
+from . import SHARD_KINDS
+from .html_report_formatter import REPORTS_TABLE_HEAD, _count_message, _format_message, _format_summary, _script, _style, _title
+
+MAX_OPEN_SPILL_FILES = 64
+
+
+class ShardedHTMLReportWriter:
+    """
+    Writes HTML report to a directory: index.html with the bug summary and a
+    page per source file or directory. While reading messages, their rows are
+    spilled to a temporary file per shard; each page is then streamed from its
+    spill file, so memory use does not grow with the report. Pages may be
+    written by several worker processes.
+
+    Implements the streaming protocol of formatter.base.Formatter, except
+    that the stream is not used.
+    """
+    def __init__(self, output_dir, shard_by='file', jobs=1):
+        if shard_by not in SHARD_KINDS:
+            raise ValueError(f'unsupported shard kind: {shard_by}')
+        self.output_dir = output_dir
+        self.shard_by = shard_by
+        self.jobs = jobs
+
+    def write(self, messages, args):
+        self.begin(None, args)
+        try:
+            for message in messages:
+                self.emit(message)
+        except BaseException:
+            self._close_spill_files()
+            self._spill_dir.cleanup()
+            raise
+        self.end()
+
+    def begin(self, stream, args):
+        self._title = _title(args)
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._spill_dir = tempfile.TemporaryDirectory(dir=self.output_dir)
+        self._counts = {}
+        self._shards = {}
+        self._spill_files = OrderedDict()
+
+    def emit(self, message):
+        _count_message(self._counts, message)
+        key = self._shard_key(message.filepath)
+        shard = self._shards.get(key)
+        if shard is None:
+            shard = self._shards[key] = [_page_name(len(self._shards), key), 0]
+        shard[1] += 1
+        _spill_file(self._spill_files, os.path.join(self._spill_dir.name, shard[0])).write(_format_message(message) + '\n')
+
+    def end(self):
+        try:
+            self._close_spill_files()
+            self._write_index(self._title, self._counts, self._shards)
+            tasks = [(os.path.join(self._spill_dir.name, page), os.path.join(self.output_dir, page), self._title, key)
+                     for key, (page, _) in self._shards.items()]
+            if self.jobs > 1 and len(tasks) > 1:
+                from concurrent.futures import ProcessPoolExecutor
+                with ProcessPoolExecutor(self.jobs) as pool:
+                    list(pool.map(_write_shard_page, tasks))
+            else:
+                for task in tasks:
+                    _write_shard_page(task)
+        finally:
+            self._spill_dir.cleanup()
+
+    def _close_spill_files(self):
+        for spill_file in self._spill_files.values():
+            spill_file.close()
+        self._spill_files.clear()
+
+    def _shard_key(self, filepath):
+        if self.shard_by == 'directory':
+            return os.path.dirname(filepath) or '.'
+        return filepath
+
+    def _write_index(self, title, counts, shards):
+        shard_kind = self.shard_by.capitalize()
+        with open(os.path.join(self.output_dir, 'index.html'), 'w', encoding='utf-8') as index:
+            index.write(f"""<html>
+<head>
+{_style()}
+{_script()}
+<title>{title}</title>
+</head>
+<body>
+<h1>{title}</h1>
+
+<table>
+<tbody>
+<tr><th>Date:</th><td>{date.today()}</td></tr>
+</tbody></table>
+
+<h2>Bug Summary</h2>
+<table>
+<thead><tr><td>Diagnostic Name</td><td>Quantity</td><td>Display?</td></tr></thead>
+<tbody>
+{_format_summary(counts)}
+</tbody>
+</table>
+
+<h2>Reports by {shard_kind}</h2>
+<table style="table-layout:auto">
+<thead><tr><td>{shard_kind}</td><td class="Q">Quantity</td></tr></thead>
+<tbody>
+""")
+            for key, (page, count) in shards.items():
+                index.write(f'<tr><td class="SMASH"><a href="{page}">{html.escape(key)}</a></td><td class="Q">{count}</td></tr>\n')
+            index.write("""</tbody>
+</table>
+
+</body></html>
+""")
+
+
+def _page_name(index, key):
+    return f"{index:05d}_{re.sub(r'[^A-Za-z0-9_.-]+', '_', key).strip('_')[-64:]}.html"
+
+
+def _spill_file(spill_files, path):
+    """Returns spill file opened for appending, keeping at most MAX_OPEN_SPILL_FILES open."""
+    spill_file = spill_files.get(path)
+    if spill_file is not None:
+        spill_files.move_to_end(path)
+        return spill_file
+    if len(spill_files) >= MAX_OPEN_SPILL_FILES:
+        spill_files.popitem(last=False)[1].close()
+    spill_file = spill_files[path] = open(path, 'a', encoding='utf-8')
+    return spill_file
+
+
+def _write_shard_page(task):
+    spill_path, page_path, title, key = task
+    with open(page_path, 'w', encoding='utf-8') as page, open(spill_path, encoding='utf-8') as rows:
+        page.write(f"""<html>
+<head>
+{_style()}
+{_script()}
+<title>{html.escape(key)} - {title}</title>
+</head>
+<body>
+<h1>{html.escape(key)}</h1>
+<p><a href="index.html">{title}</a></p>
+
+<h2>Reports</h2>
+{REPORTS_TABLE_HEAD}""")
+        shutil.copyfileobj(rows, page)
+        page.write("""</tbody>
+</table>
+
+</body></html>
+""")
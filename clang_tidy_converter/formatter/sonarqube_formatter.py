@@ -1,18 +1,28 @@
 #!/usr/bin/env python3
 
-import json
-
 from ..parser import ClangMessage
+from .base import Formatter
+from .classification import SONARQUBE_SEVERITIES
+from .json_writer import ITEMS, JsonDocumentWriter, indent_from_args
 
 
-class SonarQubeFormatter:
+class SonarQubeFormatter(Formatter):
     """
     The JSON format used to import external issues into SonarQube
     https://docs.sonarsource.com/sonarqube/latest/analyzing-source-code/importing-external-issues/generic-issue-import-format/
     """
 
-    def format(self, messages, args):
-        return json.dumps({"issues": [self._format_message(msg, args) for msg in messages]}, indent=2)
+    stage = 'sq format'
+
+    def begin(self, stream, args):
+        super().begin(stream, args)
+        self._writer = JsonDocumentWriter(stream, {"issues": ITEMS}, indent_from_args(args))
+
+    def emit(self, message):
+        self._writer.write(self._format_message(message, self.args))
+
+    def end(self):
+        self._writer.close()
 
     def _format_message(self, message: ClangMessage, args):
         return {
@@ -20,7 +30,7 @@ class SonarQubeFormatter:
             "ruleId": message.diagnostic_name,  # String
             "primaryLocation": self._format_location(message, args),  # Location object
             "type": "CODE_SMELL",  # String. One of BUG, VULNERABILITY, CODE_SMELL
-            "severity": self._level_to_severity(message.level),  # String. One of BLOCKER, CRITICAL, MAJOR, MINOR, INFO
+            "severity": SONARQUBE_SEVERITIES.get(message.level, "BLOCKER"),  # String. One of BLOCKER, CRITICAL, MAJOR, MINOR, INFO
             # "effortMinutes": "", # Integer, optional. Defaults to 0
             "secondaryLocations": [self._format_location(msg, args) for msg in message.children],  # Array of Location objects, optional
             # "_details": message.details_lines
@@ -42,12 +52,3 @@ class SonarQubeFormatter:
             "filePath": message.filepath,
             "textRange": range,
         }
-
-    def _level_to_severity(self, level, default="BLOCKER"):
-        return {
-            ClangMessage.Level.NOTE: "INFO",
-            ClangMessage.Level.REMARK: "MINOR",
-            ClangMessage.Level.WARNING: "MAJOR",
-            ClangMessage.Level.ERROR: "CRITICAL",
-            ClangMessage.Level.FATAL: "BLOCKER",
-        }.get(level, default)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+import importlib
+import sys
+
+
+def lazy_attributes(module_name, attributes):
+    """
+    Returns __getattr__ and __dir__ functions for module module_name, which
+    import attributes given as {name: relative module} on first access, so
+    that importing a package does not import all of its modules.
+    """
+    module_globals = sys.modules[module_name].__dict__
+
+    def __getattr__(name):
+        module = attributes.get(name)
+        if module is None:
+            raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+        value = module_globals[name] = getattr(importlib.import_module(module, module_name), name)
+        return value
+
+    def __dir__():
+        return sorted(set(module_globals) | set(attributes))
+
+    return __getattr__, __dir__
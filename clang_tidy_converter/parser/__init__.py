@@ -1 +1,7 @@
 from .clang_tidy_parser import ClangTidyParser, ClangMessage
+from .mapped_parser import MappedClangTidyParser
+from .parallel_parser import ParallelClangTidyParser
+from .message_table import MessageTable
+from .binary_parser import BinaryDumpParser
+from .path_resolver import PathResolver
+from .push_parser import PushClangTidyParser
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import struct
+
+from .clang_tidy_parser import ClangMessage, ENCODING
+from .mapped_parser import MappedLines
+
+# A dump is the header followed by records, each starting with a tag byte.
+# A string record defines the next string of the string table, and is written
+# before the first message record referring to it. A message record is a
+# message followed by its details lines and, recursively, its children.
+MAGIC = b'CTCDUMP\0'
+VERSION = 1
+HEADER = struct.Struct('<8sI')
+STRING_TAG = ord('S')
+MESSAGE_TAG = ord('M')
+# filepath, line, column, level, message, diagnostic name (string table
+# indices except line, column and level), details lines and children counts
+MESSAGE = struct.Struct('<IiiBIIII')
+LENGTH = struct.Struct('<I')
+
+
+def is_binary_dump(data, begin=0):
+    return data[begin:begin + len(MAGIC)] == MAGIC
+
+
+class BinaryDumpParser:
+    """
+    Reads messages from a binary dump written by BinaryFormatter, usually a
+    memory-mapped file. Strings are decoded once per dump; details lines are
+    kept as MappedLines and decoded only on access. File paths are rewritten
+    by path_resolver, if any, once per distinct path.
+    """
+    def __init__(self, path_resolver=None):
+        self.path_resolver = path_resolver
+
+    def iter_messages(self, data, begin=0):
+        if not is_binary_dump(data, begin):
+            raise ValueError('not a clang-tidy-converter binary dump')
+        _, version = HEADER.unpack_from(data, begin)
+        if version != VERSION:
+            raise ValueError(f'unsupported binary dump version: {version}')
+        strings = []
+        self._paths = {}
+        pos = begin + HEADER.size
+        end = len(data)
+        while pos < end:
+            tag = data[pos]
+            if tag == STRING_TAG:
+                (length,) = LENGTH.unpack_from(data, pos + 1)
+                pos += 1 + LENGTH.size
+                strings.append(str(data[pos:pos + length], ENCODING))
+                pos += length
+            elif tag == MESSAGE_TAG:
+                message, pos = self._read_message(data, pos + 1, strings)
+                yield message
+            else:
+                raise ValueError(f'corrupted binary dump at offset {pos}')
+
+    def parse(self, data, begin=0):
+        return list(self.iter_messages(data, begin))
+
+    def _read_message(self, data, pos, strings):
+        filepath, line, column, level, message, diagnostic_name, details_count, children_count = MESSAGE.unpack_from(data, pos)
+        pos += MESSAGE.size
+        details_lines = None
+        if details_count > 0:
+            details_lines = MappedLines(data)
+            for _ in range(details_count):
+                (length,) = LENGTH.unpack_from(data, pos)
+                pos += LENGTH.size
+                details_lines.append_span(pos, pos + length)
+                pos += length
+        children = None
+        if children_count > 0:
+            children = []
+            for _ in range(children_count):
+                child, pos = self._read_message(data, pos, strings)
+                children.append(child)
+        return ClangMessage(self._path(strings, filepath), line, column, ClangMessage.Level(level), strings[message], strings[diagnostic_name],
+                            details_lines, children), pos
+
+    def _path(self, strings, index):
+        if self.path_resolver is None:
+            return strings[index]
+        path = self._paths.get(index)
+        if path is None:
+            path = self._paths[index] = self.path_resolver.resolve(strings[index])
+        return path
@@ -2,8 +2,13 @@
 
 from enum import Enum
 import re
+import sys
+
+ENCODING = 'utf-8'
 
 class ClangMessage:
+    __slots__ = ('filepath', 'line', 'column', 'level', 'message', 'diagnostic_name', '_details_lines', '_children')
+
     class Level(Enum):
         UNKNOWN = 0
         NOTE = 1
@@ -13,72 +18,156 @@ class ClangMessage:
         FATAL = 5
 
     def __init__(self, filepath=None, line=-1, column=-1, level=Level.UNKNOWN, message=None, diagnostic_name=None, details_lines=None, children=None):
-        self.filepath = filepath if filepath is not None else ''
+        self.filepath = sys.intern(filepath) if filepath is not None else ''
         self.line = line
         self.column = column
         self.level = level
         self.message = message if message is not None else ''
-        self.diagnostic_name = diagnostic_name if diagnostic_name is not None else ''
-        self.details_lines = details_lines if details_lines is not None else []
-        self.children = children if children is not None else []
+        self.diagnostic_name = sys.intern(diagnostic_name) if diagnostic_name is not None else ''
+        self._details_lines = details_lines
+        self._children = children
+
+    @property
+    def details_lines(self):
+        if self._details_lines is None:
+            self._details_lines = []
+        return self._details_lines
+
+    @details_lines.setter
+    def details_lines(self, value):
+        self._details_lines = value
+
+    @property
+    def children(self):
+        if self._children is None:
+            self._children = []
+        return self._children
+
+    @children.setter
+    def children(self, value):
+        self._children = value
 
     @staticmethod
     def levelFromString(levelString):
-        if levelString == 'note':
-            return ClangMessage.Level.NOTE
-        if levelString == 'remark':
-            return ClangMessage.Level.REMARK
-        if levelString == 'warning':
-            return ClangMessage.Level.WARNING
-        if levelString == 'error':
-            return ClangMessage.Level.ERROR
-        if levelString == 'fatal':
-            return ClangMessage.Level.FATAL
-        return ClangMessage.Level.UNKNOWN
+        return _LEVELS_BY_NAME.get(levelString, ClangMessage.Level.UNKNOWN)
+
+_LEVELS_BY_NAME = {
+    'note': ClangMessage.Level.NOTE,
+    'remark': ClangMessage.Level.REMARK,
+    'warning': ClangMessage.Level.WARNING,
+    'error': ClangMessage.Level.ERROR,
+    'fatal': ClangMessage.Level.FATAL,
+}
 
 class ClangTidyParser:
     MESSAGE_REGEX = re.compile(r"^(?P<filepath>.+):(?P<line>\d+):(?P<column>\d+): (?P<level>\S+): (?P<message>.*?)( \[(?P<diagnostic_name>.*)\])?$")
     IGNORE_REGEX = re.compile(r"^error:.*$")
+    # Lines are classified without running MESSAGE_REGEX, whose greedy filepath
+    # and lazy message backtrack over the whole line. Most lines are source
+    # snippets rejected by HEADER_HINT_REGEX. For the rest, the header ends at
+    # the last HEADER_TAIL_REGEX match (see _match_header()) and the diagnostic
+    # name is split off the message by _split_diagnostic_name(). The result is
+    # the same as of MESSAGE_REGEX. Only lines starting with 'error:' may match
+    # IGNORE_REGEX.
+    HEADER_HINT_REGEX = re.compile(r":\d+:\d+: ")
+    HEADER_TAIL_REGEX = re.compile(r":(?P<line>\d+):(?P<column>\d+): (?P<level>\S+): ")
 
-    def __init__(self):
-        pass
+    def __init__(self, path_resolver=None):
+        # rewrites file paths of parsed messages, see PathResolver
+        self.path_resolver = path_resolver
 
     def parse(self, lines):
-        messages = []
+        return list(self.iter_messages(lines))
+
+    def iter_messages(self, lines):
+        """
+        Lazily parses lines (any iterable, e.g. a file object) and yields each
+        top-level message as soon as its notes and details lines are complete.
+        """
+        return self._group_messages(self._iter_line_entries(lines))
+
+    def _iter_line_entries(self, lines):
+        may_be_header = self.HEADER_HINT_REGEX.search
         for line in lines:
-            if self._is_ignored(line):
+            if line.startswith('error:') and self._is_ignored(line):
                 continue
-            message = self._parse_message(line)
+            yield (self._parse_message(line) if may_be_header(line) is not None else None), line
+
+    def _group_messages(self, entries):
+        """
+        Groups (message, details line) pairs, where message is None for lines
+        that are not message headers, into top-level messages with notes as
+        children.
+        """
+        current = None
+        last = None
+        for message, line in entries:
             if message is None or message.level == ClangMessage.Level.UNKNOWN:
-                if messages:
-                    messages[-1].details_lines.append(line)
-                else:
-                    continue
+                if last is not None:
+                    self._add_details_line(last, line)
+            elif message.level == ClangMessage.Level.NOTE:
+                if current is not None:
+                    current.children.append(message)
+                last = message
             else:
-                messages.append(message)
-        return self._group_messages(messages)
+                if current is not None:
+                    yield current
+                current = last = message
+        if current is not None:
+            yield current
+
+    def _add_details_line(self, message, line):
+        message.details_lines.append(line)
 
     def _parse_message(self, line):
-        regex_res = self.MESSAGE_REGEX.match(line)
-        if regex_res is not None:
-            return ClangMessage(
-                        filepath=regex_res.group('filepath'),
-                        line=int(regex_res.group('line')),
-                        column=int(regex_res.group('column')),
-                        level=ClangMessage.levelFromString(regex_res.group('level')),
-                        message=regex_res.group('message'),
-                        diagnostic_name=regex_res.group('diagnostic_name')
-                   )
-        return None
+        end = len(line) - 1 if line.endswith('\n') else len(line)
+        if line.find('\n', 0, end) >= 0:
+            return None
+        regex_res = _match_header(self.HEADER_HINT_REGEX, self.HEADER_TAIL_REGEX, line, 0, end)
+        if regex_res is None:
+            return None
+        message, diagnostic_name = _split_diagnostic_name(line[regex_res.end():end], ' [', ']')
+        filepath = line[:regex_res.start()]
+        if self.path_resolver is not None:
+            filepath = self.path_resolver.resolve(filepath)
+        return ClangMessage(
+                    filepath=filepath,
+                    line=int(regex_res.group('line')),
+                    column=int(regex_res.group('column')),
+                    level=ClangMessage.levelFromString(regex_res.group('level')),
+                    message=message,
+                    diagnostic_name=diagnostic_name
+               )
 
     def _is_ignored(self, line):
         return self.IGNORE_REGEX.match(line) is not None
 
-    def _group_messages(self, messages):
-        groupped_messages = []
-        for msg in messages:
-            if msg.level == ClangMessage.Level.NOTE:
-                groupped_messages[-1].children.append(msg)
-            else:
-                groupped_messages.append(msg)
-        return groupped_messages
+
+def _match_header(hint_regex, tail_regex, data, begin, end):
+    """
+    Returns the last tail_regex match in data[begin:end] after at least one
+    filepath character, which is where the greedy filepath group of
+    MESSAGE_REGEX ends. Tail matches start with a hint_regex match, and hint
+    matches never overlap, so it is enough to try each of them.
+    """
+    header = None
+    hint = hint_regex.search(data, begin + 1, end)
+    while hint is not None:
+        tail = tail_regex.match(data, hint.start(), end)
+        if tail is not None:
+            header = tail
+        hint = hint_regex.search(data, hint.end(), end)
+    return header
+
+
+def _split_diagnostic_name(rest, opening, closing):
+    """
+    Splits 'message [diagnostic name]' into its parts as the lazy message group
+    of MESSAGE_REGEX does: at the first opening bracket if rest ends with the
+    closing one. Works on both str and bytes.
+    """
+    if rest.endswith(closing):
+        index = rest.find(opening)
+        if index >= 0:
+            return rest[:index], rest[index + len(opening):-len(closing)]
+    return rest, None
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+from array import array
+from collections.abc import Sequence
+import mmap
+import os
+import re
+
+from .clang_tidy_parser import ClangTidyParser, ClangMessage, ENCODING, _match_header, _split_diagnostic_name
+
+
+def map_file(path):
+    """
+    Memory-maps file for reading. The mapping is closed once all messages
+    referring to it are garbage collected.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class MappedLines(Sequence):
+    """
+    Details lines stored as (begin, end) offsets into a bytes-like buffer and
+    decoded only on access. Lines are decoded the same way as STDIN returns
+    them: split on '\n' only and including the trailing newline.
+    """
+    def __init__(self, data):
+        self._data = data
+        self._spans = array('Q')
+
+    def append_span(self, begin, end):
+        self._spans.append(begin)
+        self._spans.append(end)
+
+    def __len__(self):
+        return len(self._spans) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('details line index out of range')
+        return self._data[self._spans[2 * index]:self._spans[2 * index + 1]].decode(ENCODING, errors='replace')
+
+    def iter_bytes(self):
+        """Yields lines as undecoded bytes."""
+        for i in range(0, len(self._spans), 2):
+            yield self._data[self._spans[i]:self._spans[i + 1]]
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+class MappedClangTidyParser(ClangTidyParser):
+    """
+    Parses Clang-Tidy output from a bytes-like buffer (usually a memory-mapped
+    file) without decoding every line. Only message header fields are decoded
+    eagerly; details lines are kept as MappedLines.
+    """
+    HEADER_HINT_BYTES_REGEX = re.compile(ClangTidyParser.HEADER_HINT_REGEX.pattern.encode())
+    HEADER_TAIL_BYTES_REGEX = re.compile(ClangTidyParser.HEADER_TAIL_REGEX.pattern.encode())
+
+    def iter_messages(self, data, begin=0, end=None):
+        end = len(data) if end is None else end
+        return self._group_messages(self._iter_entries(data, begin, end))
+
+    def parse(self, data, begin=0, end=None):
+        return list(self.iter_messages(data, begin, end))
+
+    def _iter_entries(self, data, begin, end):
+        self._data = data
+        for line_begin, line_end, content_end in _iter_line_spans(data, begin, end):
+            if self._is_ignored_span(data, line_begin, content_end):
+                continue
+            yield self._parse_message_span(data, line_begin, content_end), (line_begin, line_end)
+
+    def _parse_message_span(self, data, begin, end):
+        # spans exclude the line terminator, so there is no newline to check for
+        regex_res = _match_header(self.HEADER_HINT_BYTES_REGEX, self.HEADER_TAIL_BYTES_REGEX, data, begin, end)
+        if regex_res is None:
+            return None
+        message, diagnostic_name = _split_diagnostic_name(data[regex_res.end():end], b' [', b']')
+        filepath = data[begin:regex_res.start()].decode(ENCODING, errors='replace')
+        if self.path_resolver is not None:
+            filepath = self.path_resolver.resolve(filepath)
+        return ClangMessage(
+                    filepath=filepath,
+                    line=int(regex_res.group('line')),
+                    column=int(regex_res.group('column')),
+                    level=ClangMessage.levelFromString(regex_res.group('level').decode(ENCODING, errors='replace')),
+                    message=message.decode(ENCODING, errors='replace'),
+                    diagnostic_name=diagnostic_name.decode(ENCODING, errors='replace') if diagnostic_name is not None else None
+               )
+
+    def _is_ignored_span(self, data, begin, end):
+        # the same as IGNORE_REGEX, as '.*$' matches any line without its terminator
+        return data[begin:min(begin + 6, end)] == b'error:'
+
+    def _add_details_line(self, message, span):
+        if not isinstance(message.details_lines, MappedLines):
+            message.details_lines = MappedLines(self._data)
+        message.details_lines.append_span(*span)
+
+
+def _iter_line_spans(data, begin, end):
+    """Yields (line begin, line end, content end) where content excludes the line terminator."""
+    while begin < end:
+        newline = data.find(b'\n', begin, end)
+        line_end = end if newline < 0 else newline + 1
+        content_end = line_end if newline < 0 else newline
+        yield begin, line_end, content_end
+        begin = line_end
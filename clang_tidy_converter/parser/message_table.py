@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+from array import array
+
+from .clang_tidy_parser import ClangMessage
+
+_LEVELS = tuple(sorted(ClangMessage.Level, key=lambda level: level.value))
+
+
+class MessageTable:
+    """
+    Columnar storage for parsed messages: parallel arrays for line, column
+    and level, indices into a shared string table for file paths, messages
+    and diagnostic names, and a flat list of details lines. Messages are
+    stored in pre-order, so children directly follow their parent.
+
+    Iterating over the table yields MessageRow views which expose the same
+    attributes as ClangMessage, so formatters can consume them as is.
+    """
+    def __init__(self):
+        self._strings = []
+        self._string_ids = {}
+        self._lines = array('i')
+        self._columns = array('i')
+        self._levels = array('b')
+        self._filepaths = array('I')
+        self._messages = array('I')
+        self._diagnostic_names = array('I')
+        self._subtree_sizes = array('I')
+        self._details_begins = array('I')
+        self._details_lines = []
+        self._size = 0
+
+    @staticmethod
+    def from_messages(messages):
+        table = MessageTable()
+        for message in messages:
+            table.append(message)
+        return table
+
+    def append(self, message):
+        """Appends top-level message with all its children."""
+        self._append(message)
+        self._size += 1
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return self._iter_rows(0, len(self._lines))
+
+    def _append(self, message):
+        index = len(self._lines)
+        self._lines.append(message.line)
+        self._columns.append(message.column)
+        self._levels.append(message.level.value)
+        self._filepaths.append(self._string_id(message.filepath))
+        self._messages.append(self._string_id(message.message))
+        self._diagnostic_names.append(self._string_id(message.diagnostic_name))
+        self._details_begins.append(len(self._details_lines))
+        self._subtree_sizes.append(1)
+        # read the slots directly so that empty containers are not allocated
+        if message._details_lines:
+            self._details_lines.extend(message._details_lines)
+        for child in message._children or ():
+            self._append(child)
+        self._subtree_sizes[index] = len(self._lines) - index
+
+    def _string_id(self, string):
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = self._string_ids[string] = len(self._strings)
+            self._strings.append(string)
+        return string_id
+
+    def _iter_rows(self, begin, end):
+        while begin < end:
+            yield MessageRow(self, begin)
+            begin += self._subtree_sizes[begin]
+
+
+class MessageRow:
+    """Read-only view of a single message stored in MessageTable."""
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    @property
+    def filepath(self):
+        return self._table._strings[self._table._filepaths[self._index]]
+
+    @property
+    def line(self):
+        return self._table._lines[self._index]
+
+    @property
+    def column(self):
+        return self._table._columns[self._index]
+
+    @property
+    def level(self):
+        return _LEVELS[self._table._levels[self._index]]
+
+    @property
+    def message(self):
+        return self._table._strings[self._table._messages[self._index]]
+
+    @property
+    def diagnostic_name(self):
+        return self._table._strings[self._table._diagnostic_names[self._index]]
+
+    @property
+    def details_lines(self):
+        table = self._table
+        end = table._details_begins[self._index + 1] if self._index + 1 < len(table._details_begins) else len(table._details_lines)
+        return table._details_lines[table._details_begins[self._index]:end]
+
+    @property
+    def children(self):
+        return list(self._table._iter_rows(self._index + 1, self._index + self._table._subtree_sizes[self._index]))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+from collections import deque
+
+from .clang_tidy_parser import ClangMessage
+from .mapped_parser import MappedClangTidyParser, map_file, _iter_line_spans
+
+
+class ParallelClangTidyParser:
+    """
+    Parses Clang-Tidy output files in several processes. Files are split
+    only right before top-level (non-note) message headers, so notes and
+    details lines always stay in the same chunk as their parent message and
+    the result is the same as of the serial ClangTidyParser. path_resolver
+    is pickled to the worker processes, each of which has its own cache.
+    """
+    MIN_CHUNK_SIZE = 1 << 20
+    CHUNKS_PER_JOB = 4
+    # chunks in flight per job; bounds parsed messages waiting to be yielded
+    PENDING_PER_JOB = 2
+
+    def __init__(self, jobs, chunk_size=None, path_resolver=None):
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        self.path_resolver = path_resolver
+
+    def iter_messages(self, path):
+        return self.iter_files_messages([path])
+
+    def iter_files_messages(self, paths):
+        """
+        Parses each file separately, but all in the same process pool.
+        Chunks are submitted as earlier ones are yielded, at most
+        PENDING_PER_JOB * jobs at a time.
+        """
+        chunks = [(path, begin, end, self.path_resolver) for path in paths for begin, end in self._split(path)]
+        if len(chunks) < 2:
+            for chunk in chunks:
+                yield from _parse_chunk(chunk)
+            return
+        # imported here, as process pools are slow to import and not needed by serial runs
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(self.jobs) as pool:
+            pending = deque()
+            try:
+                for chunk in chunks:
+                    pending.append(pool.submit(_parse_chunk, chunk))
+                    if len(pending) >= self.jobs * self.PENDING_PER_JOB:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                # when the caller stops early, chunks not started are not parsed
+                for future in pending:
+                    future.cancel()
+
+    def parse(self, path):
+        return list(self.iter_messages(path))
+
+    def _split(self, path):
+        data = map_file(path)
+        size = len(data)
+        chunk_size = self.chunk_size or max(self.MIN_CHUNK_SIZE, size // (self.jobs * self.CHUNKS_PER_JOB) + 1)
+        parser = MappedClangTidyParser()
+        boundaries = [0]
+        offset = chunk_size
+        while offset < size:
+            boundary = _find_message_start(parser, data, offset)
+            if boundary >= size:
+                break
+            boundaries.append(boundary)
+            offset = boundary + chunk_size
+        boundaries.append(size)
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _find_message_start(parser, data, offset):
+    """Returns the offset of the first top-level message header line at or after offset."""
+    line_begin = data.rfind(b'\n', 0, offset) + 1
+    if line_begin < offset:
+        newline = data.find(b'\n', offset)
+        line_begin = len(data) if newline < 0 else newline + 1
+    for line_begin, _, content_end in _iter_line_spans(data, line_begin, len(data)):
+        if _is_top_level_header(parser, data, line_begin, content_end):
+            return line_begin
+    return len(data)
+
+
+def _is_top_level_header(parser, data, begin, end):
+    if parser._is_ignored_span(data, begin, end):
+        return False
+    message = parser._parse_message_span(data, begin, end)
+    return message is not None and message.level not in (ClangMessage.Level.UNKNOWN, ClangMessage.Level.NOTE)
+
+
+def _parse_chunk(chunk):
+    path, begin, end, path_resolver = chunk
+    return MappedClangTidyParser(path_resolver).parse(map_file(path), begin, end)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+from functools import lru_cache
+import os
+import sys
+
+
+class PathResolver:
+    """
+    Rewrites file paths of messages while they are parsed. A path is first
+    remapped by the path_map rule with the longest matching FROM prefix, e.g.
+    from a build container to the host, and then made relative to the longest
+    project root containing it, or to the first root if none does, the same
+    way as os.path.relpath().
+
+    Logs repeat the same paths over and over, so results are interned and
+    memoized; the cache keeps at most cache_size paths and evicts least
+    recently used.
+    """
+    def __init__(self, project_roots=(), path_map=(), cache_size=1 << 16):
+        self.project_roots = list(project_roots)
+        self.path_map = list(path_map)
+        self.cache_size = cache_size
+        self._roots = [(os.path.abspath(root), root) for root in self.project_roots]
+        # rules as (FROM, TO) directory prefixes ending with '/', except for an empty TO
+        self._rules = sorted(((source.rstrip('/') + '/', target.rstrip('/') + '/' if target else '') for source, target in self.path_map),
+                             key=lambda rule: len(rule[0]), reverse=True)
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _resolve(self, path):
+        path = self._remap(path)
+        if self._roots:
+            path = os.path.relpath(path, self._find_root(path))
+        return sys.intern(path)
+
+    def _remap(self, path):
+        for source, target in self._rules:
+            if path.startswith(source):
+                return target + path[len(source):]
+            if path + '/' == source:
+                return target.rstrip('/') or target
+        return path
+
+    def _find_root(self, path):
+        absolute = os.path.abspath(path)
+        best = None
+        for root_path, root in self._roots:
+            if (absolute == root_path or absolute.startswith(root_path.rstrip(os.sep) + os.sep)) \
+                    and (best is None or len(root_path) > len(best[0])):
+                best = (root_path, root)
+        return best[1] if best is not None else self._roots[0][1]
+
+    def __reduce__(self):
+        # the memoized method cannot be pickled, e.g. to parse in other processes
+        return (PathResolver, (self.project_roots, self.path_map, self.cache_size))
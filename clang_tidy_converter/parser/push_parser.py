@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import codecs
+
+from .clang_tidy_parser import ClangTidyParser, ClangMessage, ENCODING
+
+
+class PushClangTidyParser(ClangTidyParser):
+    """
+    Parses Clang-Tidy output pushed in chunks of bytes as it arrives, e.g.
+    from a running process. Chunks may end anywhere, even inside a line or
+    an encoded character. feed() returns top-level messages completed by the
+    chunk and close() the rest at the end of the output. Line endings are
+    kept as MappedClangTidyParser keeps them, so the result is the same as of
+    parsing the whole output from an --input file.
+
+    Parsed lines are kept until the next top-level message header, which
+    completes the messages before it; these are grouped by
+    _group_messages() as the lines of a whole file.
+    """
+    def __init__(self, path_resolver=None):
+        super().__init__(path_resolver)
+        self._decoder = codecs.getincrementaldecoder(ENCODING)(errors='replace')
+        self._tail = ''
+        # (message, line) entries from the last top-level message header on
+        self._entries = []
+
+    def feed(self, data):
+        """Parses a chunk of output; returns a list of completed top-level messages."""
+        text = self._tail + self._decoder.decode(data)
+        end = text.rfind('\n') + 1
+        self._tail = text[end:]
+        if end == 0:
+            return []
+        return self._push_lines([line + '\n' for line in text[:end - 1].split('\n')])
+
+    def close(self):
+        """Parses the rest of the output; returns a list of the remaining top-level messages."""
+        text = self._tail + self._decoder.decode(b'', final=True)
+        self._tail = ''
+        self._entries += self._iter_line_entries([text] if text else [])
+        entries, self._entries = self._entries, []
+        return list(self._group_messages(entries))
+
+    def _push_lines(self, lines):
+        entries = self._entries
+        begin = len(entries)
+        entries += self._iter_line_entries(lines)
+        # the last top-level header among the new entries; the first entry may be one of an incomplete message
+        for split in range(len(entries) - 1, max(begin, 1) - 1, -1):
+            message = entries[split][0]
+            if message is not None and message.level not in (ClangMessage.Level.UNKNOWN, ClangMessage.Level.NOTE):
+                self._entries = entries[split:]
+                return list(self._group_messages(entries[:split]))
+        return []
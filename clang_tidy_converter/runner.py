@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import os
+import queue
+import re
+import signal
+import sys
+import threading
+
+from .parser import PushClangTidyParser
+
+COMPILE_COMMANDS = 'compile_commands.json'
+READ_SIZE = 1 << 16
+QUEUE_SIZE = 64
+STOP_POLL_INTERVAL = 0.1
+# clang-tidy exits with 1 after compiler errors, which are reported as issues
+EXPECTED_RETURNCODES = (0, 1)
+
+_END = None
+
+
+class _Stopped(Exception):
+    pass
+
+
+def load_compile_commands(build_path, file_filter=None):
+    """
+    Returns absolute paths of translation units of compile_commands.json in
+    build_path, each once and in the order of the database, only those
+    matching file_filter regex if given.
+    """
+    with open(os.path.join(build_path, COMPILE_COMMANDS), encoding='utf-8') as database:
+        commands = json.load(database)
+    regex = re.compile(file_filter) if file_filter is not None else None
+    files = {}
+    for command in commands:
+        path = os.path.normpath(os.path.join(command['directory'], command['file']))
+        if regex is None or regex.search(path) is not None:
+            files[path] = None
+    return list(files)
+
+
+class ClangTidyRunner:
+    """
+    Runs clang-tidy for each translation unit of a compilation database, at
+    most processes at a time, from an asyncio event loop in a background
+    thread. Output of each process is parsed as it arrives and completed
+    messages are passed to iter_messages() through a bounded queue, so the
+    conversion overlaps with the analysis. Messages of different translation
+    units are yielded in the order they complete. Processes killed by a
+    signal or exiting with other codes than EXPECTED_RETURNCODES are
+    reported on stderr, as their output may be incomplete.
+    """
+    def __init__(self, build_path, clang_tidy_binary='clang-tidy', clang_tidy_args=(), processes=None, file_filter=None,
+                 path_resolver=None):
+        self.build_path = build_path
+        self.clang_tidy_binary = clang_tidy_binary
+        self.clang_tidy_args = list(clang_tidy_args)
+        self.processes = processes or os.cpu_count() or 1
+        self.file_filter = file_filter
+        self.path_resolver = path_resolver
+        self.returncodes = {}
+
+    def iter_messages(self):
+        files = load_compile_commands(self.build_path, self.file_filter)
+        results = queue.Queue(QUEUE_SIZE)
+        stop = threading.Event()
+        thread = threading.Thread(target=self._run_loop, args=(files, results, stop), daemon=True)
+        thread.start()
+        try:
+            for item in iter(results.get, _END):
+                if isinstance(item, BaseException):
+                    raise item
+                yield from item
+        finally:
+            # the consumer may stop early; let the loop kill the processes and finish
+            stop.set()
+            while thread.is_alive():
+                try:
+                    results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            thread.join()
+
+    def _run_loop(self, files, results, stop):
+        try:
+            asyncio.run(self._run(files, results, stop))
+        except _Stopped:
+            pass
+        except BaseException as e:
+            results.put(e)
+        results.put(_END)
+
+    async def _run(self, files, results, stop):
+        semaphore = asyncio.Semaphore(self.processes)
+        run = asyncio.gather(*(self._run_file(path, semaphore, results, stop) for path in files))
+        # stop is set from the consumer thread, which cannot wake the loop
+        while not stop.is_set():
+            done, _ = await asyncio.wait([run], timeout=STOP_POLL_INTERVAL)
+            if done:
+                return run.result()
+        run.cancel()
+        # lets the processes be killed and retrieves the exception of the cancelled tasks
+        try:
+            await run
+        except (asyncio.CancelledError, _Stopped):
+            pass
+        raise _Stopped()
+
+    async def _run_file(self, path, semaphore, results, stop):
+        async with semaphore:
+            if stop.is_set():
+                raise _Stopped()
+            process = await asyncio.create_subprocess_exec(self.clang_tidy_binary, '-p', self.build_path, *self.clang_tidy_args, path,
+                                                           stdout=asyncio.subprocess.PIPE)
+            try:
+                parser = PushClangTidyParser(self.path_resolver)
+                while True:
+                    data = await process.stdout.read(READ_SIZE)
+                    if not data:
+                        break
+                    await _put(results, stop, parser.feed(data))
+                await _put(results, stop, parser.close())
+                self.returncodes[path] = await process.wait()
+                _check_returncode(path, process.returncode)
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+
+def _check_returncode(path, returncode):
+    if returncode < 0:
+        try:
+            reason = f'was killed by {signal.Signals(-returncode).name}'
+        except ValueError:
+            reason = f'was killed by signal {-returncode}'
+    elif returncode not in EXPECTED_RETURNCODES:
+        reason = f'exited with code {returncode}'
+    else:
+        return
+    sys.stderr.write(f'warning: clang-tidy {reason} on {path}, its issues may be incomplete\n')
+
+
+async def _put(results, stop, messages):
+    # waits in a worker thread while the consumer is behind, so that the loop
+    # keeps reading other processes, and this one waits on a full pipe
+    if messages:
+        await asyncio.get_running_loop().run_in_executor(None, _put_blocking, results, stop, messages)
+
+
+def _put_blocking(results, stop, messages):
+    while True:
+        if stop.is_set():
+            raise _Stopped()
+        try:
+            results.put(messages, timeout=0.1)
+            return
+        except queue.Full:
+            pass
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+
+from functools import lru_cache
+import http.server
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+
+from .client import CONVERT_PATH, parse_address
+from .compressed_io import MAGIC_SIZE, detect_codec, open_decompressed
+from .converter import ConversionOptions, Converter
+from .formatter import formatter_class
+
+DEFAULT_THREADS = 4
+DEFAULT_TIMEOUT = 60
+READ_SIZE = 1 << 16
+WRITE_SIZE = 1 << 16
+MAX_LINE_SIZE = 1 << 16
+MAX_OPTIONS_SIZE = 1 << 20
+CONVERTER_CACHE_SIZE = 64
+# minimum lifetime of a worker process to be restarted right after it exits
+RESPAWN_INTERVAL = 1.0
+
+
+class ConversionServer:
+    """
+    Persistent converter serving conversions over HTTP on a Unix socket or a
+    TCP address, so that a conversion does not pay for interpreter startup,
+    imports and regex compilation. Converter sessions, with their caches, are
+    kept per ConversionOptions and shared by requests.
+
+    A request is POST /convert with a body of a JSON object of command line
+    options, see client.convert_remotely(), on the first line and Clang-Tidy
+    output, which may be compressed with gzip or zstd, on the rest, sent
+    with Content-Length or chunked. The output is
+    streamed back as soon as it is produced. parse_options(options) returns
+    the argparse namespace of options or raises ValueError.
+
+    workers processes, forked if more than one, each handle up to threads
+    requests at a time; further connections wait for a free thread. Requests
+    with more than max_request_size bytes, compressed or decompressed, are
+    rejected and a JSON line of per-request stats is written to log for each
+    request.
+    """
+    def __init__(self, address, parse_options, workers=1, threads=DEFAULT_THREADS, max_request_size=None,
+                 timeout=DEFAULT_TIMEOUT, log=None):
+        if workers > 1 and not hasattr(os, 'fork'):
+            raise ValueError('several workers need os.fork()')
+        self.parse_options = parse_options
+        self.workers = workers
+        self.max_request_size = max_request_size
+        self.timeout = timeout
+        self.log = log if log is not None else sys.stderr
+        self._log_lock = threading.Lock()
+        address = parse_address(address)
+        if isinstance(address, str):
+            _remove_stale_socket(address)
+            self._server = _UnixHTTPServer(address, _ConversionHandler)
+        else:
+            self._server = _TCPHTTPServer(address, _ConversionHandler)
+        self._server.conversion_server = self
+        self._server.slots = threading.BoundedSemaphore(threads)
+        self._pid = os.getpid()
+
+    @property
+    def server_address(self):
+        return self._server.server_address
+
+    def serve_forever(self):
+        if self.workers > 1:
+            self._serve_workers()
+        else:
+            self._server.serve_forever()
+
+    def shutdown(self):
+        """Stops serve_forever() of a single worker server running in another thread."""
+        self._server.shutdown()
+
+    def close(self):
+        self._server.server_close()
+        if isinstance(self.server_address, str) and os.getpid() == self._pid:
+            try:
+                os.unlink(self.server_address)
+            except FileNotFoundError:
+                pass
+
+    def converter(self, options):
+        return _converter(options)
+
+    def write_stats(self, stats):
+        with self._log_lock:
+            self.log.write(json.dumps(stats) + '\n')
+            self.log.flush()
+
+    def _serve_workers(self):
+        workers = {}
+        try:
+            for _ in range(self.workers):
+                pid = self._fork_worker()
+                workers[pid] = time.monotonic()
+            while workers:
+                pid, _ = os.wait()
+                started = workers.pop(pid, None)
+                if started is None:
+                    continue
+                # a worker only exits on a bug, restart it without spinning if it keeps failing
+                time.sleep(max(0.0, started + RESPAWN_INTERVAL - time.monotonic()))
+                workers[self._fork_worker()] = time.monotonic()
+        finally:
+            for pid in workers:
+                os.kill(pid, signal.SIGTERM)
+            for pid in workers:
+                os.waitpid(pid, 0)
+
+    def _fork_worker(self):
+        pid = os.fork()
+        if pid != 0:
+            return pid
+        status = 1
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            self._server.serve_forever()
+            status = 0
+        finally:
+            os._exit(status)
+
+
+def serve(args, parse_options):
+    """Runs the server of the serve command until it is interrupted or terminated."""
+    server = ConversionServer(args.address, parse_options, args.workers, args.threads, args.max_request_size, args.timeout)
+    signal.signal(signal.SIGTERM, _exit)
+    try:
+        sys.stderr.write(f'serving conversions on {args.address}\n')
+        sys.stderr.flush()
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+@lru_cache(maxsize=CONVERTER_CACHE_SIZE)
+def _converter(options):
+    return Converter(options)
+
+
+def _exit(signum, frame):
+    sys.exit(0)
+
+
+def _remove_stale_socket(path):
+    """Removes a Unix socket left by a server that did not exit cleanly."""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+
+
+class _BoundedThreadingMixIn(socketserver.ThreadingMixIn):
+    """Handles each request in a thread, at most as many at a time as slots allow."""
+    daemon_threads = True
+
+    def process_request(self, request, client_address):
+        self.slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.slots.release()
+
+
+class _TCPHTTPServer(_BoundedThreadingMixIn, http.server.HTTPServer):
+    pass
+
+
+class _UnixHTTPServer(_BoundedThreadingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+class _BadRequest(ValueError):
+    status = 400
+
+
+class _RequestTooLarge(ValueError):
+    status = 413
+
+
+class _ConversionHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        self.timeout = self.server.conversion_server.timeout
+        super().setup()
+
+    def do_POST(self):
+        if self.path != CONVERT_PATH:
+            self._send_error(404, f'unknown path {self.path}, expected {CONVERT_PATH}')
+            return
+        server = self.server.conversion_server
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        stats = {'worker': os.getpid(), 'format': None, 'status': 200}
+        body = response = reader = None
+        try:
+            body = _RequestBody(self.rfile, self.headers, server.max_request_size)
+            source = io.BufferedReader(body, READ_SIZE)
+            args = self._parse_options(server, source.readline(MAX_OPTIONS_SIZE))
+            stats['format'] = args.output_format
+            codec = detect_codec(source.peek(MAGIC_SIZE))
+            if codec is not None:
+                reader = open_decompressed(source, codec)
+                # however well it compresses, the output is bounded by the decompressed size
+                source = io.BufferedReader(_LimitedReader(reader, server.max_request_size), READ_SIZE)
+            converter = server.converter(ConversionOptions(tuple(args.project_root), tuple(map(tuple, args.path_map)),
+                                                           bool(args.deduplicate)))
+            response = _ChunkedResponse(self)
+            output = io.BufferedWriter(response, WRITE_SIZE)
+            if not getattr(formatter_class(args.output_format), 'binary', False):
+                output = io.TextIOWrapper(output, encoding='utf-8')
+            # line endings are kept as the command line keeps them in an --input file
+            lines = io.TextIOWrapper(source, encoding='utf-8', errors='replace', newline='\n')
+            messages = _Counter(converter.iter_messages(lines))
+            converter.write(messages, args, output)
+            if isinstance(output, io.TextIOWrapper):
+                # as the command line does
+                output.write('\n')
+            output.flush()
+            stats['messages'] = messages.count
+        except Exception as e:
+            stats['status'] = getattr(e, 'status', 500)
+            stats['error'] = str(e)
+            if response is not None:
+                response.aborted = True
+            self.close_connection = True
+        finally:
+            if reader is not None:
+                reader.close()
+        stats['bytes_in'] = body.size if body is not None else 0
+        stats['bytes_out'] = response.size if response is not None else 0
+        stats['wall_seconds'] = time.perf_counter() - wall
+        stats['cpu_seconds'] = time.thread_time() - cpu
+        # before the response ends, so that a client sees the stats of its finished requests
+        server.write_stats(stats)
+        if stats['status'] == 200:
+            response.finish()
+        elif response is None or not response.started:
+            self._send_error(stats['status'], stats['error'])
+        # otherwise the output is cut short, which the client reports
+
+    def _parse_options(self, server, line):
+        try:
+            options = json.loads(line)
+            if not isinstance(options, dict):
+                raise ValueError('expected a JSON object of options')
+            return server.parse_options(options)
+        except ValueError as e:
+            raise _BadRequest(f'invalid options: {e}') from None
+
+    def _send_error(self, status, message):
+        body = message.encode('utf-8') + b'\n'
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'local'
+
+    def log_request(self, code='-', size='-'):
+        # requests are logged with their stats by do_POST()
+        pass
+
+
+class _RequestBody(io.RawIOBase):
+    """Request body with Content-Length or chunked transfer encoding, limited to max_size bytes."""
+    def __init__(self, rfile, headers, max_size=None):
+        self._rfile = rfile
+        self._max_size = max_size
+        self._chunked = 'chunked' in headers.get('Transfer-Encoding', '').lower()
+        self._remaining = 0
+        self._in_chunk = False
+        self.size = 0
+        if not self._chunked:
+            try:
+                self._remaining = int(headers.get('Content-Length', 0))
+            except ValueError:
+                raise _BadRequest('invalid Content-Length') from None
+            if max_size is not None and self._remaining > max_size:
+                raise _RequestTooLarge(f'request body exceeds {max_size} bytes')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._remaining == 0 and not self._next_chunk():
+            return 0
+        data = self._rfile.read1(min(len(buffer), self._remaining))
+        if not data:
+            raise _BadRequest('incomplete request body')
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        self.size += len(data)
+        if self._max_size is not None and self.size > self._max_size:
+            raise _RequestTooLarge(f'request body exceeds {self._max_size} bytes')
+        return len(data)
+
+    def _next_chunk(self):
+        if not self._chunked:
+            return False
+        if self._in_chunk:
+            # CRLF after the data of the previous chunk
+            self._rfile.readline(MAX_LINE_SIZE)
+        try:
+            size = int(self._rfile.readline(MAX_LINE_SIZE).split(b';')[0], 16)
+        except ValueError:
+            raise _BadRequest('invalid chunk size') from None
+        if size == 0:
+            # skip trailers up to the empty line ending the body
+            while self._rfile.readline(MAX_LINE_SIZE).strip():
+                pass
+            self._chunked = False
+            return False
+        self._remaining = size
+        self._in_chunk = True
+        return True
+
+
+class _LimitedReader(io.RawIOBase):
+    """Raw stream reading from raw stream source, limited to max_size bytes."""
+    def __init__(self, source, max_size=None):
+        self._source = source
+        self._max_size = max_size
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self._source.readinto(buffer)
+        self.size += size
+        if self._max_size is not None and self.size > self._max_size:
+            raise _RequestTooLarge(f'decompressed request body exceeds {self._max_size} bytes')
+        return size
+
+
+class _ChunkedResponse(io.RawIOBase):
+    """Chunked response body; headers are sent with the first chunk, so errors before it get an error status."""
+    def __init__(self, handler):
+        self._handler = handler
+        self.started = False
+        # set after an error, so that data still buffered is not sent
+        self.aborted = False
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.aborted:
+            return len(data)
+        if not self.started:
+            self._start()
+        if data:
+            self._handler.wfile.write(b''.join((b'%x\r\n' % len(data), data, b'\r\n')))
+            self.size += len(data)
+        return len(data)
+
+    def finish(self):
+        if not self.started:
+            self._start()
+        self._handler.wfile.write(b'0\r\n\r\n')
+
+    def _start(self):
+        self._handler.send_response(200)
+        self._handler.send_header('Content-Type', 'application/octet-stream')
+        self._handler.send_header('Transfer-Encoding', 'chunked')
+        self._handler.send_header('Connection', 'close')
+        self._handler.end_headers()
+        self.started = True
+
+
+class _Counter:
+    __slots__ = ('_iterator', 'count')
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._iterator)
+        self.count += 1
+        return item
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+from contextlib import contextmanager
+import json
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_active = None
+
+
+def track(name, iterable):
+    """
+    Returns iterable counting items and time spent producing them as stage
+    name of the active PipelineStats, or iterable itself if there is none.
+    """
+    if _active is None:
+        return iterable
+    return _TrackedIterator(iterable, _active._stage(name), _active)
+
+
+@contextmanager
+def measure(name):
+    """Measures the enclosed block as stage name of the active PipelineStats, if any."""
+    if _active is None:
+        yield
+        return
+    stats = _active
+    stage = stats._stage(name)
+    frame = stats._enter()
+    try:
+        yield
+    finally:
+        stats._exit(stage, frame)
+        stage.peak_rss_mb = peak_rss_mb()
+
+
+class PipelineStats:
+    """
+    Per-stage wall time, CPU time, item counts and peak memory of a
+    conversion. Stages are iterables wrapped by track() and blocks wrapped by
+    measure() while the stats are active. Stages pull items from each other,
+    so the time of a stage excludes time spent in stages it pulls from.
+
+    CPU time is that of the thread running the stage, so it excludes work
+    of background threads, e.g. compressing or decompressing a stream,
+    which only the total CPU time of the conversion includes.
+    Peak memory, peak_rss_mb, is process-wide: the peak RSS of the whole
+    process so far when the stage last ran, not the memory used by the
+    stage, which is only a growth over the peak of earlier stages.
+    """
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._wall = self._cpu = 0.0
+
+    def start(self):
+        global _active
+        _active = self
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def stop(self):
+        global _active
+        _active = None
+        self._wall = time.perf_counter() - self._wall
+        self._cpu = time.process_time() - self._cpu
+
+    def to_json(self):
+        return {
+            'wall_seconds': self._wall,
+            'cpu_seconds': self._cpu,
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': [stage.to_json() for stage in self.stages.values()],
+        }
+
+    def write(self, stream):
+        json.dump(self.to_json(), stream, indent=2)
+        stream.write('\n')
+
+    def _stage(self, name):
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = _Stage(name)
+            return stage
+
+    def _enter(self):
+        # frames keep time of nested stages, which is excluded from the enclosing one
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [0.0, 0.0, time.perf_counter(), time.thread_time()]
+        stack.append(frame)
+        return frame
+
+    def _exit(self, stage, frame):
+        wall = time.perf_counter() - frame[2]
+        cpu = time.thread_time() - frame[3]
+        stack = self._local.stack
+        stack.pop()
+        stage.wall += wall - frame[0]
+        stage.cpu += cpu - frame[1]
+        if stack:
+            stack[-1][0] += wall
+            stack[-1][1] += cpu
+
+
+class _Stage:
+    __slots__ = ('name', 'items', 'wall', 'cpu', 'peak_rss_mb')
+
+    def __init__(self, name):
+        self.name = name
+        self.items = None
+        self.wall = self.cpu = 0.0
+        self.peak_rss_mb = None
+
+    def to_json(self):
+        return {'name': self.name, 'items': self.items, 'wall_seconds': self.wall, 'cpu_seconds': self.cpu, 'peak_rss_mb': self.peak_rss_mb}
+
+
+class _TrackedIterator:
+    __slots__ = ('_iterator', '_stage', '_stats')
+
+    def __init__(self, iterable, stage, stats):
+        self._iterator = iter(iterable)
+        self._stage = stage
+        self._stats = stats
+        stage.items = stage.items or 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        frame = self._stats._enter()
+        try:
+            item = next(self._iterator)
+        except StopIteration:
+            self._stage.peak_rss_mb = peak_rss_mb()
+            raise
+        finally:
+            self._stats._exit(self._stage, frame)
+        self._stage.items += 1
+        return item
+
+
+def peak_rss_mb():
+    """Returns the peak RSS of the whole process so far in MiB (ru_maxrss), or None if unknown."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return usage / (1 << 20) if sys.platform == 'darwin' else usage / (1 << 10)
@@ -16,7 +16,7 @@ setup(
     name="clang_tidy_converter",
     url="https://github.com/yuriisk/clang-tidy-converter",
     version="1.0.0",
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     author="Yurii Skatarenko",
     author_email="yurii.skatarenko@gmail.com",
     description="Python3 script to convert Clang-Tidy output to different formats.",
@@ -27,6 +27,8 @@ setup(
     platforms=["any"],
     python_requires='>=3.5',
     install_requires=_requirements(),
+    # zstd compression of inputs and outputs, see clang_tidy_converter.compressed_io
+    extras_require={'zstd': ['zstandard']},
     setup_requires=['pytest-runner', 'wheel'],
     tests_require=['pytest'],
     classifiers=[],
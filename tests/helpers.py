@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+
+
+def to_tuple(message, details=True):
+    """
+    Returns the fields of message and its children as nested tuples to
+    compare messages. Without details, the level and details lines, which
+    reports do not keep exactly, are left out.
+    """
+    children = [to_tuple(child, details) for child in message.children]
+    if not details:
+        return message.filepath, message.line, message.column, message.message, message.diagnostic_name, children
+    return (message.filepath, message.line, message.column, message.level, message.message, message.diagnostic_name,
+            list(message.details_lines), children)
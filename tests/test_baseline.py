@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import io
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from clang_tidy_converter import ClangMessage, CodeClimateFormatter, SarifFormatter
+from clang_tidy_converter import baseline
+from clang_tidy_converter.baseline import BaselineIndex
+from clang_tidy_converter.cache import MessageCache
+from helpers import to_tuple
+
+
+class BaselineIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _message(self, line, note_line=2):
+        note = ClangMessage('/src/a.h', note_line, 1, ClangMessage.Level.NOTE, 'Note')
+        return ClangMessage('/src/a.cpp', line, 3, ClangMessage.Level.WARNING, 'Warning', 'bugprone-a', ['  ^\n'], [note])
+
+    def _write_report(self, formatter, messages, **options):
+        args = unittest.mock.Mock(use_location_lines=False, compact=False, baseline_index=None, **options)
+        path = os.path.join(self.tmp.name, 'report.json')
+        with open(path, 'w') as f:
+            f.write(formatter.format(messages, args))
+        return path
+
+    def _reports(self, messages):
+        return {
+            'cc': self._write_report(CodeClimateFormatter(), messages, as_json_array=False),
+            'cc array': self._write_report(CodeClimateFormatter(), messages, as_json_array=True),
+            'sarif': self._write_report(SarifFormatter(), messages, indexed=False),
+            'sarif indexed': self._write_report(SarifFormatter(), messages, indexed=True),
+        }
+
+    def test_diff(self):
+        previous = [self._message(1), self._message(5), self._message(7, note_line=3)]
+        current = [self._message(1), self._message(6), self._message(7)]
+        for kind, path in self._reports(previous).items():
+            with self.subTest(kind):
+                new = list(BaselineIndex(path).iter_diff(iter(current), 'new'))
+                self.assertEqual([to_tuple(m, details=False) for m in current[1:]], [to_tuple(m, details=False) for m in new])
+                fixed = list(BaselineIndex(path).iter_diff(iter(current), 'fixed'))
+                self.assertEqual([to_tuple(m, details=False) for m in previous[1:]], [to_tuple(m, details=False) for m in fixed])
+                index = BaselineIndex(path)
+                both = list(index.iter_diff(iter(current), 'both'))
+                self.assertEqual(['new', 'new', 'absent', 'absent'], [index.state(m) for m in both])
+
+    def test_items_spanning_reads(self):
+        messages = [self._message(line) for line in range(1, 50)]
+        with unittest.mock.patch.object(baseline, 'READ_SIZE', 7):
+            for kind, path in self._reports(messages).items():
+                with self.subTest(kind):
+                    self.assertEqual([], list(BaselineIndex(path).iter_diff(messages)))
+
+    def test_cache_dir(self):
+        log = os.path.join(self.tmp.name, 'a.log')
+        with open(log, 'w') as f:
+            f.write('/src/a.cpp:1:3: warning: Warning [bugprone-a]\n')
+        cache_dir = os.path.join(self.tmp.name, 'cache')
+        MessageCache(cache_dir).update({'/src/a.cpp': log}, lambda path: [self._message(1)])
+        self.assertEqual([], list(BaselineIndex(cache_dir).iter_diff([self._message(1)])))
+        fixed = list(BaselineIndex(cache_dir).iter_diff([], 'fixed'))
+        self.assertEqual([to_tuple(self._message(1), details=False)], [to_tuple(m, details=False) for m in fixed])
+
+    def test_sarif_baseline_state(self):
+        path = self._reports([self._message(1)])['sarif']
+        index = BaselineIndex(path)
+        args = unittest.mock.Mock(compact=False, baseline_index=index)
+        output = SarifFormatter().format(index.iter_diff([self._message(2)], 'both'), args)
+        results = json.load(io.StringIO(output))['runs'][0]['results']
+        self.assertEqual([(2, 'new'), (1, 'absent')],
+                         [(r['locations'][0]['region']['startLine'], r['baselineState']) for r in results])
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+import io
+import os
+import tempfile
+import unittest
+
+from benchmarks import LogGenerator, compare, parse_size, run_stages
+from clang_tidy_converter import ClangMessage, ClangTidyParser
+
+
+def generate(size=1 << 16, **options):
+    stream = io.StringIO()
+    LogGenerator(**options).write(stream, size)
+    return stream.getvalue()
+
+
+def stage(name, mb_per_s, peak_rss_mb):
+    return {'stage': name, 'mb_per_s': mb_per_s, 'peak_rss_mb': peak_rss_mb}
+
+
+class LogGeneratorTest(unittest.TestCase):
+    def test_parse_size(self):
+        self.assertEqual(10 << 20, parse_size('10MB'))
+        self.assertEqual(5 << 30, parse_size('5 GB'))
+        self.assertEqual(1536, parse_size('1.5k'))
+        self.assertEqual(4096, parse_size('4096'))
+        with self.assertRaises(ValueError):
+            parse_size('ten')
+
+    def test_seeded(self):
+        self.assertEqual(generate(seed=1), generate(seed=1))
+        self.assertNotEqual(generate(seed=1), generate(seed=2))
+
+    def test_size(self):
+        log = generate(1 << 18)
+        self.assertGreaterEqual(len(log.encode('utf-8')), 1 << 18)
+        self.assertLess(len(log.encode('utf-8')), (1 << 18) + (1 << 14))
+
+    def test_options(self):
+        messages = ClangTidyParser().parse(io.StringIO(generate(notes=2, details=1, header_ratio=1.0)))
+        self.assertTrue(messages)
+        self.assertLessEqual(max(len(m.children) for m in messages), 2)
+        self.assertTrue(all(m.level != ClangMessage.Level.NOTE for m in messages))
+        self.assertTrue(all('/include/' in m.filepath for m in messages))
+        # header warnings repeat verbatim in several translation units
+        headers = [(m.filepath, m.line, m.column, m.message) for m in messages]
+        self.assertLess(len(set(headers)), len(headers))
+
+
+class StagesTest(unittest.TestCase):
+    def test_run_stages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'clang-tidy.log')
+            with open(path, 'w', newline='\n') as f:
+                LogGenerator().write(f, 1 << 16)
+            results = run_stages(path, ['parse', 'cc'], repeat=1)
+        self.assertEqual(['parse', 'cc'], [result['stage'] for result in results])
+        self.assertGreater(results[0]['messages'], 0)
+        for result in results:
+            self.assertGreater(result['mb_per_s'], 0)
+            self.assertGreater(result['messages_per_s'], 0)
+            self.assertGreater(result['peak_rss_mb'], 0)
+
+
+class CompareTest(unittest.TestCase):
+    def test_regressions(self):
+        old = {'stages': [stage('parse', 100, 50), stage('cc', 20, 60), stage('sq', 30, 60)]}
+        new = {'stages': [stage('parse', 95, 50), stage('cc', 15, 60), stage('sq', 30, 90), stage('dump', 40, 50)]}
+        rows, regressions = compare(old, new, threshold=0.1)
+        self.assertEqual(['parse', 'cc', 'sq'], [row[0] for row in rows])
+        self.assertEqual(['cc', 'sq'], regressions)
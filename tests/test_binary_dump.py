@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import io
+import os
+import timeit
+import unittest
+
+from clang_tidy_converter import BinaryFormatter, BinaryDumpParser, ClangMessage, ClangTidyParser, MappedClangTidyParser
+from clang_tidy_converter.parser.binary_parser import is_binary_dump
+from helpers import to_tuple
+
+LOG = ('/src/a.cpp:10:5: warning: Potential leak ä [clang-analyzer-cplusplus.NewDeleteLeaks]\r\n'
+       '  return new A;\n'
+       '         ^\n'
+       '/src/a.h:2:1: note: Allocated here\n'
+       '  A *f();\n'
+       '/src/b.cpp:1:1: error: Broken [clang-diagnostic-error]\n'
+       'error: too many errors emitted\n').encode('utf-8')
+
+
+def round_trip(messages):
+    return BinaryDumpParser().parse(BinaryFormatter().format(messages, None))
+
+
+class BinaryDumpTest(unittest.TestCase):
+    def test_round_trip_of_parsed_messages(self):
+        messages = MappedClangTidyParser().parse(LOG)
+        self.assertEqual([to_tuple(m) for m in messages], [to_tuple(m) for m in round_trip(messages)])
+
+    def test_round_trip_of_nested_messages(self):
+        grandchild = ClangMessage('/src/c.h', 3, 4, ClangMessage.Level.NOTE, 'Deep', '', ['x\n'])
+        child = ClangMessage('/src/b.h', 2, 1, ClangMessage.Level.NOTE, 'Note', '', [], [grandchild])
+        messages = [
+            ClangMessage('/src/a.cpp', 1, 2, ClangMessage.Level.FATAL, 'Fatal ✓', 'name', ['  ^\n', ''], [child]),
+            ClangMessage('/src/a.cpp', 1, 2, ClangMessage.Level.REMARK, 'Fatal ✓', 'name'),
+            ClangMessage(),
+        ]
+        self.assertEqual([to_tuple(m) for m in messages], [to_tuple(m) for m in round_trip(messages)])
+
+    def test_strings_are_interned(self):
+        messages = [ClangMessage('/src/long/path/to/a.cpp', line, 1, ClangMessage.Level.WARNING, 'Same message', 'check')
+                    for line in range(100)]
+        dump = BinaryFormatter().format(messages, None)
+        self.assertEqual(1, dump.count(b'/src/long/path/to/a.cpp'))
+        self.assertEqual(1, dump.count(b'Same message'))
+
+    def test_empty_dump(self):
+        dump = BinaryFormatter().format([], None)
+        self.assertTrue(is_binary_dump(dump))
+        self.assertEqual([], BinaryDumpParser().parse(dump))
+
+    def test_dump_at_offset(self):
+        messages = MappedClangTidyParser().parse(LOG)
+        data = b'header' + BinaryFormatter().format(messages, None)
+        self.assertEqual([to_tuple(m) for m in messages], [to_tuple(m) for m in BinaryDumpParser().parse(data, 6)])
+
+    def test_not_a_dump(self):
+        self.assertFalse(is_binary_dump(LOG))
+        with self.assertRaises(ValueError):
+            BinaryDumpParser().parse(LOG)
+
+    @unittest.skipUnless(os.environ.get('TIMING_TESTS'), 'depends on the machine; set TIMING_TESTS=1 to run')
+    def test_load_benchmark(self):
+        log = LOG * 5000
+        dump = BinaryFormatter().format(MappedClangTidyParser().parse(log), None)
+        def run(parse):
+            return min(timeit.repeat(parse, number=1, repeat=3))
+        timings = {
+            'text': run(lambda: ClangTidyParser().parse(io.TextIOWrapper(io.BytesIO(log), encoding='utf-8', newline='\n'))),
+            'mapped': run(lambda: MappedClangTidyParser().parse(log)),
+            'dump': run(lambda: BinaryDumpParser().parse(dump)),
+        }
+        self.assertLess(timings['dump'], timings['mapped'], timings)
+        self.assertLess(timings['dump'], timings['text'], timings)
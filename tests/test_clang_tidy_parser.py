@@ -1,8 +1,81 @@
 #!/usr/bin/env python3
 
+import os
+import re
+import timeit
 import unittest
 
-from clang_tidy_converter import ClangTidyParser, ClangMessage
+from clang_tidy_converter import ClangTidyParser, ClangMessage, MappedClangTidyParser
+
+LEGACY_MESSAGE_REGEX = re.compile(r"^(?P<filepath>.+):(?P<line>\d+):(?P<column>\d+): (?P<level>\S+): (?P<message>.*?)( \[(?P<diagnostic_name>.*)\])?$")
+LEGACY_IGNORE_REGEX = re.compile(r"^error:.*$")
+
+# lines where the header or the diagnostic name could be split in several ways
+TRICKY_LINES = [
+    '/src/a.cpp:1:2: warning: message [check]\n',
+    '/src/a.cpp:1:2: warning: message [check]\r\n',
+    '/src/a.cpp:1:2: warning: message [check] trailing\n',
+    '/src/a.cpp:1:2: warning: a [b] c [d]\n',
+    '/src/a.cpp:1:2: warning: [only name]',
+    '/src/a.cpp:1:2: warning:  []',
+    '/src/a.cpp:1:2: warning: ',
+    '/src/a.cpp:1:2: warning:',
+    'C:/src/a.cpp:1:2: note: x:3:4: y: z',
+    'a:1:2: b:3:4: warning: message',
+    'a:1:2: b:c: message',
+    ':1:2: warning: no path',
+    '/src/a.cpp:1:2: warning: multi\nline [check]',
+    '/src/a.cpp:1:2:warning: no space',
+    '/src/a.cpp:1: warning: no column',
+    'error: generic',
+    'error: generic\nsecond line',
+    '  int x = a ? b:1:2: c;\n',
+    '           ^\n',
+]
+
+
+class LegacyClangTidyParser(ClangTidyParser):
+    def _parse_message(self, line):
+        regex_res = LEGACY_MESSAGE_REGEX.match(line)
+        if regex_res is not None:
+            return ClangMessage(regex_res.group('filepath'), int(regex_res.group('line')), int(regex_res.group('column')),
+                                ClangMessage.levelFromString(regex_res.group('level')), regex_res.group('message'),
+                                regex_res.group('diagnostic_name'))
+        return None
+
+    def _is_ignored(self, line):
+        return LEGACY_IGNORE_REGEX.match(line) is not None
+
+
+def legacy_classify(line):
+    if LEGACY_IGNORE_REGEX.match(line) is not None:
+        return 'ignored'
+    regex_res = LEGACY_MESSAGE_REGEX.match(line)
+    if regex_res is None:
+        return None
+    return (regex_res.group('filepath'), int(regex_res.group('line')), int(regex_res.group('column')),
+            ClangMessage.levelFromString(regex_res.group('level')), regex_res.group('message'), regex_res.group('diagnostic_name') or '')
+
+
+def classify(line):
+    parser = ClangTidyParser()
+    if parser._is_ignored(line):
+        return 'ignored'
+    message = parser._parse_message(line)
+    if message is None:
+        return None
+    return (message.filepath, message.line, message.column, message.level, message.message, message.diagnostic_name)
+
+
+def classify_span(line):
+    data = line.rstrip('\n').encode('utf-8')
+    parser = MappedClangTidyParser()
+    if parser._is_ignored_span(data, 0, len(data)):
+        return 'ignored'
+    message = parser._parse_message_span(data, 0, len(data))
+    if message is None:
+        return None
+    return (message.filepath, message.line, message.column, message.level, message.message, message.diagnostic_name)
 
 class ClangTidyParserTest(unittest.TestCase):
     def test_warning_message(self):
@@ -97,5 +170,49 @@ class ClangTidyParserTest(unittest.TestCase):
         messages = parser.parse(['error: -mapcs-frame not supported'])
         self.assertEqual([], messages)
 
+    def test_iter_messages_yields_before_end_of_input(self):
+        consumed = []
+        def lines():
+            for line in ['/usr/lib/include/some_include.h:1039:3: warning: Potential memory leak [clang-analyzer-cplusplus.NewDeleteLeaks]',
+                         '  ^',
+                         '/home/user/some_source.cpp:267:15: note: Calling \'OtherFunction\'',
+                         '/home/user/some_source.cpp:300:1: error: Unknown type name [clang-diagnostic-error]',
+                         '/home/user/some_source.cpp:301:1: error: Unknown type name [clang-diagnostic-error]']:
+                consumed.append(line)
+                yield line
+        messages = ClangTidyParser().iter_messages(lines())
+        msg = next(messages)
+        self.assertEqual(4, len(consumed))
+        self.assertEqual(['  ^'], msg.details_lines)
+        self.assertEqual(1, len(msg.children))
+        self.assertEqual(300, next(messages).line)
+        self.assertEqual(301, next(messages).line)
+        self.assertEqual([], list(messages))
+
+    def test_same_classification_as_legacy_regex(self):
+        for line in TRICKY_LINES:
+            with self.subTest(line=line):
+                self.assertEqual(legacy_classify(line), classify(line))
+                if '\n' not in line.rstrip('\n'):
+                    self.assertEqual(legacy_classify(line), classify_span(line))
+
+    @unittest.skipUnless(os.environ.get('TIMING_TESTS'), 'depends on the machine; set TIMING_TESTS=1 to run')
+    def test_classifier_benchmark(self):
+        lines = ['/usr/lib/include/some_include.h:1039:3: warning: Potential memory leak [clang-analyzer-cplusplus.NewDeleteLeaks]\n',
+                 '  return new SomeFunction(some_argument, other_argument, yet_another_argument, 42);\n',
+                 '         ^~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~\n',
+                 '/home/user/some_source.cpp:267:15: note: Calling \'OtherFunction\'\n',
+                 '    auto sf = OtherFunction(a, b, c);\n',
+                 '              ^\n'] * 5000
+        legacy = LegacyClangTidyParser()
+        parser = ClangTidyParser()
+        def run(classify):
+            return len(lines) / min(timeit.repeat(classify, number=1, repeat=5))
+        lines_per_second = {
+            'legacy': run(lambda: [(legacy._parse_message(line), line) for line in lines if not legacy._is_ignored(line)]),
+            'classifier': run(lambda: list(parser._iter_line_entries(lines))),
+        }
+        self.assertGreater(lines_per_second['classifier'], lines_per_second['legacy'], lines_per_second)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from clang_tidy_converter import ClangMessage, CodeClimateFormatter
+from clang_tidy_converter.__main__ import create_argparser
+from clang_tidy_converter.formatter.classification import DiagnosticClassifier, LEVEL_NAMES, load_category_map
+
+
+class DiagnosticClassifierTest(unittest.TestCase):
+    def test_categories_are_ordered_as_rules(self):
+        classifier = DiagnosticClassifier()
+        self.assertEqual(('Clarity', 'Style'), classifier.categories('cppcoreguidelines-readability-avoid-goto'))
+        self.assertEqual(('Clarity', 'Complexity', 'Duplication'), classifier.categories('readability-simplify-redundant'))
+        self.assertEqual(('Style',), classifier.categories('misc-misc-naming'))
+        self.assertEqual(('Compatibility',), classifier.categories('boost-use-to-string'))
+        self.assertEqual(('Bug Risk',), classifier.categories('my-boost-use-to-string'))
+        self.assertEqual(('Bug Risk',), classifier.categories(''))
+
+    def test_categories_are_memoized(self):
+        classifier = DiagnosticClassifier()
+        for _ in range(100):
+            for name in ['bugprone-use-after-move', 'modernize-use-auto', 'cert-err58-cpp']:
+                classifier.categories(name)
+        info = classifier.categories.cache_info()
+        self.assertEqual(3, info.misses)
+        self.assertEqual(297, info.hits)
+
+    def test_custom_rules_take_precedence(self):
+        classifier = DiagnosticClassifier([('^mycompany-', 'Security'), ('-perf-', 'Performance'), ('^mycompany-', 'Style')])
+        self.assertEqual(('Security', 'Performance', 'Style'), classifier.categories('mycompany-perf-naming'))
+        self.assertEqual(('Clarity',), classifier.categories('readability-perf'))
+
+    def test_load_category_map(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'categories.json')
+            with open(path, 'w') as f:
+                json.dump({'^mycompany-': 'Style', '-secure-': ['Security', 'Bug Risk']}, f)
+            self.assertEqual([('^mycompany-', 'Style'), ('-secure-', 'Security'), ('-secure-', 'Bug Risk')], load_category_map(path))
+            args = create_argparser().parse_args(['cc', '--category_map', path])
+            self.assertEqual(['Security', 'Bug Risk'],
+                             CodeClimateFormatter(classifier=DiagnosticClassifier(args.category_map))._extract_categories(
+                                 ClangMessage(diagnostic_name='cert-secure-random'), args))
+            for mapping, error in (({'^mycompany-': 'Typos'}, "unknown category 'Typos' for '\\^mycompany-'"),
+                                   ({'(mycompany': 'Style'}, "invalid regex '\\(mycompany'"),
+                                   ({'^mycompany-': 1}, "expected a category or a list of them for '\\^mycompany-'"),
+                                   ({'^mycompany-': [None]}, "unknown category 'None'")):
+                with self.subTest(mapping=mapping):
+                    with open(path, 'w') as f:
+                        json.dump(mapping, f)
+                    with self.assertRaisesRegex(ValueError, error):
+                        load_category_map(path)
+                    with self.assertRaisesRegex(SystemExit, '2'):
+                        with contextlib.redirect_stderr(io.StringIO()):
+                            create_argparser().parse_args(['cc', '--category_map', path])
+
+    def test_level_names(self):
+        self.assertEqual(list(ClangMessage.Level), list(LEVEL_NAMES))
+
+
+if __name__ == '__main__':
+    unittest.main()
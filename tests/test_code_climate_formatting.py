@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import argparse
 import unittest
 import unittest.mock
 import json
@@ -229,6 +230,10 @@ class CodeClimateFormatterTest(unittest.TestCase):
         child2 = ClangMessage(line=2)
         self._test_fingerprints_different(ClangMessage(children=[child1]), ClangMessage(children=[child2]))
 
+    def test_format_without_compact_option(self):
+        args = argparse.Namespace(use_location_lines=True, as_json_array=True)
+        self.assertTrue(CodeClimateFormatter().format([ClangMessage('/src/a.cpp', 1, 2)], args).startswith('[\n  {\n    "type"'))
+
     def _test_fingerprints_different(self, msg1, msg2):
         formatter = CodeClimateFormatter()
         self.assertNotEqual(formatter._generate_fingerprint(msg1), formatter._generate_fingerprint(msg2))
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+import gzip
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from clang_tidy_converter.__main__ import create_argparser, main
+from clang_tidy_converter.compressed_io import (CHUNK_SIZE, GZIP, ZSTD, codec_for_path, detect_codec, iter_decompressed,
+                                                open_compressed, open_decompressed)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+LOG = ''.join(f'/src/file{i % 7}.cpp:{i}:3: warning: Warning {i} [bugprone-check-{i % 3}]\n'
+              f'    int x{i};\n'
+              f'        ^\n' for i in range(3000)).encode()
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def compress(data, codec):
+    output = io.BytesIO()
+    with open_compressed(output, codec) as stream:
+        stream.write(data)
+    return output.getvalue()
+
+
+def decompress(data, codec):
+    with open_decompressed(io.BytesIO(data), codec) as reader:
+        return reader.readall()
+
+
+class FailingStream(io.BytesIO):
+    def write(self, data):
+        raise OSError('disk full')
+
+
+class CompressedIOTest(unittest.TestCase):
+    def test_gzip(self):
+        compressed = compress(LOG, GZIP)
+        self.assertLess(len(compressed), len(LOG) // 5)
+        self.assertEqual(LOG, gzip.decompress(compressed))
+        self.assertEqual(LOG, decompress(gzip.compress(LOG), GZIP))
+        self.assertEqual(LOG, decompress(compressed, GZIP))
+
+    @unittest.skipIf(zstandard is None, 'needs zstandard')
+    def test_zstd(self):
+        compressed = compress(LOG, ZSTD)
+        self.assertEqual(ZSTD, detect_codec(compressed))
+        self.assertEqual(LOG, decompress(compressed, ZSTD))
+
+    def test_detect_codec(self):
+        self.assertEqual(GZIP, detect_codec(gzip.compress(b'')))
+        self.assertEqual(ZSTD, detect_codec(b'\x28\xb5\x2f\xfd\x00'))
+        self.assertIsNone(detect_codec(LOG))
+        self.assertIsNone(detect_codec(b''))
+        self.assertEqual(GZIP, codec_for_path('build/clang-tidy.log.GZ'))
+        self.assertEqual(ZSTD, codec_for_path('report.json.zst'))
+        self.assertIsNone(codec_for_path('report.json'))
+        self.assertIsNone(codec_for_path(None))
+
+    def test_concatenated_streams(self):
+        self.assertEqual(LOG + LOG[:10], decompress(gzip.compress(LOG) + gzip.compress(LOG[:10]), GZIP))
+
+    def test_bounded_chunks(self):
+        data = bytes(CHUNK_SIZE * 20)
+        chunks = list(iter_decompressed(io.BytesIO(gzip.compress(data)), GZIP))
+        self.assertLessEqual(max(map(len, chunks)), CHUNK_SIZE)
+        self.assertEqual(data, b''.join(chunks))
+
+    def test_truncated_stream(self):
+        with self.assertRaises(EOFError):
+            decompress(gzip.compress(LOG)[:-10], GZIP)
+
+    def test_head(self):
+        with open_decompressed(io.BytesIO(gzip.compress(LOG)), GZIP) as reader:
+            self.assertEqual(LOG[:8], reader.head(8))
+            self.assertEqual(LOG[:100], reader.read(100))
+            self.assertEqual(LOG[100:], reader.readall())
+
+    def test_close_before_end(self):
+        reader = open_decompressed(io.BytesIO(gzip.compress(LOG * 20)), GZIP)
+        reader.read(10)
+        reader.close()
+        self.assertFalse(reader._thread.is_alive())
+
+    def test_write_error(self):
+        with self.assertRaisesRegex(OSError, 'disk full'):
+            with open_compressed(FailingStream(), GZIP) as stream:
+                for _ in range(100):
+                    stream.write(LOG)
+
+
+class CompressedConversionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = self.path('clang-tidy.log')
+        with open(self.log, 'wb') as f:
+            f.write(LOG)
+        with gzip.open(self.path('clang-tidy.log.gz'), 'wb') as f:
+            f.write(LOG)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def convert(self, *args):
+        main(create_argparser().parse_args(list(args)))
+
+    def read(self, name):
+        with open(self.path(name), 'rb') as f:
+            return f.read()
+
+    def test_compressed_input(self):
+        for jobs in ('1', '2'):
+            with self.subTest(jobs=jobs):
+                self.convert('-i', self.log, '-o', self.path('plain.json'), 'cc')
+                self.convert('-i', self.path('clang-tidy.log.gz'), '--jobs', jobs, '-o', self.path('gz.json'), 'cc')
+                self.assertEqual(self.read('plain.json'), self.read('gz.json'))
+
+    def test_compressed_stdin(self):
+        expected = subprocess.run([sys.executable, '-m', 'clang_tidy_converter', 'sq'], input=LOG, cwd=ROOT_DIR,
+                                  stdout=subprocess.PIPE, check=True).stdout
+        output = subprocess.run([sys.executable, '-m', 'clang_tidy_converter', 'sq'], input=gzip.compress(LOG), cwd=ROOT_DIR,
+                                stdout=subprocess.PIPE, check=True).stdout
+        self.assertEqual(expected, output)
+
+    def test_compressed_output(self):
+        self.convert('-i', self.log, '-o', self.path('plain.json'), '-e', f'dump={self.path("plain.dump")}', 'cc')
+        self.convert('-i', self.log, '-o', self.path('report.json.gz'), '-e', f'dump={self.path("issues.dump.gz")}', 'cc')
+        self.assertEqual(self.read('plain.json'), gzip.decompress(self.read('report.json.gz')))
+        self.assertEqual(self.read('plain.dump'), gzip.decompress(self.read('issues.dump.gz')))
+        self.convert('-i', self.log, '-o', self.path('report.json'), '--compression', 'gzip', 'cc')
+        self.assertEqual(self.read('plain.json'), gzip.decompress(self.read('report.json')))
+
+    def test_compressed_dump(self):
+        self.convert('-i', self.log, '-o', self.path('plain.json'), 'cc')
+        self.convert('-i', self.log, '-o', self.path('issues.dump.gz'), 'dump')
+        self.convert('-i', self.path('issues.dump.gz'), '-o', self.path('dump.json'), 'cc')
+        self.assertEqual(self.read('plain.json'), self.read('dump.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
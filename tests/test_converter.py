@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import mmap
+import os
+import tempfile
+import unittest
+
+from clang_tidy_converter import BinaryDumpOptions, CodeClimateOptions, ConversionOptions, Converter, HTMLReportOptions, \
+    SarifOptions, SonarQubeOptions
+from clang_tidy_converter.__main__ import create_argparser, main
+
+LOG = '''/home/user/project/src/a.cpp:10:3: warning: Potential memory leak [clang-analyzer-cplusplus.NewDeleteLeaks]
+  return new SomeFunction(
+  ^
+/home/user/project/include/a.h:267:15: note: Calling 'OtherFunction'
+    auto sf = OtherFunction( a, b, c );
+              ^
+/home/user/project/src/b.cpp:1:1: error: Unknown type name 'foo' [clang-diagnostic-error]
+foo x;
+/home/user/project/src/a.cpp:10:3: warning: Potential memory leak [clang-analyzer-cplusplus.NewDeleteLeaks]
+'''
+
+
+class ConverterTest(unittest.TestCase):
+    def setUp(self):
+        self.converter = Converter(ConversionOptions(project_roots=('/home/user/project',)))
+
+    def test_same_output_as_command_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, 'clang-tidy.log')
+            output = os.path.join(tmp, 'output.json')
+            with open(log, 'w', newline='') as f:
+                f.write(LOG)
+            main(create_argparser().parse_args(['--input', log, '--project_root', '/home/user/project', '--output', output, 'sarif', '-c']))
+            with open(output) as f:
+                expected = f.read()
+        self.assertEqual(expected, self.converter.convert(LOG.encode(), SarifOptions(compact=True)) + '\n')
+
+    def test_sources(self):
+        expected = self.converter.convert(LOG.encode(), SonarQubeOptions())
+        self.assertEqual(['src/a.cpp', 'src/b.cpp', 'src/a.cpp'],
+                         [issue['primaryLocation']['filePath'] for issue in json.loads(expected)['issues']])
+        self.assertEqual(expected, self.converter.convert(bytearray(LOG.encode()), SonarQubeOptions()))
+        self.assertEqual(expected, self.converter.convert(memoryview(LOG.encode()), SonarQubeOptions()))
+        self.assertEqual(expected, self.converter.convert(LOG, SonarQubeOptions()))
+        self.assertEqual(expected, self.converter.convert(io.StringIO(LOG, newline=None), SonarQubeOptions()))
+        with tempfile.TemporaryFile() as f:
+            f.write(LOG.encode())
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                self.assertEqual(expected, self.converter.convert(data, SonarQubeOptions()))
+        dump = Converter().convert(LOG.encode(), BinaryDumpOptions())
+        self.assertIsInstance(dump, bytes)
+        self.assertEqual(expected, self.converter.convert(dump, SonarQubeOptions()))
+
+    def test_crlf_sources(self):
+        crlf_log = LOG.replace('\n', '\r\n')
+        expected = self.converter.convert(crlf_log.encode(), SarifOptions())
+        self.assertNotEqual(self.converter.convert(LOG.encode(), SarifOptions()), expected)
+        self.assertEqual(expected, self.converter.convert(crlf_log, SarifOptions()))
+
+    def test_write_to_stream(self):
+        stream = io.StringIO()
+        self.assertIsNone(self.converter.convert(LOG, CodeClimateOptions(as_json_array=True), stream))
+        self.assertEqual(self.converter.convert(LOG, CodeClimateOptions(as_json_array=True)), stream.getvalue())
+
+    def test_deduplicate(self):
+        messages = Converter(ConversionOptions(deduplicate=True)).parse(LOG * 2)
+        self.assertEqual(['/home/user/project/src/a.cpp', '/home/user/project/src/b.cpp', '/home/user/project/src/a.cpp'],
+                         [message.filepath for message in messages])
+
+    def test_category_map(self):
+        issues = json.loads(self.converter.convert(LOG, CodeClimateOptions(as_json_array=True, category_map=[('^clang-', 'Style')])))
+        self.assertEqual([['Style']] * 3, [issue['categories'] for issue in issues])
+
+    def test_concurrent_calls(self):
+        options = [CodeClimateOptions(), SarifOptions(), SonarQubeOptions(compact=True), HTMLReportOptions(software_name='Test'),
+                   CodeClimateOptions(fingerprint_algorithm='blake2b')] * 10
+        expected = [self.converter.convert(LOG * 50, o) for o in options]
+        with ThreadPoolExecutor(8) as pool:
+            self.assertEqual(expected, list(pool.map(lambda o: self.converter.convert(LOG * 50, o), options)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+import io
+import json
+import unittest
+
+from clang_tidy_converter import ClangMessage, MessageDeduplicator
+
+
+class MessageDeduplicatorTest(unittest.TestCase):
+    def _message(self, line=1, note_line=2, diagnostic_name='bugprone-a'):
+        child = ClangMessage('/src/a.h', note_line, 1, ClangMessage.Level.NOTE, 'Note')
+        return ClangMessage('/src/a.h', line, 3, ClangMessage.Level.WARNING, 'Warning', diagnostic_name, ['  ^'], [child])
+
+    def test_drops_exact_repeats(self):
+        messages = [self._message(), self._message(), self._message(line=5), self._message()]
+        unique = list(MessageDeduplicator().iter_unique(iter(messages)))
+        self.assertEqual([messages[0], messages[2]], unique)
+
+    def test_children_and_diagnostic_name_are_part_of_identity(self):
+        messages = [self._message(), self._message(note_line=3), self._message(diagnostic_name='bugprone-b')]
+        self.assertEqual(messages, list(MessageDeduplicator().iter_unique(messages)))
+
+    def test_report(self):
+        deduplicator = MessageDeduplicator()
+        list(deduplicator.iter_unique([self._message(), self._message(line=5), self._message()]))
+        stream = io.StringIO()
+        deduplicator.write_report(stream)
+        self.assertEqual([
+            {'path': '/src/a.h', 'line': 1, 'column': 3, 'description': 'Warning', 'check_name': 'bugprone-a', 'occurrences': 2},
+            {'path': '/src/a.h', 'line': 5, 'column': 3, 'description': 'Warning', 'check_name': 'bugprone-a', 'occurrences': 1},
+        ], json.loads(stream.getvalue()))
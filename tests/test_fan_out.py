@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import unittest
+
+from clang_tidy_converter.fan_out import fan_out
+from clang_tidy_converter.formatter import Formatter
+
+
+class ListFormatter(Formatter):
+    def begin(self, stream, args):
+        super().begin(stream, args)
+        self.messages = []
+        self.ended = False
+
+    def emit(self, message):
+        self.messages.append(message)
+
+    def end(self):
+        self.ended = True
+
+
+class FailingFormatter(ListFormatter):
+    def emit(self, message):
+        super().emit(message)
+        raise RuntimeError('disk full')
+
+
+def started(formatter):
+    formatter.begin(None, None)
+    return formatter
+
+
+class FanOutTest(unittest.TestCase):
+    def test_all_formatters_receive_all_messages(self):
+        formatters = [started(ListFormatter()) for _ in range(3)]
+        fan_out(iter(range(10000)), formatters)
+        for formatter in formatters:
+            self.assertEqual(list(range(10000)), formatter.messages)
+            self.assertTrue(formatter.ended)
+
+    def test_messages_are_read_once(self):
+        reads = []
+        def messages():
+            for i in range(1000):
+                reads.append(i)
+                yield i
+        fan_out(messages(), [started(ListFormatter()), started(ListFormatter())])
+        self.assertEqual(list(range(1000)), reads)
+
+    def test_formatter_error_is_raised(self):
+        failing = started(FailingFormatter())
+        received = started(ListFormatter())
+        with self.assertRaisesRegex(RuntimeError, 'disk full'):
+            fan_out(iter(range(100000)), [failing, received])
+        self.assertEqual([0], failing.messages)
+        self.assertFalse(failing.ended)
+        self.assertEqual(100000, len(received.messages))
+        self.assertTrue(received.ended)
+
+
+if __name__ == '__main__':
+    unittest.main()
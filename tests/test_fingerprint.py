@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import hashlib
+import os
+import timeit
+import unittest
+
+from clang_tidy_converter import ClangMessage, Fingerprinter
+
+
+def legacy_fingerprint(message):
+    h = hashlib.md5()
+    h.update(message.filepath.encode('utf8'))
+    h.update(str(message.line).encode('utf8'))
+    h.update(str(message.column).encode('utf8'))
+    h.update(message.message.encode('utf8'))
+    h.update(message.diagnostic_name.encode('utf8'))
+    for child in message.children:
+        h.update(legacy_fingerprint(child).encode('utf-8'))
+    return h.hexdigest()
+
+
+def make_messages(count, notes):
+    # the same note chain repeated for every translation unit including a header
+    return [ClangMessage(f'/src/file{i % 100}.cpp', i, 3, ClangMessage.Level.WARNING, 'Potential memory leak ä', 'bugprone-a',
+                         children=[ClangMessage(f'/include/header{j}.h', j, 1, ClangMessage.Level.NOTE, f'Calling \'f{j}\'')
+                                   for j in range(notes)])
+            for i in range(count)]
+
+
+class FingerprinterTest(unittest.TestCase):
+    def test_same_as_legacy_md5_fingerprint(self):
+        child = ClangMessage('/some/file/path1.cpp', 8, 10, ClangMessage.Level.NOTE, 'Allocated here', '', ['return new A;', '       ^'])
+        msg = ClangMessage('/some/file/path.cpp', 100, 2, ClangMessage.Level.WARNING, 'Memory leak', 'bugprone-undefined-memory-manipulation.SomethingWrong',
+                           ['void a(int)', '          ^'], [child])
+        self.assertEqual('f2f6ccb970f2259d10e525b4b5805a5c', Fingerprinter().fingerprint(msg))
+        fingerprinter = Fingerprinter()
+        for message in make_messages(50, 3) * 2:
+            self.assertEqual(legacy_fingerprint(message), fingerprinter.fingerprint(message))
+
+    def test_cache_is_bounded(self):
+        fingerprinter = Fingerprinter(cache_size=10)
+        for message in make_messages(50, 3):
+            fingerprinter.fingerprint(message)
+        self.assertEqual(10, fingerprinter._digest.cache_info().currsize)
+
+    def test_blake2b_fingerprint(self):
+        msg = make_messages(1, 2)[0]
+        fingerprint = Fingerprinter('blake2b').fingerprint(msg)
+        self.assertEqual(32, len(fingerprint))
+        self.assertNotEqual(legacy_fingerprint(msg), fingerprint)
+
+    def test_unsupported_algorithm(self):
+        with self.assertRaises(ValueError):
+            Fingerprinter('crc32')
+
+    @unittest.skipUnless(os.environ.get('TIMING_TESTS'), 'depends on the machine; set TIMING_TESTS=1 to run')
+    def test_benchmark(self):
+        messages = make_messages(2000, 5)
+        def run(fingerprint):
+            return min(timeit.repeat(lambda: [fingerprint(m) for m in messages], number=1, repeat=3))
+        timings = {
+            'legacy md5': run(legacy_fingerprint),
+            'md5': run(Fingerprinter('md5').fingerprint),
+            'blake2b': run(Fingerprinter('blake2b').fingerprint),
+        }
+        self.assertLess(timings['md5'], timings['legacy md5'], timings)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+import warnings
+
+from clang_tidy_converter import Converter, ConversionOptions
+from clang_tidy_converter.__main__ import create_argparser, main
+from clang_tidy_converter.formatter import ENTRY_POINT_GROUP, formatter_class, output_formats
+from clang_tidy_converter.formatter.plugins import find_entry_points
+
+LOG = ('/src/a.cpp:1:3: warning: Warning A [bugprone-a]\n'
+       '/src/b.cpp:2:1: error: Error B [misc-b]\n')
+
+PLUGIN = '''
+from xml.sax.saxutils import quoteattr
+
+from clang_tidy_converter.formatter import Formatter
+
+
+class CheckstyleFormatter(Formatter):
+    help = 'Checkstyle XML'
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument('--tool_name', default='clang-tidy')
+
+    def begin(self, stream, args):
+        super().begin(stream, args)
+        stream.write('<checkstyle>')
+
+    def emit(self, message):
+        self.stream.write(f'<error source={quoteattr(self.args.tool_name)} file={quoteattr(message.filepath)} '
+                          f'line="{message.line}" message={quoteattr(message.message)}/>')
+
+    def end(self):
+        self.stream.write('</checkstyle>')
+'''
+
+ENTRY_POINTS = f'''[console_scripts]
+checkstyle = checkstyle_plugin:main
+
+[{ENTRY_POINT_GROUP}]
+checkstyle = checkstyle_plugin:CheckstyleFormatter
+sq = checkstyle_plugin:CheckstyleFormatter
+run = checkstyle_plugin:CheckstyleFormatter
+cc = clang_tidy_converter.formatter.code_climate_formatter:CodeClimateFormatter
+'''
+
+CHECKSTYLE = ('<checkstyle><error source="clang-tidy" file="/src/a.cpp" line="1" message="Warning A"/>'
+              '<error source="clang-tidy" file="/src/b.cpp" line="2" message="Error B"/></checkstyle>')
+
+
+class CheckstyleOptions:
+    output_format = 'checkstyle'
+    tool_name = 'clang-tidy'
+
+
+class FormatterPluginTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp.name, 'checkstyle_plugin.py'), 'w') as f:
+            f.write(PLUGIN)
+        os.mkdir(os.path.join(self.tmp.name, 'checkstyle_plugin-1.0.dist-info'))
+        with open(os.path.join(self.tmp.name, 'checkstyle_plugin-1.0.dist-info', 'entry_points.txt'), 'w') as f:
+            f.write(ENTRY_POINTS)
+        sys.path.insert(0, self.tmp.name)
+        find_entry_points.cache_clear()
+        # of the plugins named as built-in formats and commands
+        ignore_warnings = warnings.catch_warnings()
+        ignore_warnings.__enter__()
+        self.addCleanup(ignore_warnings.__exit__, None, None, None)
+        warnings.simplefilter('ignore')
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        sys.modules.pop('checkstyle_plugin', None)
+        find_entry_points.cache_clear()
+        self.tmp.cleanup()
+
+    def test_discovery(self):
+        self.assertEqual('checkstyle_plugin:CheckstyleFormatter', find_entry_points(ENTRY_POINT_GROUP)['checkstyle'].value)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(('cc', 'html', 'sq', 'sarif', 'dump', 'checkstyle'), output_formats())
+        # not for cc, a formatter of this package, e.g. registered by an older version
+        self.assertEqual(["formatter plugin 'sq' is ignored, as the name is taken by a built-in output format",
+                          "formatter plugin 'run' is ignored, as the name is taken by a built-in command"],
+                         [str(warning.message) for warning in caught])
+        self.assertEqual('CheckstyleFormatter', formatter_class('checkstyle').__name__)
+        # built-in formatters take precedence
+        self.assertEqual('SonarQubeFormatter', formatter_class('sq').__name__)
+        for output_format in ('junit', 'run'):
+            with self.assertRaisesRegex(ValueError, 'unsupported output format'):
+                formatter_class(output_format)
+
+    def test_command_line(self):
+        log = os.path.join(self.tmp.name, 'clang-tidy.log')
+        with open(log, 'w') as f:
+            f.write(LOG)
+        output = os.path.join(self.tmp.name, 'out.xml')
+        emitted = os.path.join(self.tmp.name, 'emitted.xml')
+        main(create_argparser().parse_args(['-i', log, '-o', output, '-e', f'checkstyle={emitted}', 'checkstyle', '--tool_name', 'tidy']))
+        with open(output) as f:
+            self.assertEqual(CHECKSTYLE.replace('clang-tidy', 'tidy') + '\n', f.read())
+        with open(emitted) as f:
+            self.assertEqual(CHECKSTYLE + '\n', f.read())
+
+    def test_lazy_lookup(self):
+        args = create_argparser().parse_args(['cc'])
+        self.assertEqual('cc', args.output_format)
+        # built-in formats do not look for plugins
+        self.assertEqual(0, find_entry_points.cache_info().currsize)
+        help_output = io.StringIO()
+        with contextlib.redirect_stdout(help_output), self.assertRaises(SystemExit):
+            create_argparser().parse_args(['--help'])
+        self.assertIn('checkstyle', help_output.getvalue())
+        error_output = io.StringIO()
+        with contextlib.redirect_stderr(error_output), self.assertRaises(SystemExit):
+            create_argparser().parse_args(['junit'])
+        self.assertIn("invalid choice: 'junit'", error_output.getvalue())
+        self.assertIn("'checkstyle'", error_output.getvalue())
+        self.assertEqual('tidy', create_argparser().parse_args(['run', 'checkstyle', '--tool_name', 'tidy']).tool_name)
+
+    def test_converter(self):
+        self.assertEqual(CHECKSTYLE, Converter(ConversionOptions()).convert(LOG, CheckstyleOptions()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+import json
+import re
+import unittest
+import unittest.mock
+
+from clang_tidy_converter import ClangMessage, HTMLReportFormatter
+
+
+class HTMLReportFormatterTest(unittest.TestCase):
+    def setUp(self):
+        self.messages = [
+            ClangMessage('/src/a.cpp', 1, 2, ClangMessage.Level.WARNING, 'Memory leak </script>', 'bugprone-a'),
+            ClangMessage('/src/b.cpp', 3, 4, ClangMessage.Level.ERROR, 'Unknown type', 'clang-diagnostic-error'),
+            ClangMessage('/src/a.cpp', 5, 6, ClangMessage.Level.WARNING, 'Memory leak', 'bugprone-a'),
+        ]
+
+    def _args(self, virtualized):
+        args = unittest.mock.Mock()
+        args.software_name = 'Project'
+        args.virtualized = virtualized
+        return args
+
+    def test_format(self):
+        report = HTMLReportFormatter().format(self.messages, self._args(False))
+        self.assertIn('<title>Project - Static Analysis Results</title>', report)
+        self.assertEqual(3, report.count('<td class="DESC">bugprone-a</td>') + report.count('<td class="DESC">clang-diagnostic-error</td>'))
+        self.assertIn('Memory leak &lt;/script&gt;', report)
+        self.assertNotIn('id="issues"', report)
+
+    def test_format_virtualized(self):
+        report = HTMLReportFormatter().format(self.messages, self._args(True))
+        self.assertNotIn('<td class="DESC">bugprone-a</td>', report)
+        data = re.search(r'<script type="application/json" id="issues">(.*?)</script>', report, re.S).group(1)
+        self.assertNotIn('</', data)
+        self.assertEqual({
+            'issues': [[0, 'Memory leak </script>', 0, 1, 2], [1, 'Unknown type', 1, 3, 4], [0, 'Memory leak', 0, 5, 6]],
+            'groups': [['bt_warning_bugprone-a', 'Warning', 'bugprone-a'], ['bt_error_clang-diagnostic-error', 'Error', 'clang-diagnostic-error']],
+            'files': ['/src/a.cpp', '/src/b.cpp'],
+            'index': [[0, 2], [1]],
+        }, json.loads(data))
+        self.assertIn('class="bt_warning_bugprone-a" onclick="ToggleDisplay(this);', report)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# converts empty input to Code Climate JSON as the command line does and
+# prints the imported modules
+CC_RUN = """
+import runpy, sys
+sys.argv = ['clang_tidy_converter', 'cc']
+runpy.run_module('clang_tidy_converter', run_name='__main__')
+print(' '.join(sys.modules))
+"""
+
+# imports the package as a library and prints the imported modules
+PACKAGE_IMPORT = """
+import sys
+import clang_tidy_converter
+print(' '.join(sys.modules))
+"""
+
+# imports only the parsers, which any conversion needs
+PARSER_IMPORT = """
+import clang_tidy_converter.parser
+"""
+
+# modules the common cc conversion must not import
+HEAVY_MODULES = (
+    'asyncio',
+    'concurrent.futures',
+    'multiprocessing',
+    'importlib.metadata',
+    'tempfile',
+    'clang_tidy_converter.baseline',
+    'clang_tidy_converter.cache',
+    'clang_tidy_converter.converter',
+    'clang_tidy_converter.runner',
+    'clang_tidy_converter.fan_out',
+    'clang_tidy_converter.formatter.html_report_formatter',
+    'clang_tidy_converter.formatter.sharded_html_report',
+    'clang_tidy_converter.formatter.sonarqube_formatter',
+    'clang_tidy_converter.formatter.sarif_formatter',
+)
+
+# modules importing the package must not import either, as only the command
+# line needs them
+COMMAND_LINE_MODULES = (
+    'argparse',
+    'clang_tidy_converter.compressed_io',
+    'clang_tidy_converter.formatter.code_climate_formatter',
+)
+
+# a cc conversion imports the command line and one formatter besides the
+# parsers, which must not take more than this times as long as the parsers
+IMPORT_TIME_RATIO = 2.5
+
+
+def imported_modules(code):
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                            check=True)
+    return set(result.stdout.split())
+
+
+def import_time(code):
+    """Returns the sum of cumulative import times in seconds of top-level imports."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, stdin=subprocess.DEVNULL,
+                            capture_output=True, text=True, check=True)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or line.endswith('| imported package'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # nested imports are indented by two more spaces per level
+        if not name.startswith('  '):
+            total += int(cumulative) / 1e6
+    return total
+
+
+class ImportTimeTest(unittest.TestCase):
+    def test_cc_imports_only_needed_modules(self):
+        modules = imported_modules(CC_RUN)
+        self.assertIn('clang_tidy_converter.formatter.code_climate_formatter', modules)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_package_imports_only_needed_modules(self):
+        modules = imported_modules(PACKAGE_IMPORT)
+        self.assertIn('clang_tidy_converter.parser.clang_tidy_parser', modules)
+        for module in HEAVY_MODULES + COMMAND_LINE_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_cc_import_time(self):
+        # relative to the parsers, so that it does not depend on the machine; the best of several runs, so that a busy
+        # machine does not fail the test
+        cc_time = min(import_time(CC_RUN) for _ in range(3))
+        parser_time = min(import_time(PARSER_IMPORT) for _ in range(3))
+        self.assertGreater(parser_time, 0)
+        self.assertLess(cc_time, parser_time * IMPORT_TIME_RATIO)
+
+
+if __name__ == '__main__':
+    unittest.main()
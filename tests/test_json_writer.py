@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import io
+import json
+import unittest
+
+from clang_tidy_converter.formatter.json_writer import ITEMS, JsonDocumentWriter, dumps, write_json_array, write_json_document
+
+class JsonWriterTest(unittest.TestCase):
+    ITEMS_LIST = [{'a': 1, 'b': ['x\ny', {'c': None}]}, 'text', 3, []]
+
+    def test_write_json_array(self):
+        self.assertEqual(json.dumps(self.ITEMS_LIST, indent=2), self._write_array(self.ITEMS_LIST))
+
+    def test_write_empty_json_array(self):
+        self.assertEqual(json.dumps([], indent=2), self._write_array([]))
+
+    def test_write_json_document(self):
+        document = {'version': '2.1.0', 'runs': [{'tool': {'name': 'x'}, 'results': ITEMS, 'after': 1}]}
+        expected = json.dumps({'version': '2.1.0', 'runs': [{'tool': {'name': 'x'}, 'results': self.ITEMS_LIST, 'after': 1}]}, indent=2)
+        stream = io.StringIO()
+        write_json_document(stream, document, iter(self.ITEMS_LIST))
+        self.assertEqual(expected, stream.getvalue())
+
+    def test_write_json_document_without_items(self):
+        stream = io.StringIO()
+        write_json_document(stream, {'issues': ITEMS}, iter([]))
+        self.assertEqual(json.dumps({'issues': []}, indent=2), stream.getvalue())
+
+    def test_write_json_document_with_values(self):
+        document = {'runs': [{'results': ITEMS, 'tool': {'rules': '\0rules\0'}, 'artifacts': '\0artifacts\0'}]}
+        values = {'\0rules\0': [{'id': 'a'}, {'id': 'b\n'}], '\0artifacts\0': []}
+        for indent in (2, None):
+            with self.subTest(indent=indent):
+                stream = io.StringIO()
+                writer = JsonDocumentWriter(stream, document, indent)
+                for item in self.ITEMS_LIST:
+                    writer.write(item)
+                writer.close(values)
+                expected = {'runs': [{'results': self.ITEMS_LIST, 'tool': {'rules': values['\0rules\0']}, 'artifacts': []}]}
+                self.assertEqual(dumps(expected, indent), stream.getvalue())
+
+    def test_write_compact_json_array(self):
+        self.assertEqual(json.dumps(self.ITEMS_LIST, separators=(',', ':')), self._write_array(self.ITEMS_LIST, None))
+        self.assertEqual('[]', self._write_array([], None))
+
+    def test_write_compact_json_document(self):
+        stream = io.StringIO()
+        write_json_document(stream, {'issues': ITEMS, 'after': 1}, iter(self.ITEMS_LIST), None)
+        self.assertEqual(json.dumps({'issues': self.ITEMS_LIST, 'after': 1}, separators=(',', ':')), stream.getvalue())
+
+    def _write_array(self, items, indent=2):
+        stream = io.StringIO()
+        write_json_array(stream, iter(items), indent)
+        return stream.getvalue()
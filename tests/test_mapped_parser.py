@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+import io
+import pickle
+import unittest
+
+from clang_tidy_converter import ClangTidyParser, MappedClangTidyParser
+from clang_tidy_converter.parser.mapped_parser import MappedLines
+from helpers import to_tuple
+
+LOG = (b'preamble\n'
+       b'error: -mapcs-frame not supported\n'
+       b'/usr/lib/include/some_include.h:1039:3: warning: Potential memory leak [clang-analyzer-cplusplus.NewDeleteLeaks]\r\n'
+       b'  return new SomeFunction(\r\n'
+       b'  ^\r\n'
+       b'/home/user/some_source.cpp:267:15: note: Calling \'OtherFunction\'\n'
+       b'    auto sf = OtherFunction( \xc3\xa4, b, c );\n'
+       b'              ^\n'
+       b'/home/user/some_source.cpp:268:1: smth: Unknown level\n'
+       b'/home/user/some_source.cpp:300:1: error: Unknown type name [clang-diagnostic-error]\n'
+       b'foo x;')
+
+
+class MappedClangTidyParserTest(unittest.TestCase):
+    def test_same_result_as_text_parser(self):
+        expected = ClangTidyParser().parse(io.TextIOWrapper(io.BytesIO(LOG), encoding='utf-8', newline='\n'))
+        messages = MappedClangTidyParser().parse(LOG)
+        self.assertEqual([to_tuple(m) for m in expected], [to_tuple(m) for m in messages])
+
+    def test_details_lines_are_lazy(self):
+        msg = MappedClangTidyParser().parse(LOG)[0]
+        self.assertIsInstance(msg.details_lines, MappedLines)
+        self.assertEqual(['  return new SomeFunction(\r\n', '  ^\r\n'], msg.details_lines)
+        self.assertEqual('  ^\r\n', msg.details_lines[-1])
+        self.assertEqual([], msg.children[0].details_lines[5:])
+
+    def test_parse_range(self):
+        begin = LOG.index(b'/home/user/some_source.cpp:300:1')
+        messages = MappedClangTidyParser().parse(LOG, begin, len(LOG) - 1)
+        self.assertEqual(1, len(messages))
+        self.assertEqual(['foo x'], messages[0].details_lines)
+
+    def test_details_lines_are_pickled_as_list(self):
+        msg = MappedClangTidyParser().parse(LOG)[0]
+        self.assertEqual(['  return new SomeFunction(\r\n', '  ^\r\n'], pickle.loads(pickle.dumps(msg)).details_lines)
+        self.assertIsInstance(pickle.loads(pickle.dumps(msg.details_lines)), list)
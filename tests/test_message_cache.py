@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import os
+import pickle
+import tempfile
+import unittest
+
+from clang_tidy_converter import ClangTidyParser
+from clang_tidy_converter.__main__ import create_argparser, main
+from clang_tidy_converter.cache import MessageCache
+from helpers import to_tuple
+
+FIRST_LOG = """/src/a.cpp:1:3: warning: Warning A [bugprone-a]
+  foo();
+  ^
+/src/a.h:2:1: note: Note A
+"""
+
+SECOND_LOG = """/src/b.cpp:5:7: error: Error B [clang-diagnostic-error]
+"""
+
+
+class MessageCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+        self.parsed = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_log(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', newline='\n') as f:
+            f.write(content)
+        return path
+
+    def _parse(self, path):
+        self.parsed.append(os.path.basename(path))
+        with open(path, newline='\n') as f:
+            return ClangTidyParser().parse(f)
+
+    def _update(self, logs):
+        cache = MessageCache(self.cache_dir)
+        cache.update(logs, self._parse)
+        return list(cache.iter_messages())
+
+    def test_merges_cached_logs(self):
+        first = self._write_log('a.log', FIRST_LOG)
+        second = self._write_log('b.log', SECOND_LOG)
+        self._update({'/src/a.cpp': first, '/src/b.cpp': second})
+        self.parsed.clear()
+        messages = self._update({})
+        self.assertEqual([], self.parsed)
+        self.assertEqual([to_tuple(m) for m in ClangTidyParser().parse((FIRST_LOG + SECOND_LOG).splitlines(True))],
+                         [to_tuple(m) for m in messages])
+
+    def test_parses_only_changed_logs(self):
+        first = self._write_log('a.log', FIRST_LOG)
+        second = self._write_log('b.log', SECOND_LOG)
+        self._update({'/src/a.cpp': first, '/src/b.cpp': second})
+        self.parsed.clear()
+        self._write_log('b.log', SECOND_LOG.replace('5:7', '6:7'))
+        messages = self._update({'/src/a.cpp': first, '/src/b.cpp': second})
+        self.assertEqual(['b.log'], self.parsed)
+        self.assertEqual(6, messages[-1].line)
+
+    def test_keeps_entries_of_units_not_analyzed_again(self):
+        first = self._write_log('a.log', FIRST_LOG)
+        second = self._write_log('b.log', SECOND_LOG)
+        self._update({'/src/a.cpp': first, '/src/b.cpp': second})
+        os.remove(first)
+        # a new run over the changed translation unit only, with its log at another path
+        changed = self._write_log('changed.log', SECOND_LOG.replace('5:7', '6:7'))
+        messages = self._update({'/src/b.cpp': changed})
+        self.assertEqual([('/src/a.cpp', 1), ('/src/b.cpp', 6)], [(message.filepath, message.line) for message in messages])
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+
+    def test_evict_and_prune(self):
+        logs = {f'/src/{name}.cpp': self._write_log(f'{name}.log', FIRST_LOG.replace('a.cpp', f'{name}.cpp')) for name in 'abc'}
+        self._update(logs)
+        cache = MessageCache(self.cache_dir)
+        cache.evict(['/src/a.cpp', '/src/missing.cpp'])
+        self.assertEqual(['/src/b.cpp', '/src/c.cpp'], [message.filepath for message in cache.iter_messages()])
+        cache.prune(['/src/c.cpp'])
+        self.assertEqual(['/src/c.cpp'], [message.filepath for message in cache.iter_messages()])
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+    def test_ignores_invalid_entries(self):
+        first = self._write_log('a.log', FIRST_LOG)
+        self._update({'/src/a.cpp': first})
+        [name] = os.listdir(self.cache_dir)
+        with open(os.path.join(self.cache_dir, name), 'wb') as entry:
+            entry.write(pickle.dumps(('/src/a.cpp', None)))
+        self.assertEqual([], list(MessageCache(self.cache_dir).iter_messages()))
+        self.parsed.clear()
+        self.assertEqual(['/src/a.cpp', '/src/a.h'], [message.filepath for message in self._update({'/src/a.cpp': first})
+                                                      for message in (message, *message.children)])
+        self.assertEqual(['a.log'], self.parsed)
+
+    def test_source_inputs(self):
+        first = self._write_log('a.log', FIRST_LOG)
+        second = self._write_log('b.log', SECOND_LOG)
+        output = os.path.join(self.tmp.name, 'report.json')
+        def convert(*args):
+            main(create_argparser().parse_args(['--cache_dir', self.cache_dir, *args, '-o', output, 'sq']))
+            with open(output) as f:
+                return f.read()
+        report = convert('-i', f'/src/a.cpp={first}', '-i', f'/src/b.cpp={second}')
+        self.assertEqual(report, convert('-i', f'/src/../src/b.cpp={second}'))
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+        self.assertNotIn('/src/a.cpp', convert('-i', f'/src/b.cpp={second}', '--cache_prune'))
+        convert('-i', f'/src/a.cpp={first}')
+        self.assertNotIn('/src/a.cpp', convert('-i', second, '--cache_evict', '/src/a.cpp'))
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+
+    def test_rejects_stdin(self):
+        with self.assertRaisesRegex(SystemExit, '--cache_dir needs --input'):
+            main(create_argparser().parse_args(['--cache_dir', self.cache_dir, 'sq']))
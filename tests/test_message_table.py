@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import tracemalloc
+import unittest
+
+from clang_tidy_converter import ClangMessage, MessageTable
+
+
+class DictClangMessage:
+    """Former ClangMessage representation with per-instance __dict__ and eagerly allocated lists."""
+    def __init__(self, filepath, line, column, level, message, diagnostic_name, details_lines=None, children=None):
+        self.filepath = filepath
+        self.line = line
+        self.column = column
+        self.level = level
+        self.message = message
+        self.diagnostic_name = diagnostic_name
+        self.details_lines = details_lines if details_lines is not None else []
+        self.children = children if children is not None else []
+
+
+def make_messages(message_class, count):
+    # header warnings repeated across translation units, parsed as fresh strings each time
+    return [message_class(''.join(['/usr/include/header', str(i % 10), '.h']), i, 3, ClangMessage.Level.WARNING,
+                          'Potential memory leak', ''.join(['clang-analyzer-', 'cplusplus.NewDeleteLeaks']))
+            for i in range(count)]
+
+
+def allocated_size(factory):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = factory()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+
+class MessageTableTest(unittest.TestCase):
+    def setUp(self):
+        child = ClangMessage('/some/file/path1.cpp', 8, 10, ClangMessage.Level.NOTE, 'Allocated here', '', ['return new A;', '       ^'])
+        self.messages = [
+            ClangMessage('/some/file/path.cpp', 100, 2, ClangMessage.Level.WARNING, 'Memory leak', 'bugprone-a', ['void a(int)'], [child]),
+            ClangMessage('/some/file/path.cpp', 200, 1, ClangMessage.Level.ERROR, 'Unknown type', 'clang-diagnostic-error'),
+        ]
+
+    def test_rows_have_message_attributes(self):
+        rows = list(MessageTable.from_messages(self.messages))
+        self.assertEqual(2, len(rows))
+        self.assertEqual(('/some/file/path.cpp', 100, 2, ClangMessage.Level.WARNING, 'Memory leak', 'bugprone-a', ['void a(int)']),
+                         (rows[0].filepath, rows[0].line, rows[0].column, rows[0].level, rows[0].message, rows[0].diagnostic_name, rows[0].details_lines))
+        child = rows[0].children[0]
+        self.assertEqual(('/some/file/path1.cpp', 8, ClangMessage.Level.NOTE, ['return new A;', '       ^'], []),
+                         (child.filepath, child.line, child.level, child.details_lines, child.children))
+        self.assertEqual((200, ClangMessage.Level.ERROR, [], []), (rows[1].line, rows[1].level, rows[1].details_lines, rows[1].children))
+
+    def test_strings_are_shared(self):
+        table = MessageTable.from_messages(self.messages)
+        self.assertEqual(2, len(table))
+        self.assertEqual(1, table._strings.count('/some/file/path.cpp'))
+
+    def test_message_is_slotted(self):
+        msg = ClangMessage()
+        self.assertFalse(hasattr(msg, '__dict__'))
+        self.assertIsNone(msg._children)
+        self.assertEqual([], msg.children)
+
+    def test_memory_benchmark(self):
+        count = 20000
+        dict_size, _ = allocated_size(lambda: make_messages(DictClangMessage, count))
+        slotted_size, messages = allocated_size(lambda: make_messages(ClangMessage, count))
+        table_size, _ = allocated_size(lambda: MessageTable.from_messages(messages))
+        self.assertLess(slotted_size, dict_size / 2, f'slotted: {slotted_size} B, dict-based: {dict_size} B')
+        self.assertLess(table_size, slotted_size / 2, f'table: {table_size} B, slotted: {slotted_size} B')
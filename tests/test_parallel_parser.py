@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from clang_tidy_converter import ClangTidyParser, ParallelClangTidyParser
+from helpers import to_tuple
+
+LOG = '''preamble
+error: -mapcs-frame not supported
+/usr/lib/include/some_include.h:1039:3: warning: Potential memory leak [clang-analyzer-cplusplus.NewDeleteLeaks]
+  return new SomeFunction(
+  ^
+/home/user/some_source.cpp:267:15: note: Calling 'OtherFunction'
+    auto sf = OtherFunction( a, b, c );
+              ^
+/home/user/some_source.cpp:12:1: note: Returning
+/home/user/some_source.cpp:300:1: error: Unknown type name 'foo' [clang-diagnostic-error]\r
+foo x;\r
+^\r
+/home/user/some_source.cpp:301:1: smth: Unknown level
+/home/user/some_source.cpp:302:1: remark: Some remark [readability-identifier-naming]
+'''
+
+
+class ParallelClangTidyParserTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w', newline='') as f:
+            f.write(LOG * 5)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_same_result_as_serial_parser(self):
+        with open(self.path, newline='\n') as f:
+            expected = [to_tuple(m) for m in ClangTidyParser().parse(f)]
+        for chunk_size in (1, 7, 64, 300, 1 << 20):
+            with self.subTest(chunk_size=chunk_size):
+                parser = ParallelClangTidyParser(2, chunk_size=chunk_size)
+                self.assertEqual(expected, [to_tuple(m) for m in parser.parse(self.path)])
+
+    def test_chunks_start_at_top_level_messages(self):
+        parser = ParallelClangTidyParser(2, chunk_size=1)
+        chunks = parser._split(self.path)
+        self.assertEqual(16, len(chunks))
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for begin, end in chunks[1:]:
+            self.assertRegex(data[begin:end].decode(), r'^/\S+:\d+:\d+: (warning|error|remark): ')
+
+    def test_bounded_pending_chunks(self):
+        with open(self.path, newline='\n') as f:
+            expected = [to_tuple(m) for m in ClangTidyParser().parse(f)]
+        submitted = []
+        class Executor(ThreadPoolExecutor):
+            def submit(self, *args):
+                submitted.append(args)
+                return super().submit(*args)
+        with unittest.mock.patch('concurrent.futures.ProcessPoolExecutor', Executor):
+            messages = ParallelClangTidyParser(2, chunk_size=1).iter_messages(self.path)
+            first = next(messages)
+            # 2 * jobs chunks, and one more if the first has no top-level message
+            self.assertLessEqual(len(submitted), 5)
+            self.assertEqual(expected, [to_tuple(m) for m in [first, *messages]])
+        self.assertEqual(16, len(submitted))
+
+    def test_several_files(self):
+        with open(self.path, newline='\n') as f:
+            expected = [to_tuple(m) for m in ClangTidyParser().parse(f)]
+        messages = ParallelClangTidyParser(2, chunk_size=100).iter_files_messages([self.path, self.path])
+        self.assertEqual(expected * 2, [to_tuple(m) for m in messages])
+
+    def test_empty_file(self):
+        with open(self.path, 'w'):
+            pass
+        self.assertEqual([], ParallelClangTidyParser(2).parse(self.path))
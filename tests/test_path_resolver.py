@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+import io
+import os
+import pickle
+import tempfile
+import unittest
+
+from clang_tidy_converter import BinaryDumpParser, BinaryFormatter, ClangTidyParser, MappedClangTidyParser, \
+    ParallelClangTidyParser, PathResolver
+
+LOG = '''/build/src/main.cpp:10:3: warning: Potential memory leak [clang-analyzer-cplusplus.NewDeleteLeaks]
+  return new SomeFunction(
+  ^
+/build/include/lib.h:267:15: note: Calling 'OtherFunction'
+    auto sf = OtherFunction( a, b, c );
+              ^
+/usr/include/stdio.h:1:1: error: Unknown type name 'foo' [clang-diagnostic-error]
+'''
+
+
+def paths(messages):
+    return [[message.filepath] + [child.filepath for child in message.children] for message in messages]
+
+
+class PathResolverTest(unittest.TestCase):
+    def test_same_as_relpath(self):
+        resolver = PathResolver(['/home/user/project'])
+        for path in ['/home/user/project/src/a.cpp', '/home/user/other/b.h', '/usr/include/stdio.h', 'relative/c.cpp']:
+            self.assertEqual(os.path.relpath(path, '/home/user/project'), resolver.resolve(path))
+
+    def test_longest_containing_root(self):
+        resolver = PathResolver(['/repo', '/repo/third_party/lib', '/repo/tools'])
+        self.assertEqual('src/a.cpp', resolver.resolve('/repo/src/a.cpp'))
+        self.assertEqual('b.h', resolver.resolve('/repo/third_party/lib/b.h'))
+        self.assertEqual('c.py', resolver.resolve('/repo/tools/c.py'))
+        self.assertEqual('../usr/include/d.h', resolver.resolve('/usr/include/d.h'))
+        self.assertEqual('tools_extra/e.h', resolver.resolve('/repo/tools_extra/e.h'))
+
+    def test_path_map(self):
+        resolver = PathResolver(path_map=[('/build', '/home/user/project'), ('/build/include/', '/opt/include'),
+                                          ('/tmp/', '')])
+        self.assertEqual('/home/user/project/src/a.cpp', resolver.resolve('/build/src/a.cpp'))
+        self.assertEqual('/opt/include/b.h', resolver.resolve('/build/include/b.h'))
+        self.assertEqual('/home/user/project', resolver.resolve('/build'))
+        self.assertEqual('/buildx/c.cpp', resolver.resolve('/buildx/c.cpp'))
+        self.assertEqual('d.cpp', resolver.resolve('/tmp/d.cpp'))
+
+    def test_path_map_before_project_root(self):
+        resolver = PathResolver(['/home/user/project'], [('/build', '/home/user/project')])
+        self.assertEqual('src/a.cpp', resolver.resolve('/build/src/a.cpp'))
+
+    def test_results_are_memoized_and_bounded(self):
+        resolver = PathResolver(['/repo'], cache_size=2)
+        first = resolver.resolve('/repo/' + 'a.cpp')
+        self.assertIs(first, resolver.resolve('/repo/' + 'a.cpp'))
+        for name in ['b.cpp', 'c.cpp', 'd.cpp']:
+            resolver.resolve('/repo/' + name)
+        info = resolver.resolve.cache_info()
+        self.assertEqual(1, info.hits)
+        self.assertEqual(2, info.currsize)
+
+    def test_pickle(self):
+        resolver = pickle.loads(pickle.dumps(PathResolver(['/repo'], [('/build', '/repo')], 16)))
+        self.assertEqual('a.cpp', resolver.resolve('/build/a.cpp'))
+        self.assertEqual(16, resolver.resolve.cache_info().maxsize)
+
+
+class ParserPathResolverTest(unittest.TestCase):
+    EXPECTED = [['src/main.cpp', 'include/lib.h'], ['../../../usr/include/stdio.h']]
+
+    def setUp(self):
+        self.resolver = PathResolver(['/home/user/project'], [('/build', '/home/user/project')])
+
+    def test_clang_tidy_parser(self):
+        self.assertEqual(self.EXPECTED, paths(ClangTidyParser(self.resolver).parse(io.StringIO(LOG))))
+
+    def test_mapped_parser(self):
+        self.assertEqual(self.EXPECTED, paths(MappedClangTidyParser(self.resolver).parse(LOG.encode())))
+
+    def test_parallel_parser(self):
+        fd, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(LOG * 3)
+            messages = ParallelClangTidyParser(2, chunk_size=64, path_resolver=self.resolver).parse(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(self.EXPECTED * 3, paths(messages))
+
+    def test_binary_dump_parser(self):
+        dump = BinaryFormatter().format(MappedClangTidyParser().parse(LOG.encode()), None)
+        self.assertEqual(self.EXPECTED, paths(BinaryDumpParser(self.resolver).parse(dump)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import io
+import random
+import unittest
+
+from clang_tidy_converter import ClangTidyParser, MappedClangTidyParser, PushClangTidyParser
+from helpers import to_tuple
+
+LOG = ('preamble\n'
+       'error: -mapcs-frame not supported\n'
+       '/usr/lib/include/some_include.h:1039:3: warning: Potential memory leak [clang-analyzer-cplusplus.NewDeleteLeaks]\r\n'
+       '  return new SomeFunction(\r\n'
+       '  ^\r\n'
+       '/home/user/some_source.cpp:267:15: note: Calling \'OtherFunction\'\n'
+       '    auto sf = OtherFunction( ä, b, c );\n'
+       '              ^\n'
+       '/home/user/some_source.cpp:268:1: smth: Unknown level\r'
+       '/home/user/some_source.cpp:300:1: error: Unknown type name [clang-diagnostic-error]\n'
+       'foo x;').encode('utf-8')
+
+
+class PushClangTidyParserTest(unittest.TestCase):
+    def setUp(self):
+        expected = ClangTidyParser().parse(io.TextIOWrapper(io.BytesIO(LOG * 3), encoding='utf-8', newline='\n'))
+        self.expected = [to_tuple(message) for message in expected]
+
+    def test_same_result_as_text_parser(self):
+        parser = PushClangTidyParser()
+        messages = parser.feed(LOG * 3) + parser.close()
+        self.assertEqual(self.expected, [to_tuple(message) for message in messages])
+
+    def test_chunks_split_anywhere(self):
+        data = LOG * 3
+        rnd = random.Random(0)
+        for _ in range(20):
+            parser = PushClangTidyParser()
+            messages = []
+            pos = 0
+            while pos < len(data):
+                size = rnd.randint(1, 40)
+                messages += parser.feed(data[pos:pos + size])
+                pos += size
+            messages += parser.close()
+            self.assertEqual(self.expected, [to_tuple(message) for message in messages])
+
+    def test_line_endings_are_kept(self):
+        parser = PushClangTidyParser()
+        messages = parser.feed(LOG) + parser.close()
+        self.assertEqual(['  return new SomeFunction(\r\n', '  ^\r\n'], messages[0].details_lines)
+        self.assertEqual([to_tuple(message) for message in MappedClangTidyParser().parse(LOG)],
+                         [to_tuple(message) for message in messages])
+
+    def test_messages_are_returned_when_complete(self):
+        parser = PushClangTidyParser()
+        self.assertEqual([], parser.feed(b'/src/a.cpp:1:1: warning: First [a]\n  ^\n/src/a.cpp:2:1: note: Note\n'))
+        messages = parser.feed(b'/src/a.cpp:3:1: warning: Second [b]\n')
+        self.assertEqual(['First'], [message.message for message in messages])
+        self.assertEqual(['Note'], [child.message for child in messages[0].children])
+        self.assertEqual(['Second'], [message.message for message in parser.close()])
+        self.assertEqual([], parser.close())
+
+
+if __name__ == '__main__':
+    unittest.main()
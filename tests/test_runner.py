@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+import contextlib
+import io
+import json
+import os
+import signal
+import stat
+import sys
+import tempfile
+import time
+import unittest
+
+from clang_tidy_converter.__main__ import create_argparser, main
+from clang_tidy_converter.runner import ClangTidyRunner, load_compile_commands
+
+# prints a warning with a note for the translation unit given as the last
+# argument, records how many stubs run at the same time and keeps running
+# after its output for translation units named slow*, exits with code 3 for
+# fail* and is killed for crash*
+STUB = '''#!{python}
+import os, signal, sys, time
+path = sys.argv[-1]
+running = os.path.join({tmp!r}, 'running')
+marker = os.path.join(running, str(os.getpid()))
+open(marker, 'w').close()
+with open(os.path.join({tmp!r}, 'concurrency.log'), 'a') as log:
+    log.write(str(len(os.listdir(running))) + '\\n')
+sys.stdout.write(path + ':1:3: warning: Warning in ' + os.path.basename(path) + ' [bugprone-a]\\n  int x;\\n  ^\\n')
+sys.stdout.flush()
+time.sleep(0.05)
+sys.stdout.write(path + ':2:1: note: Args ' + ' '.join(sys.argv[1:-1]) + '\\n')
+sys.stdout.flush()
+sys.stderr.write('1 warning generated.\\n')
+if os.path.basename(path).startswith('slow'):
+    os.close(1)
+    time.sleep(30)
+os.remove(marker)
+if os.path.basename(path).startswith('crash'):
+    os.kill(os.getpid(), signal.SIGKILL)
+sys.exit(3 if os.path.basename(path).startswith('fail') else 0)
+'''
+
+
+class ClangTidyRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        os.mkdir(os.path.join(self.dir, 'running'))
+        self.stub = os.path.join(self.dir, 'clang-tidy')
+        with open(self.stub, 'w') as f:
+            f.write(STUB.format(python=sys.executable, tmp=self.dir))
+        os.chmod(self.stub, os.stat(self.stub).st_mode | stat.S_IEXEC)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_database(self, files):
+        with open(os.path.join(self.dir, 'compile_commands.json'), 'w') as f:
+            json.dump([{'directory': '/src', 'file': name, 'command': f'c++ -c {name}'} for name in files], f)
+
+    def test_load_compile_commands(self):
+        self.write_database(['a.cpp', '/src/b.cpp', 'lib/c.cpp', 'a.cpp', '../other/d.cpp'])
+        self.assertEqual(['/src/a.cpp', '/src/b.cpp', '/src/lib/c.cpp', '/other/d.cpp'], load_compile_commands(self.dir))
+        self.assertEqual(['/src/lib/c.cpp'], load_compile_commands(self.dir, r'/lib/'))
+
+    def test_messages_of_all_translation_units(self):
+        files = [f'file{i}.cpp' for i in range(8)]
+        self.write_database(files)
+        runner = ClangTidyRunner(self.dir, self.stub, ['--quiet'], processes=3)
+        messages = sorted(runner.iter_messages(), key=lambda message: message.filepath)
+        self.assertEqual([f'/src/{name}' for name in files], [message.filepath for message in messages])
+        self.assertEqual([f'Warning in {name}' for name in files], [message.message for message in messages])
+        self.assertEqual(['  int x;\n', '  ^\n'], messages[0].details_lines)
+        self.assertEqual([f'Args -p {self.dir} --quiet'], [child.message for child in messages[0].children])
+        self.assertEqual({f'/src/{name}': 0 for name in files}, runner.returncodes)
+        with open(os.path.join(self.dir, 'concurrency.log')) as log:
+            self.assertLessEqual(max(int(line) for line in log), 3)
+
+    def test_stop_early(self):
+        self.write_database(['slow1.cpp', 'slow2.cpp', 'slow3.cpp'])
+        start = time.perf_counter()
+        messages = ClangTidyRunner(self.dir, self.stub, processes=2).iter_messages()
+        self.assertEqual('/src', os.path.dirname(next(messages).filepath))
+        messages.close()
+        self.assertLess(time.perf_counter() - start, 10)
+
+    def test_unexpected_returncodes(self):
+        self.write_database(['a.cpp', 'fail.cpp', 'crash.cpp'])
+        runner = ClangTidyRunner(self.dir, self.stub)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(3, len(list(runner.iter_messages())))
+        self.assertEqual({'/src/a.cpp': 0, '/src/fail.cpp': 3, '/src/crash.cpp': -signal.SIGKILL}, runner.returncodes)
+        self.assertEqual(['warning: clang-tidy exited with code 3 on /src/fail.cpp, its issues may be incomplete',
+                          'warning: clang-tidy was killed by SIGKILL on /src/crash.cpp, its issues may be incomplete'],
+                         sorted(stderr.getvalue().splitlines()))
+
+    def test_missing_binary(self):
+        self.write_database(['a.cpp'])
+        with self.assertRaises(FileNotFoundError):
+            list(ClangTidyRunner(self.dir, os.path.join(self.dir, 'missing')).iter_messages())
+
+    def test_run_command(self):
+        self.write_database(['a.cpp', 'b.cpp', 'c.cpp'])
+        output = os.path.join(self.dir, 'report.json')
+        main(create_argparser().parse_args(['--project_root', '/src', '--output', output,
+                                            'run', '-p', self.dir, '--clang_tidy_binary', self.stub, '--file_filter', '[ab]\\.cpp',
+                                            'sq']))
+        with open(output) as f:
+            issues = json.load(f)['issues']
+        self.assertEqual(['a.cpp', 'b.cpp'], sorted(issue['primaryLocation']['filePath'] for issue in issues))
+
+
+if __name__ == '__main__':
+    unittest.main()
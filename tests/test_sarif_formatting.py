@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import unittest
+import unittest.mock
+
+from clang_tidy_converter import ClangMessage, SarifFormatter
+
+
+class SarifFormatterTest(unittest.TestCase):
+    def setUp(self):
+        note = ClangMessage('/src/a.h', 7, 1, ClangMessage.Level.NOTE, 'Allocated here')
+        self.messages = [
+            ClangMessage('/src/a.cpp', 1, 2, ClangMessage.Level.WARNING, 'Memory leak', 'clang-analyzer-unix.Malloc', children=[note]),
+            ClangMessage('/src/b.cpp', 3, 4, ClangMessage.Level.ERROR, 'Unknown type', 'clang-diagnostic-error'),
+            ClangMessage('/src/a.h', 5, 6, ClangMessage.Level.WARNING, 'Use auto', 'modernize-use-auto'),
+            ClangMessage('/src/a.cpp', 8, 9, ClangMessage.Level.WARNING, 'Memory leak', 'clang-analyzer-unix.Malloc'),
+        ]
+
+    def _format(self, indexed, compact=False):
+        args = unittest.mock.Mock(compact=compact, indexed=indexed, baseline_index=None)
+        return SarifFormatter().format(self.messages, args)
+
+    def test_format(self):
+        run = json.loads(self._format(False))['runs'][0]
+        self.assertEqual({'name': 'clang-tidy'}, run['tool']['driver'])
+        self.assertEqual(['file:///src/a.cpp', 'file:///src/a.h', 'file:///src/b.cpp', 'file:///src/a.h', 'file:///src/a.cpp'],
+                         [location['artifactLocation']['uri'] for result in run['results'] for location in result['locations']])
+
+    def test_format_indexed(self):
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                run = json.loads(self._format(True, compact))['runs'][0]
+                rules = run['tool']['driver']['rules']
+                self.assertEqual([
+                    {'id': 'clang-analyzer-unix.Malloc', 'helpUri': 'https://clang.llvm.org/extra/clang-tidy/checks/clang-analyzer/unix.Malloc.html'},
+                    {'id': 'clang-diagnostic-error'},
+                    {'id': 'modernize-use-auto', 'helpUri': 'https://clang.llvm.org/extra/clang-tidy/checks/modernize/use-auto.html'},
+                ], rules)
+                self.assertEqual(['file:///src/a.cpp', 'file:///src/a.h', 'file:///src/b.cpp'],
+                                 [artifact['location']['uri'] for artifact in run['artifacts']])
+                results = run['results']
+                self.assertEqual([0, 1, 2, 0], [result['ruleIndex'] for result in results])
+                self.assertEqual([result['ruleId'] for result in results], [rules[result['ruleIndex']]['id'] for result in results])
+                self.assertEqual([[0, 1], [2], [1], [0]],
+                                 [[location['artifactLocation']['index'] for location in result['locations']] for result in results])
+                self.assertNotIn('message', results[0]['locations'][0])
+                self.assertEqual({'text': 'Allocated here'}, results[0]['locations'][1]['message'])
+
+    def test_format_without_options(self):
+        run = json.loads(SarifFormatter().format(self.messages, argparse.Namespace(compact=False)))['runs'][0]
+        self.assertEqual(json.loads(self._format(False))['runs'][0], run)
+
+    def test_indexed_is_smaller(self):
+        self.messages *= 100
+        self.assertLess(len(self._format(True, compact=True)), len(self._format(False, compact=True)))
+
+
+if __name__ == '__main__':
+    unittest.main()
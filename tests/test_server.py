@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import io
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from clang_tidy_converter.__main__ import create_argparser, main, parse_server_options
+from clang_tidy_converter.client import ConversionError, convert_remotely
+from clang_tidy_converter.server import ConversionServer
+
+LOG = ''.join(f'/src/file{i % 7}.cpp:{i}:3: warning: Warning {i} [bugprone-check-{i % 3}]\n'
+              f'    int x{i};\n'
+              f'        ^\n' for i in range(200))
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ConversionServerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, 'clang-tidy.log')
+        with open(self.log, 'w') as f:
+            f.write(LOG)
+        self.stats = io.StringIO()
+        self.address = os.path.join(self.tmp.name, 'converter.sock')
+        self.server = self.start_server(self.address)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def start_server(self, address, **kwargs):
+        server = ConversionServer(address, parse_server_options, log=self.stats, **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        def stop():
+            server.shutdown()
+            thread.join()
+            server.close()
+        self.addCleanup(stop)
+        return server
+
+    def convert(self, *args):
+        output = os.path.join(self.tmp.name, f'out-{threading.get_ident()}')
+        main(create_argparser().parse_args(['-i', self.log, '-o', output, *args]))
+        with open(output, 'rb') as f:
+            return f.read()
+
+    def test_same_output_as_local_conversion(self):
+        for args in (['cc'], ['sq'], ['sarif', '-c'], ['dump'], ['--deduplicate', '-r', '/src', 'cc', '--fingerprint_algorithm', 'blake2b']):
+            with self.subTest(args=args):
+                self.assertEqual(self.convert(*args), self.convert('--server', self.address, *args))
+
+    def test_crlf_input(self):
+        # line endings are kept as in a local conversion of the file
+        with open(self.log, 'w', newline='\r\n') as f:
+            f.write(LOG)
+        for args in (['cc'], ['sarif'], ['dump']):
+            with self.subTest(args=args):
+                self.assertEqual(self.convert(*args), self.convert('--server', self.address, *args))
+
+    def test_compressed_input_and_output(self):
+        gz_log = os.path.join(self.tmp.name, 'clang-tidy.log.gz')
+        with gzip.open(gz_log, 'wb') as f:
+            f.write(LOG.encode())
+        output = os.path.join(self.tmp.name, 'report.json.gz')
+        main(create_argparser().parse_args(['--server', self.address, '-i', gz_log, '-o', output, 'cc']))
+        with gzip.open(output, 'rb') as f:
+            self.assertEqual(self.convert('cc'), f.read())
+
+    def test_large_input(self):
+        # output is written while the input is still read, so neither may wait for the other to finish
+        with open(self.log, 'w') as f:
+            f.write(LOG * 50)
+        self.assertGreater(os.path.getsize(self.log), 500000)
+        address = os.path.join(self.tmp.name, 'short-timeout.sock')
+        self.start_server(address, timeout=5)
+        for args in (['cc'], ['sq', '-c']):
+            with self.subTest(args=args):
+                self.assertEqual(self.convert(*args), self.convert('--server', address, *args))
+
+    def test_input_error(self):
+        dump = os.path.join(self.tmp.name, 'issues.dump')
+        main(create_argparser().parse_args(['-i', self.log, '-o', dump, 'dump']))
+        with self.assertRaisesRegex(SystemExit, 'binary dumps cannot be converted by a server'):
+            main(create_argparser().parse_args(['--server', self.address, '-i', self.log, '-i', dump, 'cc']))
+
+    def test_tcp(self):
+        host, port = self.start_server('http://127.0.0.1:0').server_address
+        self.assertEqual(self.convert('sq'), self.convert('--server', f'http://{host}:{port}', 'sq'))
+
+    def test_concurrent_requests(self):
+        expected = self.convert('cc')
+        with ThreadPoolExecutor(8) as executor:
+            outputs = list(executor.map(lambda _: self.convert('--server', self.address, 'cc'), range(16)))
+        self.assertEqual([expected] * 16, outputs)
+
+    def test_stats(self):
+        self.convert('--server', self.address, 'cc')
+        stats = self.stats.getvalue()
+        self.assertIn('"format": "cc", "status": 200, "messages": 200', stats)
+        self.assertIn('"wall_seconds": ', stats)
+
+    def test_request_too_large(self):
+        address = os.path.join(self.tmp.name, 'limited.sock')
+        self.start_server(address, max_request_size=1000)
+        with self.assertRaisesRegex(ConversionError, '413'):
+            convert_remotely(address, {'output_format': 'cc'}, [LOG.encode()], io.BytesIO())
+        self.assertIn('"status": 413', self.stats.getvalue())
+
+    def test_decompressed_request_too_large(self):
+        address = os.path.join(self.tmp.name, 'limited.sock')
+        self.start_server(address, max_request_size=100000)
+        bomb = gzip.compress(LOG.encode() * 100)
+        self.assertLess(len(bomb), 100000)
+        with self.assertRaises(ConversionError):
+            convert_remotely(address, {'output_format': 'cc'}, [bomb], io.BytesIO())
+        self.assertIn('"status": 413, "error": "decompressed request body exceeds 100000 bytes"', self.stats.getvalue())
+
+    def test_invalid_options(self):
+        for options, error in (({'output_format': 'junit'}, 'unsupported output format: junit'),
+                               ({'output_format': 'cc', 'cache_dir': '/tmp'}, 'unsupported option: cache_dir'),
+                               ({'output_format': 'dump', 'compact': True}, 'unsupported option: compact')):
+            with self.subTest(options=options):
+                with self.assertRaisesRegex(ConversionError, f'400 .*{error}'):
+                    convert_remotely(self.address, options, [LOG.encode()], io.BytesIO())
+
+    def test_local_only_options_are_rejected(self):
+        with self.assertRaisesRegex(SystemExit, '--emit, --jobs cannot be used with --server'):
+            self.convert('--server', self.address, '-e', f'sq={self.tmp.name}/sq.json', '--jobs', '2', 'cc')
+
+    def test_unreachable_server(self):
+        with self.assertRaisesRegex(SystemExit, 'error: .*missing.sock'):
+            self.convert('--server', os.path.join(self.tmp.name, 'missing.sock'), 'cc')
+
+
+class PreforkServerTest(unittest.TestCase):
+    def test_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            address = os.path.join(tmp, 'converter.sock')
+            server = subprocess.Popen([sys.executable, '-m', 'clang_tidy_converter', 'serve', '--workers', '2', address],
+                                      cwd=ROOT_DIR, stderr=subprocess.PIPE, text=True)
+            try:
+                for _ in range(100):
+                    if os.path.exists(address):
+                        break
+                    time.sleep(0.05)
+                output = io.BytesIO()
+                for _ in range(4):
+                    convert_remotely(address, {'output_format': 'dump'}, [LOG.encode()], output)
+            finally:
+                server.send_signal(signal.SIGTERM)
+                _, stats = server.communicate(timeout=10)
+            self.assertEqual(0, server.returncode)
+            self.assertEqual(4, stats.count('"status": 200'))
+            self.assertFalse(os.path.exists(address))
+
+
+if __name__ == '__main__':
+    unittest.main()
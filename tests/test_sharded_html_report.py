@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+import os
+import re
+import tempfile
+import unittest
+import unittest.mock
+
+from clang_tidy_converter import ClangMessage
+from clang_tidy_converter.formatter import sharded_html_report
+from clang_tidy_converter.formatter.sharded_html_report import ShardedHTMLReportWriter
+
+
+class ShardedHTMLReportWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.messages = [ClangMessage(f'/src/dir{i % 2}/file{i % 3}.cpp', i, 1, ClangMessage.Level.WARNING, f'Issue {i}', 'bugprone-a')
+                         for i in range(12)]
+        self.args = unittest.mock.Mock()
+        self.args.software_name = ''
+        self.output_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.output_dir.cleanup()
+
+    def _pages(self):
+        with open(os.path.join(self.output_dir.name, 'index.html')) as index:
+            links = re.findall(r'<a href="([^"]+)">([^<]+)</a></td><td class="Q">(\d+)</td>', index.read())
+        pages = {}
+        for page, key, count in links:
+            with open(os.path.join(self.output_dir.name, page)) as f:
+                pages[key] = (int(count), re.findall(r'<td>Issue (\d+)</td>', f.read()))
+        return pages
+
+    def test_page_per_file(self):
+        with unittest.mock.patch.object(sharded_html_report, 'MAX_OPEN_SPILL_FILES', 2):
+            ShardedHTMLReportWriter(self.output_dir.name).write(iter(self.messages), self.args)
+        pages = self._pages()
+        self.assertEqual(6, len(pages))
+        self.assertEqual((2, ['0', '6']), pages['/src/dir0/file0.cpp'])
+        self.assertEqual(7, len(os.listdir(self.output_dir.name)))
+
+    def test_page_per_directory(self):
+        ShardedHTMLReportWriter(self.output_dir.name, 'directory', jobs=2).write(iter(self.messages), self.args)
+        pages = self._pages()
+        self.assertEqual((6, ['1', '3', '5', '7', '9', '11']), pages['/src/dir1'])
+        self.assertEqual(['/src/dir0', '/src/dir1'], sorted(pages))
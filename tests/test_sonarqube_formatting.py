@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+from argparse import Namespace
+import json
+import unittest
+
+from clang_tidy_converter import ClangMessage, SonarQubeFormatter
+
+
+class SonarQubeFormatterTest(unittest.TestCase):
+    def test_format_without_options(self):
+        message = ClangMessage('/src/a.cpp', 1, 2, ClangMessage.Level.WARNING, 'Memory leak', 'clang-analyzer-unix.Malloc')
+        output = SonarQubeFormatter().format([message], Namespace())
+        self.assertIn('\n  "issues"', output)
+        self.assertEqual(['clang-analyzer-unix.Malloc'], [issue['ruleId'] for issue in json.loads(output)['issues']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import json
+import os
+import pstats
+import tempfile
+import time
+import unittest
+
+from clang_tidy_converter.__main__ import create_argparser, main
+from clang_tidy_converter.stats import PipelineStats, measure, track
+
+
+def slow(items, seconds):
+    for item in items:
+        time.sleep(seconds)
+        yield item
+
+
+class PipelineStatsTest(unittest.TestCase):
+    def test_inactive(self):
+        items = [1, 2, 3]
+        self.assertIs(items, track('stage', items))
+        with measure('block'):
+            pass
+
+    def test_stage_time_excludes_upstream_stages(self):
+        stats = PipelineStats()
+        stats.start()
+        try:
+            items = track('upstream', slow(range(5), 0.01))
+            items = track('downstream', slow(items, 0.002))
+            with measure('write'):
+                self.assertEqual([0, 1, 2, 3, 4], list(items))
+        finally:
+            stats.stop()
+        stages = {stage['name']: stage for stage in stats.to_json()['stages']}
+        self.assertEqual(['upstream', 'downstream', 'write'], list(stages))
+        self.assertEqual(5, stages['upstream']['items'])
+        self.assertEqual(5, stages['downstream']['items'])
+        self.assertIsNone(stages['write']['items'])
+        # upstream sleeps five times as long as downstream, and write not at all
+        self.assertGreater(stages['upstream']['wall_seconds'], stages['downstream']['wall_seconds'])
+        self.assertGreater(stages['downstream']['wall_seconds'], stages['write']['wall_seconds'])
+        self.assertGreater(stages['write']['peak_rss_mb'], 0)
+        self.assertIsNone(track('stage', None))
+
+
+class StatsOptionTest(unittest.TestCase):
+    def test_stats_and_profile(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, 'clang-tidy.log')
+            with open(log, 'w') as f:
+                f.write('/src/a.cpp:1:3: warning: Warning [bugprone-a]\n  ^\n/src/a.h:2:1: note: Note\n')
+            stats_path = os.path.join(tmp, 'stats.json')
+            profile_path = os.path.join(tmp, 'profile')
+            main(create_argparser().parse_args(['--input', log, '--project_root', '/src', '--output', os.path.join(tmp, 'out.json'),
+                                                '--stats', stats_path, '--profile', profile_path, 'sq']))
+            with open(stats_path) as f:
+                stats = json.load(f)
+            self.assertEqual(['parse', 'write sq', 'sq format'], [stage['name'] for stage in stats['stages']])
+            self.assertEqual(1, stats['stages'][0]['items'])
+            self.assertGreater(pstats.Stats(profile_path).total_calls, 0)